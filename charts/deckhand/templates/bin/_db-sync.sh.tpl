@@ -1,6 +1,7 @@
 #!/bin/bash
-# Pending inputs on what need to be done for db-sync
 
 set -ex
 export HOME=/tmp
 
+# The image runs Deckhand from its source tree rather than installing it.
+python3 -m deckhand.manage --config-file ${DECKHAND_CONFIG_FILE} db sync
@@ -17,6 +17,7 @@ from oslo_log import log as logging
 
 from deckhand.barbican import client_wrapper
 from deckhand import errors
+from deckhand import metrics
 from deckhand import utils
 
 LOG = logging.getLogger(__name__)
@@ -32,7 +33,9 @@ class BarbicanDriver(object):
         secret = self.barbicanclient.call("secrets.create", **kwargs)
 
         try:
-            secret.store()
+            with metrics.BARBICAN_REQUEST_DURATION.labels(
+                    'create_secret').time():
+                secret.store()
         except (barbicanclient.exceptions.HTTPAuthError,
                 barbicanclient.exceptions.HTTPClientError,
                 barbicanclient.exceptions.HTTPServerError) as e:
@@ -46,3 +49,19 @@ class BarbicanDriver(object):
         for key in resp.keys():
             resp[utils.to_snake_case(key)] = resp.pop(key)
         return resp
+
+    def get_secret(self, secret_ref):
+        """Get a secret."""
+        try:
+            with metrics.BARBICAN_REQUEST_DURATION.labels(
+                    'get_secret').time():
+                secret = self.barbicanclient.call("secrets.get", secret_ref)
+                payload = secret.payload
+        except (barbicanclient.exceptions.HTTPAuthError,
+                barbicanclient.exceptions.HTTPClientError,
+                barbicanclient.exceptions.HTTPServerError) as e:
+            LOG.exception(e.message)
+            raise errors.BarbicanException(message=e.message,
+                                           code=e.status_code)
+
+        return payload
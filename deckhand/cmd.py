@@ -14,10 +14,22 @@
 
 from deckhand.control import api
 
+try:
+    # Only importable when running under uWSGI.
+    import uwsgi
+except ImportError:
+    uwsgi = None
+
 
 def start_deckhand():
     return api.init_application()
 
 
+# Unless ``lazy-apps`` is set, uWSGI loads the application once in its master
+# process and forks the workers from it, so each worker must rebuild its
+# database connection pool.
+if uwsgi is not None:
+    uwsgi.post_fork_hook = api.post_fork
+
 # Callable to be used by uwsgi.
 deckhand_callable = start_deckhand()
@@ -33,6 +33,157 @@ barbican_opts = [
 ]
 
 
+compression_group = cfg.OptGroup(
+    name='compression',
+    title='Compression Options',
+    help="""
+Options for compressing API responses according to the ``Accept-Encoding``
+request header.
+""")
+
+compression_opts = [
+    cfg.BoolOpt('enabled', default=True,
+                help="""
+Whether to compress response bodies when the client accepts it.
+"""),
+    cfg.ListOpt('encodings', default=['gzip'],
+                item_type=cfg.types.String(choices=['gzip', 'deflate']),
+                help="""
+Content codings that may be applied to responses, in order of preference.
+
+Possible values:
+    * gzip
+    * deflate
+"""),
+    cfg.IntOpt('min_size', default=1024, min=0,
+               help="""
+Minimum size, in bytes, of a response body for it to be compressed. Smaller
+bodies are sent as-is, since compressing them saves little or nothing. Streamed
+responses of unknown length are always compressed.
+"""),
+    cfg.IntOpt('level', default=6, min=1, max=9,
+               help="""
+zlib compression level, from 1 (fastest) to 9 (smallest output).
+"""),
+]
+
+
+profiler_group = cfg.OptGroup(
+    name='profiler',
+    title='Profiler Options',
+    help="""
+Options for profiling requests, to troubleshoot their performance.
+""")
+
+profiler_opts = [
+    cfg.BoolOpt('sql', default=False,
+                help="""
+Whether to profile the SQL statements executed by each request. The number
+and duration of the statements of each request, per DB API call, and its
+slowest statements are logged.
+"""),
+    cfg.IntOpt('sql_slowest_statements', default=5, min=0,
+               help="""
+Number of slowest statements of each request to log when ``sql`` is enabled.
+"""),
+    cfg.BoolOpt('sql_explain', default=False,
+                help="""
+Whether to also log the query plans of the slowest ``SELECT`` statements of
+each request when ``sql`` is enabled. Each of them is executed again with
+``EXPLAIN``, which adds to the load on the database.
+"""),
+    cfg.StrOpt('request_output_dir',
+               help="""
+Directory to write the profiles of requests profiled on demand to, via the
+``X-Deckhand-Profile`` header. If unset, the profile is returned instead of
+the response, as a text attachment.
+"""),
+    cfg.IntOpt('request_top_entries', default=30, min=1,
+               help="""
+Number of functions, and of source lines allocating memory, to include in the
+profiles of requests profiled on demand.
+"""),
+]
+
+
+secrets_group = cfg.OptGroup(
+    name='secrets',
+    title='Secrets Options',
+    help="""
+Options for configuring where Deckhand stores the payloads of documents with
+``metadata.storagePolicy`` = "encrypted".
+""")
+
+secrets_opts = [
+    cfg.StrOpt('storage_backend', default='barbican',
+               choices=['barbican', 'local'],
+               help="""
+Backend used to store the payloads of encrypted documents.
+
+Possible values:
+    * barbican: Payloads are stored in Barbican and Deckhand only stores the
+      secret reference returned by Barbican.
+    * local: Payloads are encrypted with ``encryption_key`` and the resulting
+      ciphertext is stored in Deckhand's database. This avoids a round trip
+      to Barbican for every secret write and read, at the cost of keeping the
+      key material in Deckhand's configuration.
+"""),
+    cfg.StrOpt('encryption_key', secret=True,
+               help="""
+URL-safe base64-encoded 32-byte key used by the ``local`` storage backend to
+encrypt and decrypt secret payloads (Fernet). Required when
+``storage_backend`` is ``local``.
+"""),
+]
+
+
+validation_group = cfg.OptGroup(
+    name='validation',
+    title='Validation Options',
+    help="""
+Options for validating the documents created in new revisions.
+""")
+
+validation_opts = [
+    cfg.StrOpt('schema_validation_mode', default='inline',
+               choices=['inline', 'deferred'],
+               help="""
+When to validate documents against the schemas registered via ``DataSchema``
+documents.
+
+Possible values:
+    * inline: All documents are fully validated before the revision is
+      created and the response is returned.
+    * deferred: Only the structural validation of documents, and their
+      validation against Deckhand's own schemas, are performed before the
+      revision is created. Documents with a registered schema are validated
+      afterwards by background workers, and the ``deckhand-schema-validation``
+      validation of the revision is ``pending`` until they are done.
+"""),
+    cfg.IntOpt('workers', default=2, min=1,
+               help="""
+Number of threads validating documents in the background, in each API process,
+when ``schema_validation_mode`` is ``deferred``.
+"""),
+    cfg.FloatOpt('poll_interval', default=5.0, min=0.1,
+                 help="""
+Time, in seconds, that idle background validation workers wait before checking
+for queued validations created by other API processes.
+"""),
+    cfg.IntOpt('task_timeout', default=300, min=1,
+               help="""
+Time, in seconds, after which a queued validation that was started but not
+completed, e.g. because the API process running it was stopped, is started
+again by another worker.
+"""),
+    cfg.IntOpt('max_attempts', default=3, min=1,
+               help="""
+Number of times a queued validation is started before its documents are
+recorded as having failed validation.
+"""),
+]
+
+
 context_opts = [
     cfg.BoolOpt('allow_anonymous_access', default=False,
                 help="""
@@ -51,21 +202,70 @@ Possible values:
 ]
 
 
+api_opts = [
+    cfg.IntOpt('max_request_body_size', default=104857600, min=1,
+               help="""
+Maximum size, in bytes, of a request body.
+
+Requests whose ``Content-Length`` exceeds this value are rejected before
+their body is read. Bodies are also read incrementally and rejected as soon as
+this many bytes have been received. Defaults to 100 MiB.
+"""),
+    cfg.IntOpt('max_documents_per_request', default=10000, min=1,
+               help="""
+Maximum number of documents that can be created or updated in a bucket with a
+single request. Payloads are rejected as soon as this many documents have been
+parsed.
+"""),
+    cfg.BoolOpt('server_timing', default=True,
+                help="""
+Whether to add a ``Server-Timing`` header to responses, with the time spent in
+each phase of handling the request (e.g. ``parse``, ``validation``, ``db``,
+``secrets``, ``substitution`` and ``serialization``) and in total.
+"""),
+    cfg.FloatOpt('slow_request_threshold', default=5.0, min=0,
+                 help="""
+Time, in seconds, above which a request is logged as slow, together with the
+time spent in each of its phases. Set to 0 to disable logging slow requests.
+"""),
+    cfg.IntOpt('read_after_write_window', default=30, min=0,
+               help="""
+Time, in seconds, during which the reads of a client that has just written are
+served from the primary database rather than the read-only replica configured
+via ``[database]/slave_connection``, if any. Successful writes set a cookie
+that expires after this time. Set to 0 to disable.
+"""),
+]
+
+
 def register_opts(conf):
     conf.register_group(barbican_group)
     conf.register_opts(barbican_opts, group=barbican_group)
+    conf.register_group(compression_group)
+    conf.register_opts(compression_opts, group=compression_group)
+    conf.register_group(profiler_group)
+    conf.register_opts(profiler_opts, group=profiler_group)
+    conf.register_group(secrets_group)
+    conf.register_opts(secrets_opts, group=secrets_group)
+    conf.register_group(validation_group)
+    conf.register_opts(validation_opts, group=validation_group)
     conf.register_opts(context_opts)
+    conf.register_opts(api_opts)
     ks_loading.register_auth_conf_options(conf, group=barbican_group.name)
     ks_loading.register_session_conf_options(conf, group=barbican_group.name)
 
 
 def list_opts():
-    opts = {None: context_opts,
+    opts = {None: context_opts + api_opts,
             barbican_group: barbican_opts +
                             ks_loading.get_session_conf_options() +
                             ks_loading.get_auth_common_conf_options() +
                             ks_loading.get_auth_plugin_conf_options(
-                                'v3password')}
+                                'v3password'),
+            compression_group: compression_opts,
+            profiler_group: profiler_opts,
+            secrets_group: secrets_opts,
+            validation_group: validation_opts}
     return opts
 
 
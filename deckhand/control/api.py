@@ -12,15 +12,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import atexit
 import logging as py_logging
 import os
 
 from oslo_config import cfg
 from oslo_log import log as logging
-from oslo_policy import policy
 from paste import deploy
 
 from deckhand.db.sqlalchemy import api as db_api
+from deckhand.db.sqlalchemy import migration
+from deckhand.engine import document_validation
+from deckhand.engine import validation_worker
+from deckhand import metrics
+from deckhand import policy
 
 CONF = cfg.CONF
 
@@ -47,6 +52,35 @@ def setup_logging(conf):
     py_logging.captureWarnings(True)
 
 
+def preload():
+    """Load state that does not change after startup.
+
+    When uWSGI loads the application in its master process, everything loaded
+    here is shared copy-on-write by the workers forked from it instead of
+    being rebuilt by each of them.
+    """
+    policy.init()
+    document_validation.preload_validators()
+
+
+def post_fork():
+    """Prepare a worker process forked from a preloaded master.
+
+    The master's database engine must not be used by the worker, so it is
+    discarded and the worker creates its own connection pool on first use.
+    The worker's gauges are discarded from the aggregated metrics when it
+    exits. In the ``deferred`` schema validation mode, the worker starts its
+    background validation workers, so that validations queued before it
+    started are performed.
+    """
+    LOG.debug('Discarding database engine inherited by worker %d.',
+              os.getpid())
+    db_api.clear_db_env()
+    atexit.register(metrics.mark_process_dead, os.getpid())
+    if validation_worker.is_enabled():
+        validation_worker.start()
+
+
 def init_application():
     """Main entry point for initializing the Deckhand API service.
 
@@ -58,15 +92,20 @@ def init_application():
     CONF([], project='deckhand', default_config_files=config_files)
     setup_logging(CONF)
 
-    policy.Enforcer(CONF)
+    preload()
 
     LOG.debug('Starting WSGI application using %s configuration file.',
               paste_file)
 
-    db_api.drop_db()
-    db_api.setup_db()
+    # The schema is created and upgraded by `deckhand-manage db sync`, so
+    # workers only check that it is current and never run any DDL.
+    migration.check_db_version()
 
     app = deploy.loadapp('config:%s' % paste_file, name='deckhand_api')
+
+    # Workers may be forked from this process, so release the connections
+    # used during startup rather than let the workers inherit them.
+    db_api.dispose_engine()
     return app
 
 
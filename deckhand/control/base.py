@@ -13,8 +13,15 @@
 # limitations under the License.
 
 import falcon
+from oslo_config import cfg
+from oslo_log import log as logging
+import six
 
 from deckhand import context
+from deckhand.control import content_types
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
 
 
 class BaseResource(object):
@@ -33,6 +40,101 @@ class BaseResource(object):
         resp.headers['Allow'] = ','.join(allowed_methods)
         resp.status = falcon.HTTP_200
 
+    def from_request(self, req, multi_document=False):
+        """Deserialize the request body according to its ``Content-Type``.
+
+        :param req: ``falcon`` request object.
+        :param multi_document: Whether the body is expected to contain a list
+            of documents.
+        :returns: The deserialized request body.
+        :raises falcon.HTTPBadRequest: If the body could not be parsed.
+        """
+        media_type = content_types.get_request_media_type(req)
+        body = self._get_request_stream(req).read()
+
+        try:
+            return content_types.deserialize(
+                media_type, body, multi_document=multi_document)
+        except ValueError as e:
+            LOG.error('Could not parse the request body as %s. Details: %s.',
+                      media_type, e)
+            raise falcon.HTTPBadRequest(description=six.text_type(e))
+
+    def iter_documents_from_request(self, req):
+        """Incrementally deserialize the documents in the request body.
+
+        The body is parsed straight from the request stream and each document
+        is yielded as soon as it has been parsed, rather than after the whole
+        body has been buffered.
+
+        :param req: ``falcon`` request object.
+        :returns: Generator of documents.
+        :raises falcon.HTTPBadRequest: If the body could not be parsed.
+        :raises falcon.HTTPRequestEntityTooLarge: If the body exceeds
+            ``[DEFAULT]/max_request_body_size`` or contains more than
+            ``[DEFAULT]/max_documents_per_request`` documents.
+        """
+        media_type = content_types.get_request_media_type(req)
+        stream = self._get_request_stream(req)
+
+        documents = content_types.deserialize_documents(media_type, stream)
+        try:
+            for idx, document in enumerate(documents, 1):
+                self._check_document_count(idx)
+                yield document
+        except ValueError as e:
+            LOG.error('Could not parse the request body as %s. Details: %s.',
+                      media_type, e)
+            raise falcon.HTTPBadRequest(description=six.text_type(e))
+
+    def _check_document_count(self, count):
+        max_documents = CONF.max_documents_per_request
+        if count > max_documents:
+            raise falcon.HTTPRequestEntityTooLarge(
+                description='The request contains more than the maximum of '
+                            '%d documents allowed.' % max_documents)
+
+    def _get_request_stream(self, req):
+        max_size = CONF.max_request_body_size
+        if req.content_length and req.content_length > max_size:
+            raise falcon.HTTPRequestEntityTooLarge(
+                description='The request body is %d bytes, which exceeds the '
+                            'maximum of %d bytes allowed.' % (
+                                req.content_length, max_size))
+        return BoundedRequestStream(req.stream, req.content_length or 0,
+                                    max_size)
+
+
+class BoundedRequestStream(object):
+    """Read-only wrapper around the WSGI input stream.
+
+    Never reads past ``Content-Length`` (which could otherwise block on some
+    WSGI servers) and raises ``falcon.HTTPRequestEntityTooLarge`` as soon as
+    more than ``max_size`` bytes have been read.
+    """
+
+    def __init__(self, stream, content_length, max_size):
+        self._stream = stream
+        self._remaining = content_length
+        self._max_size = max_size
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self._remaining
+        size = min(size, self._remaining, self._max_size + 1 - self.bytes_read)
+        if size <= 0:
+            return b''
+
+        data = self._stream.read(size)
+        self._remaining -= len(data)
+        self.bytes_read += len(data)
+        if self.bytes_read > self._max_size:
+            raise falcon.HTTPRequestEntityTooLarge(
+                description='The request body exceeds the maximum of %d '
+                            'bytes allowed.' % self._max_size)
+        return data
+
 
 class DeckhandRequest(falcon.Request):
     context_type = context.RequestContext
@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import yaml
+import collections
 
 import falcon
 from oslo_log import log as logging
@@ -23,8 +23,11 @@ from deckhand.control.views import document as document_view
 from deckhand.db.sqlalchemy import api as db_api
 from deckhand.engine import document_validation
 from deckhand.engine import secrets_manager
+from deckhand.engine import validation_worker
 from deckhand import errors as deckhand_errors
+from deckhand import metrics
 from deckhand import policy
+from deckhand import timing
 from deckhand import types
 
 LOG = logging.getLogger(__name__)
@@ -38,26 +41,50 @@ class BucketsResource(api_base.BaseResource):
 
     @policy.authorize('deckhand:create_cleartext_documents')
     def on_put(self, req, resp, bucket_name=None):
-        document_data = req.stream.read(req.content_length or 0)
-        try:
-            documents = list(yaml.safe_load_all(document_data))
-        except yaml.YAMLError as e:
-            error_msg = ("Could not parse the document into YAML data. "
-                         "Details: %s." % e)
-            LOG.error(error_msg)
-            raise falcon.HTTPBadRequest(description=six.text_type(e))
+        # NOTE: Documents are parsed incrementally from the request stream and
+        # validated as they arrive, so that malformed or oversized payloads
+        # are rejected without buffering the rest of the body.
+        documents = timing.timed_iter(
+            'parse', self.iter_documents_from_request(req))
+
+        documents, validations, deferred_validations = (
+            self._validate_documents(req, documents))
+        metrics.BUCKET_DOCUMENTS.observe(len(documents))
+
+        created_documents = self._create_revision_documents(
+            collections.OrderedDict([(bucket_name, documents)]), validations,
+            deferred_validations)
 
+        if created_documents:
+            resp.body = self.view_builder.list(created_documents)
+        resp.status = falcon.HTTP_200
+
+    def _validate_documents(self, req, documents):
+        """Validate the documents and prepare them to be stored.
+
+        :returns: Tuple of the list of validated documents, the list of
+            validation entries to be created for them and the list of
+            (schema, name) of the documents whose schema validation is
+            deferred.
+        """
         # NOTE: Must validate documents before doing policy enforcement,
         # because we expect certain formatting of the documents while doing
         # policy enforcement. If any documents fail basic schema validaiton
-        # raise an exception immediately.
-        doc_validator = document_validation.DocumentValidation(documents)
+        # raise an exception immediately. In the ``deferred`` schema
+        # validation mode, validating documents against registered schemas is
+        # left to background workers.
+        doc_validator = document_validation.DocumentValidation(
+            documents, defer_data_schemas=validation_worker.is_enabled())
         try:
-            validations = doc_validator.validate_all()
+            with timing.span('validation'):
+                validations = doc_validator.validate_all()
         except (deckhand_errors.InvalidDocumentFormat,
                 deckhand_errors.InvalidDocumentSchema) as e:
             LOG.error(e.format_message())
             raise falcon.HTTPBadRequest(description=e.format_message())
+        documents = [d.to_dict() for d in doc_validator.documents]
+        deferred_validations = [(d.get_schema(), d.get_name())
+                                for d in doc_validator.deferred_documents]
 
         for document in documents:
             if document['metadata'].get('storagePolicy') == 'encrypted':
@@ -66,13 +93,7 @@ class BucketsResource(api_base.BaseResource):
                 break
 
         self._prepare_secret_documents(documents)
-
-        created_documents = self._create_revision_documents(
-            bucket_name, documents, validations)
-
-        if created_documents:
-            resp.body = self.view_builder.list(created_documents)
-        resp.status = falcon.HTTP_200
+        return documents, validations, deferred_validations
 
     def _prepare_secret_documents(self, secret_documents):
         # Encrypt data for secret documents, if any.
@@ -85,15 +106,73 @@ class BucketsResource(api_base.BaseResource):
                       for t in types.DOCUMENT_SECRET_TYPES]):
                 document['data'] = {'secret': document['data']}
 
-    def _create_revision_documents(self, bucket_name, documents,
-                                   validations):
+    def _create_revision_documents(self, documents_by_bucket, validations,
+                                   deferred_validations):
         try:
-            created_documents = db_api.documents_create(
-                bucket_name, documents, validations=validations)
+            created_documents = db_api.buckets_documents_create(
+                documents_by_bucket, validations=validations,
+                deferred_validations=deferred_validations)
         except (deckhand_errors.DocumentExists,
                 deckhand_errors.SingletonDocumentConflict) as e:
             raise falcon.HTTPConflict(description=e.format_message())
         except Exception as e:
             raise falcon.HTTPInternalServerError(description=six.text_type(e))
 
+        if created_documents and deferred_validations:
+            validation_worker.start()
+            validation_worker.notify()
+
         return created_documents
+
+
+class BucketsBatchResource(BucketsResource):
+    """API resource for updating several buckets in a single revision."""
+
+    @policy.authorize('deckhand:create_cleartext_documents')
+    def on_put(self, req, resp):
+        # The body is a stream of entries, each with the name of a bucket and
+        # the full list of its documents, like the body of
+        # ``PUT /buckets/{bucket_name}/documents``.
+        documents_by_bucket = collections.OrderedDict()
+        document_buckets = []
+
+        def _iter_documents():
+            document_count = 0
+            for entry in self.iter_documents_from_request(req):
+                if (not isinstance(entry, dict) or
+                        set(entry) != set(['bucket', 'documents']) or
+                        not isinstance(entry['bucket'], six.string_types) or
+                        not entry['bucket'] or
+                        not isinstance(entry['documents'], list)):
+                    raise falcon.HTTPBadRequest(
+                        description='Each entry must consist of the name of '
+                                    'a bucket, as "bucket", and the list of '
+                                    'its documents, as "documents".')
+                bucket_name = entry['bucket']
+                if bucket_name in documents_by_bucket:
+                    raise falcon.HTTPBadRequest(
+                        description='The bucket %s is specified more than '
+                                    'once.' % bucket_name)
+                documents_by_bucket[bucket_name] = []
+
+                document_count += len(entry['documents'])
+                self._check_document_count(document_count)
+                for document in entry['documents']:
+                    document_buckets.append(bucket_name)
+                    yield document
+
+        documents = timing.timed_iter('parse', _iter_documents())
+        documents, validations, deferred_validations = (
+            self._validate_documents(req, documents))
+
+        for bucket_name, document in zip(document_buckets, documents):
+            documents_by_bucket[bucket_name].append(document)
+        for bucket_documents in documents_by_bucket.values():
+            metrics.BUCKET_DOCUMENTS.observe(len(bucket_documents))
+
+        created_documents = self._create_revision_documents(
+            documents_by_bucket, validations, deferred_validations)
+
+        if created_documents:
+            resp.body = self.view_builder.list(created_documents)
+        resp.status = falcon.HTTP_200
@@ -13,6 +13,12 @@
 # limitations under the License.
 
 import functools
+import hashlib
+
+import falcon
+from oslo_serialization import jsonutils as json
+
+from deckhand.control import content_types
 
 
 class ViewBuilder(object):
@@ -88,3 +94,46 @@ def sanitize_params(allowed_params):
         return wrapper
 
     return decorator
+
+
+def _parse_etags(header):
+    # Entity tags are compared using the weak comparison function for
+    # If-None-Match, so the weakness indicator is ignored.
+    etags = set()
+    for etag in header.split(','):
+        etag = etag.strip()
+        if etag.startswith('W/'):
+            etag = etag[2:]
+        etags.add(etag)
+    return etags
+
+
+def conditional_get(req, resp, *components):
+    """Set a strong ``ETag`` for the response and handle ``If-None-Match``.
+
+    The entity tag is derived from ``components`` (e.g. a revision digest and
+    the request's filters) and the negotiated response media type, as
+    different media types yield different representations.
+
+    :param req: ``falcon`` request object.
+    :param resp: ``falcon`` response object.
+    :param components: JSON-serializable values that together uniquely
+        identify the content of the response.
+    :returns: True if the client's cached representation is current, in which
+        case the response status is set to ``304 Not Modified`` and the
+        response body must not be generated; False otherwise.
+    """
+    components = components + (content_types.get_response_media_type(req),)
+    etag = '"%s"' % hashlib.sha256(
+        json.dumps(components, sort_keys=True).encode('utf-8')).hexdigest()
+
+    resp.set_header('ETag', etag)
+    resp.append_header('Vary', 'Accept')
+
+    if_none_match = req.get_header('If-None-Match')
+    if if_none_match:
+        client_etags = _parse_etags(if_none_match)
+        if '*' in client_etags or etag in client_etags:
+            resp.status = falcon.HTTP_304
+            return True
+    return False
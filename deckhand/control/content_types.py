@@ -0,0 +1,267 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Content negotiation for Deckhand API requests and responses.
+
+YAML (``application/x-yaml``) is the default media type. JSON
+(``application/json``) can be used instead for both request and response
+bodies, in which case multi-document payloads are represented as JSON arrays.
+"""
+
+import codecs
+import json
+
+import falcon
+from oslo_serialization import jsonutils
+
+from deckhand import yaml_codec
+
+YAML = 'application/x-yaml'
+JSON = 'application/json'
+
+SUPPORTED_MEDIA_TYPES = [YAML, JSON]
+
+_CHUNK_SIZE = 64 * 1024
+# Length of the longest JSON token, other than a string, that can be cut off
+# at the end of a chunk: ``-Infinity``, or a pair of ``\uXXXX`` escapes.
+_MAX_TOKEN_SIZE = 12
+
+# Responses with these statuses must not include a body or a Content-Type.
+_BODILESS_STATUSES = (falcon.HTTP_204, falcon.HTTP_304)
+
+
+def get_media_type(content_type):
+    """Strip any parameters (e.g. ``charset``) from a media type."""
+    return content_type.split(';', 1)[0].strip() if content_type else ''
+
+
+def get_request_media_type(req):
+    """Return the media type of the request body, defaulting to YAML."""
+    return get_media_type(req.content_type) or YAML
+
+
+def get_response_media_type(req):
+    """Return the media type to use for the response body.
+
+    The ``Accept`` header is matched against the supported media types. YAML
+    is returned when the header is absent, ambiguous (e.g. ``*/*``) or doesn't
+    match any supported media type.
+    """
+    if not req.get_header('Accept'):
+        return YAML
+    # NOTE: Ties are resolved in favor of the last media type in the list,
+    # so YAML remains the default for wildcards.
+    return req.client_prefers([JSON, YAML]) or YAML
+
+
+def deserialize(media_type, data, multi_document=False):
+    """Deserialize ``data`` according to ``media_type``.
+
+    :param media_type: Either ``application/x-yaml`` or ``application/json``.
+    :param data: The raw request body.
+    :param multi_document: Whether a list of documents is expected. YAML
+        payloads are then parsed as multi-document streams, while JSON
+        payloads are expected to be arrays; a single JSON object is treated
+        as a list with one document.
+    :raises ValueError: If ``data`` could not be parsed.
+    """
+    if media_type == JSON:
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        result = jsonutils.loads(data) if data else None
+        if multi_document:
+            if result is None:
+                return []
+            if not isinstance(result, list):
+                result = [result]
+        return result
+
+    try:
+        if multi_document:
+            return list(yaml_codec.safe_load_all(data))
+        return yaml_codec.safe_load(data)
+    except yaml_codec.YAMLError as e:
+        raise ValueError(e)
+
+
+def deserialize_documents(media_type, stream):
+    """Incrementally deserialize the documents in ``stream``.
+
+    Documents are yielded one at a time as soon as they have been parsed, so
+    that callers can process (or reject) them without waiting for the rest of
+    the stream to be read. A YAML stream yields each of its documents; a JSON
+    stream yields each element of a top-level array, or a single top-level
+    object.
+
+    :param media_type: Either ``application/x-yaml`` or ``application/json``.
+    :param stream: File-like object with a ``read(size)`` method.
+    :raises ValueError: If the stream could not be parsed. Documents preceding
+        the malformed one will already have been yielded.
+    """
+    if media_type == JSON:
+        return iter(_JSONDocumentStream(stream))
+    return _iter_yaml_documents(stream)
+
+
+def _iter_yaml_documents(stream):
+    try:
+        for document in yaml_codec.safe_load_all(stream):
+            yield document
+    except yaml_codec.YAMLError as e:
+        raise ValueError(e)
+
+
+class _JSONDocumentStream(object):
+    """Incremental parser for a JSON array of documents.
+
+    The stream is read ``_CHUNK_SIZE`` bytes at a time and each array element
+    is decoded as soon as it is complete, so only the element being parsed
+    has to be buffered.
+    """
+
+    def __init__(self, stream, chunk_size=_CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """Read the next chunk, discarding what has already been consumed.
+
+        :returns: False once the end of the stream has been reached.
+        """
+        if self._eof:
+            return False
+        chunk = self._stream.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+        if isinstance(chunk, bytes):
+            chunk = self._utf8.decode(chunk, final=self._eof)
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return not self._eof
+
+    def _peek(self):
+        """Skip whitespace and return the next character, or '' at EOF."""
+        while True:
+            while (self._pos < len(self._buffer) and
+                    self._buffer[self._pos].isspace()):
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def _consume(self, expected):
+        char = self._peek()
+        if not char or char not in expected:
+            raise ValueError('Expecting one of %s but found %s.' % (
+                ', '.join(repr(c) for c in expected),
+                repr(char) if char else 'end of input'))
+        self._pos += 1
+        return char
+
+    def _fill_more(self):
+        """Read at least as much again as is currently buffered.
+
+        Growing the buffer geometrically bounds the number of times an element
+        spanning many chunks is re-scanned.
+
+        :returns: False if no more data could be read.
+        """
+        size = len(self._buffer) - self._pos
+        filled = False
+        while self._fill():
+            filled = True
+            if len(self._buffer) >= 2 * size:
+                break
+        return filled
+
+    def _is_truncated(self, error):
+        """Whether a decoding error may be due to the value being incomplete,
+        rather than malformed: it must be at the end of the buffer.
+        """
+        return (error.msg.startswith('Unterminated string') or
+                len(self._buffer) - error.pos <= _MAX_TOKEN_SIZE)
+
+    def _decode_value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                # The value may simply be incomplete; retry with more data.
+                if not self._is_truncated(e) or not self._fill_more():
+                    raise
+                continue
+            # A number at the very end of the buffer may be truncated.
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def __iter__(self):
+        char = self._peek()
+        if not char:
+            return
+        if char != '[':
+            yield self._decode_value()
+        else:
+            self._consume('[')
+            if self._peek() == ']':
+                self._consume(']')
+            else:
+                while True:
+                    yield self._decode_value()
+                    if self._consume(',]') == ']':
+                        break
+        if self._peek():
+            raise ValueError('Extra data found after the JSON document.')
+
+
+def serialize(media_type, data):
+    """Serialize ``data`` according to ``media_type``.
+
+    Lists and tuples are emitted as multi-document YAML streams or as JSON
+    arrays; dictionaries as a single YAML document or a JSON object.
+    """
+    if media_type == JSON:
+        return jsonutils.dumps(data)
+
+    if isinstance(data, (list, tuple)):
+        return yaml_codec.safe_dump_all(data)
+    return yaml_codec.safe_dump(data)
+
+
+def serialize_response(req, resp):
+    """Serialize ``resp.body`` in the media type negotiated for ``req``.
+
+    Controllers and the error formatter hand over Python structures, which
+    are serialized exactly once here. Bodies that are already strings (i.e.
+    that have already gone through this function) are left untouched, so
+    calling it more than once for the same response is harmless. Responses
+    that must not have a body (``204 No Content`` and ``304 Not Modified``)
+    are left untouched as well.
+    """
+    if resp.status in _BODILESS_STATUSES:
+        return
+
+    media_type = get_response_media_type(req)
+    resp.set_header('Content-Type', media_type)
+
+    if isinstance(resp.body, (dict, list, tuple)):
+        resp.body = serialize(media_type, resp.body)
@@ -0,0 +1,28 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import falcon
+
+from deckhand.control.base import BaseResource
+from deckhand import metrics
+
+
+class MetricsResource(BaseResource):
+    """A resource that exposes Deckhand's metrics in the Prometheus text
+    format, aggregated across all the workers of the API service.
+    """
+
+    def on_get(self, req, resp):
+        resp.data, resp.content_type = metrics.generate()
+        resp.status = falcon.HTTP_200
@@ -12,16 +12,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import yaml
+import os
+import timeit
+import zlib
 
 import falcon
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_serialization import jsonutils as json
+from oslo_utils import timeutils
 import six
 
 import deckhand.context
+from deckhand.control import content_types
+from deckhand.db.sqlalchemy import api as db_api
+from deckhand.db.sqlalchemy import profiler
 from deckhand import errors
+from deckhand import metrics
+from deckhand import policy
+from deckhand import profiling
+from deckhand import timing
 
 CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
@@ -50,6 +60,194 @@ class ContextMiddleware(object):
             raise falcon.HTTPUnauthorized()
 
 
+class TimingMiddleware(object):
+    """Middleware that times the phases of handling each request.
+
+    Adds a ``Server-Timing`` header with the time spent in each phase, unless
+    ``[DEFAULT]/server_timing`` is disabled, and logs requests that took
+    longer than ``[DEFAULT]/slow_request_threshold`` seconds.
+
+    .. note::
+
+        This must be the first middleware in the list, so that its
+        ``process_response`` runs last and the timings include the
+        serialization of the response.
+    """
+
+    def process_request(self, req, resp):
+        timing.start_request()
+
+    def process_response(self, req, resp, resource):
+        timer = timing.end_request()
+        if timer is None:
+            return
+        total = timer.elapsed()
+
+        if CONF.server_timing:
+            resp.set_header('Server-Timing', timer.to_header(total))
+
+        threshold = CONF.slow_request_threshold
+        if threshold and total >= threshold:
+            LOG.warning('Slow request: %s', json.dumps({
+                'method': req.method,
+                'path': req.path,
+                'status': resp.status,
+                'total_ms': round(total * 1000, 1),
+                'phases_ms': {name: round(duration * 1000, 1)
+                              for name, duration in timer.phases.items()},
+            }, sort_keys=True))
+
+
+class MetricsMiddleware(object):
+    """Middleware that records the latency of each request, by route,
+    method and status, and the number of requests in flight.
+    """
+
+    _START_TIME_KEY = 'deckhand.metrics.start_time'
+
+    def process_request(self, req, resp):
+        req.env[self._START_TIME_KEY] = timeit.default_timer()
+        metrics.REQUESTS_IN_FLIGHT.inc()
+
+    def process_response(self, req, resp, resource):
+        start_time = req.env.pop(self._START_TIME_KEY, None)
+        if start_time is None:
+            return
+        metrics.REQUESTS_IN_FLIGHT.dec()
+        metrics.REQUEST_DURATION.labels(
+            req.uri_template or 'none', req.method,
+            resp.status.split(' ', 1)[0]).observe(
+                timeit.default_timer() - start_time)
+
+
+class ProfilingMiddleware(object):
+    """Middleware that profiles individual requests on demand.
+
+    A request with an ``X-Deckhand-Profile`` header, whose value is a
+    comma-separated list of profiling modes, ``cpu`` (``cProfile``) and
+    ``memory`` (``tracemalloc``), is profiled if the
+    ``deckhand:profile_request`` policy allows it. The profile replaces the
+    response as a text attachment, unless ``[profiler]/request_output_dir``
+    is set, in which case it is written to that directory and its paths are
+    listed in the ``X-Deckhand-Profile-Output`` response header.
+
+    Requests without the header are not profiled and pay no overhead.
+
+    .. note::
+
+        This must come before ``YAMLTranslator`` in the list, so that the
+        profile includes the serialization of the response.
+    """
+
+    HEADER = 'X-Deckhand-Profile'
+    OUTPUT_HEADER = 'X-Deckhand-Profile-Output'
+    _PROFILE_KEY = 'deckhand.profile'
+
+    def process_resource(self, req, resp, resource, params):
+        # NOTE: Profiling starts once the request has been routed and its
+        # context created, which happens before this is called.
+        header = req.get_header(self.HEADER)
+        if not header:
+            return
+
+        modes = set(m.strip().lower() for m in header.split(','))
+        modes.discard('')
+        if not modes or not all(profiling.is_supported(m) for m in modes):
+            raise falcon.HTTPInvalidHeader(
+                'Supported profiling modes are: %s.' % ', '.join(
+                    m for m in profiling.MODES if profiling.is_supported(m)),
+                self.HEADER)
+
+        policy.conditional_authorize('deckhand:profile_request', req.context)
+
+        request_profile = profiling.RequestProfile(modes)
+        if not request_profile.start():
+            raise falcon.HTTPConflict(
+                'Profiling in progress',
+                'Another request is being profiled. Try again later.')
+        req.env[self._PROFILE_KEY] = request_profile
+
+    def process_response(self, req, resp, resource):
+        request_profile = req.env.pop(self._PROFILE_KEY, None)
+        if request_profile is None:
+            return
+        request_profile.stop()
+
+        top = CONF.profiler.request_top_entries
+        name = 'deckhand-profile-%s-%s' % (
+            timeutils.utcnow().strftime('%Y%m%dT%H%M%S'),
+            req.context.request_id)
+
+        if CONF.profiler.request_output_dir:
+            paths = request_profile.dump(
+                os.path.join(CONF.profiler.request_output_dir, name), top)
+            LOG.info('Profile of %s %s written to %s.', req.method,
+                     req.path, ', '.join(paths))
+            resp.set_header(self.OUTPUT_HEADER, ', '.join(paths))
+            return
+
+        report = 'Profile of %s %s (%s)\n\n%s' % (
+            req.method, req.relative_uri, resp.status,
+            request_profile.format_report(top))
+        resp.status = falcon.HTTP_200
+        resp.body = report
+        resp.data = None
+        resp.content_type = 'text/plain'
+        resp.downloadable_as = name + '.txt'
+        # The headers describing the original response no longer apply.
+        for header in ('ETag', 'Vary', 'Location'):
+            resp.delete_header(header)
+
+
+class DBRequestScopeMiddleware(object):
+    """Middleware that scopes database access to the request.
+
+    All the database sessions used while handling a request share a single
+    pooled connection, which is released once the response is complete, and
+    the existence of a revision is only checked once per request.
+
+    ``GET`` and ``HEAD`` requests read from the read-only replica configured
+    via ``[database]/slave_connection``, if any, unless they include
+    ``Cache-Control: no-cache`` or the cookie set by successful writes for
+    ``[DEFAULT]/read_after_write_window`` seconds. Either guarantees that data
+    that was just written is read back.
+
+    If ``[profiler]/sql`` is enabled, the SQL statements executed by each
+    request are profiled and logged.
+    """
+
+    _READ_ONLY_METHODS = ('GET', 'HEAD')
+    _PROFILE_KEY = 'deckhand.sql_profile'
+    _READ_AFTER_WRITE_COOKIE = 'deckhand_read_after_write'
+
+    def process_request(self, req, resp):
+        cache_control = (req.get_header('Cache-Control') or '').lower()
+        read_only = (req.method in self._READ_ONLY_METHODS and
+                     'no-cache' not in cache_control and
+                     self._READ_AFTER_WRITE_COOKIE not in req.cookies)
+        db_api.begin_request(read_only=read_only)
+        if CONF.profiler.sql:
+            req.env[self._PROFILE_KEY] = profiler.start()
+
+    def process_response(self, req, resp, resource):
+        query_profile = req.env.pop(self._PROFILE_KEY, None)
+        if query_profile is not None:
+            profiler.stop()
+            LOG.info('SQL profile of %s %s: %s', req.method, req.path,
+                     query_profile.format_report(
+                         CONF.profiler.sql_slowest_statements,
+                         CONF.profiler.sql_explain))
+        if (req.method not in self._READ_ONLY_METHODS and
+                resp.status.startswith('2') and
+                CONF.read_after_write_window and db_api.has_slave()):
+            # Keep the client's reads on the primary until the replica has
+            # likely caught up with its write.
+            resp.set_cookie(self._READ_AFTER_WRITE_COOKIE, '1',
+                            max_age=CONF.read_after_write_window, path='/',
+                            secure=False)
+        db_api.end_request()
+
+
 class HookableMiddlewareMixin(object):
     """Provides methods to extract before and after hooks from WSGI Middleware
     Prior to falcon 0.2.0b1, it's necessary to provide falcon with middleware
@@ -102,11 +300,13 @@ class HookableMiddlewareMixin(object):
 
 
 class YAMLTranslator(HookableMiddlewareMixin, object):
-    """Middleware for converting all responses (error and success) to YAML.
+    """Middleware for content negotiation of all responses (error and
+    success).
 
     ``falcon`` error exceptions use JSON formatting and headers by default.
-    This middleware will intercept all responses and guarantee they are YAML
-    format.
+    This middleware will intercept all responses and guarantee they are
+    serialized using the media type negotiated via the ``Accept`` header:
+    YAML by default, or JSON if the client prefers ``application/json``.
 
     .. note::
 
@@ -115,11 +315,17 @@ class YAMLTranslator(HookableMiddlewareMixin, object):
         ``falcon`` middleware.
     """
 
+    # Paths whose responses have a format of their own, which is therefore not
+    # negotiated.
+    _UNNEGOTIATED_PATHS = ('/metrics',)
+
     def process_request(self, req, resp):
         """Performs content type enforcement on behalf of REST verbs."""
-        valid_content_types = ['application/x-yaml']
-        content_type = (req.content_type.split(';', 1)[0].strip()
-                        if req.content_type else '')
+        if req.path in self._UNNEGOTIATED_PATHS:
+            return
+
+        valid_content_types = content_types.SUPPORTED_MEDIA_TYPES
+        content_type = content_types.get_media_type(req.content_type)
 
         if not content_type:
             raise falcon.HTTPMissingHeader('Content-Type')
@@ -134,21 +340,131 @@ class YAMLTranslator(HookableMiddlewareMixin, object):
             raise falcon.HTTPUnsupportedMediaType(description=message)
 
     def process_response(self, req, resp, resource):
-        """Converts responses to ``application/x-yaml`` content type."""
-        resp.set_header('Content-Type', 'application/x-yaml')
+        """Serializes responses in the negotiated content type."""
+        if req.path in self._UNNEGOTIATED_PATHS:
+            return
+
+        with timing.span('serialization'):
+            content_types.serialize_response(req, resp)
+
+
+class CompressionMiddleware(object):
+    """Middleware for compressing response bodies.
+
+    Applies one of the content codings enabled via
+    ``[compression]/encodings`` (gzip and/or deflate) when allowed by the
+    request's ``Accept-Encoding`` header. Bodies smaller than
+    ``[compression]/min_size`` are left uncompressed. Streamed responses are
+    compressed chunk by chunk as they are sent.
+
+    .. note::
+
+        This must come before ``YAMLTranslator`` in the list, so that its
+        ``process_response`` runs after the response has been serialized by
+        ``YAMLTranslator``.
+    """
+
+    _CHUNK_SIZE = 64 * 1024
+
+    # The wbits argument passed to zlib for each content coding.
+    _WBITS = {
+        'gzip': 16 + zlib.MAX_WBITS,
+        'deflate': zlib.MAX_WBITS,
+    }
+
+    # Responses with these statuses have no body to compress.
+    _BODILESS_STATUSES = (falcon.HTTP_204, falcon.HTTP_304)
+
+    def _select_encoding(self, accept_encoding):
+        """Return the preferred enabled coding acceptable to the client."""
+        qvalues = {}
+        for coding in accept_encoding.split(','):
+            params = coding.strip().split(';')
+            name = params[0].strip().lower()
+            qvalue = 1.0
+            for param in params[1:]:
+                key, _, value = param.strip().partition('=')
+                if key.strip() == 'q':
+                    try:
+                        qvalue = float(value)
+                    except ValueError:
+                        qvalue = 0.0
+            if name:
+                qvalues[name] = qvalue
+
+        acceptable = [
+            e for e in CONF.compression.encodings
+            if qvalues.get(e, qvalues.get('*', 0.0)) > 0]
+        if not acceptable:
+            return None
+        # Prefer the client's highest weighted coding, falling back to the
+        # configured order for ties.
+        return max(acceptable, key=lambda e: (
+            qvalues.get(e, qvalues.get('*', 0.0)),
+            -CONF.compression.encodings.index(e)))
+
+    def _compressor(self, encoding):
+        return zlib.compressobj(CONF.compression.level, zlib.DEFLATED,
+                                self._WBITS[encoding])
+
+    def _compress_stream(self, stream, encoding):
+        compressor = self._compressor(encoding)
+        try:
+            if hasattr(stream, 'read'):
+                chunks = iter(lambda: stream.read(self._CHUNK_SIZE), b'')
+            else:
+                chunks = stream
+            for chunk in chunks:
+                if not isinstance(chunk, bytes):
+                    chunk = chunk.encode('utf-8')
+                compressed = compressor.compress(chunk)
+                if compressed:
+                    yield compressed
+            yield compressor.flush()
+        finally:
+            if hasattr(stream, 'close'):
+                stream.close()
+
+    def process_response(self, req, resp, resource):
+        """Compresses the response body if the client accepts it."""
+        if not CONF.compression.enabled:
+            return
 
-        for attr in ('body', 'data'):
-            if not hasattr(resp, attr):
-                continue
+        # Compression changes the representation, so caches must key on
+        # Accept-Encoding whether or not this response ends up compressed.
+        resp.append_header('Vary', 'Accept-Encoding')
 
-            resp_attr = getattr(resp, attr)
+        if (req.method == 'HEAD' or
+                resp.status in self._BODILESS_STATUSES or
+                resp.get_header('Content-Encoding')):
+            return
 
-            try:
-                resp_attr = json.loads(resp_attr)
-            except (TypeError, ValueError):
-                pass
+        encoding = self._select_encoding(
+            req.get_header('Accept-Encoding') or '')
+        if not encoding:
+            return
+
+        if resp.body is not None or resp.data is not None:
+            data = resp.body if resp.body is not None else resp.data
+            if not isinstance(data, bytes):
+                data = data.encode('utf-8')
+            if len(data) < CONF.compression.min_size:
+                return
+            compressor = self._compressor(encoding)
+            resp.body = None
+            resp.data = compressor.compress(data) + compressor.flush()
+        elif resp.stream is not None:
+            if (resp.stream_len is not None and
+                    resp.stream_len < CONF.compression.min_size):
+                return
+            resp.set_stream(
+                self._compress_stream(resp.stream, encoding), None)
+        else:
+            return
 
-            if isinstance(resp_attr, dict):
-                setattr(resp, attr, yaml.safe_dump(resp_attr))
-            elif isinstance(resp_attr, (list, tuple)):
-                setattr(resp, attr, yaml.safe_dump_all(resp_attr))
+        resp.set_header('Content-Encoding', encoding)
+        # NOTE: The compressed body differs byte-for-byte from the identity
+        # one, so only a weak validator remains valid for it.
+        etag = resp.get_header('ETag')
+        if etag and not etag.startswith('W/'):
+            resp.set_header('ETag', 'W/' + etag)
@@ -15,13 +15,23 @@
 import falcon
 
 from deckhand.control import base as api_base
+from deckhand.control import common
+from deckhand.control.views import revision_diff as revision_diff_view
 from deckhand.db.sqlalchemy import api as db_api
 from deckhand import errors
 from deckhand import policy
 
 
 class RevisionDiffingResource(api_base.BaseResource):
-    """API resource for realizing revision diffing."""
+    """API resource for realizing revision diffing.
+
+    By default, only the status of each bucket is reported. With
+    ``detail=true``, the documents that were added, removed or changed are
+    listed as well, with a JSON patch for each changed document. The list of
+    documents can be paged using ``limit`` and ``offset``.
+    """
+
+    view_builder = revision_diff_view.ViewBuilder()
 
     @policy.authorize('deckhand:show_revision_diff')
     def on_get(self, req, resp, revision_id, comparison_revision_id):
@@ -30,9 +40,25 @@ class RevisionDiffingResource(api_base.BaseResource):
         if comparison_revision_id == '0':
             comparison_revision_id = 0
 
+        detail = req.get_param_as_bool('detail') or False
+        limit = req.get_param_as_int('limit', min=0)
+        offset = req.get_param_as_int('offset', min=0) or 0
+
         try:
+            # Revision 0 doesn't exist: it stands for an empty revision.
+            digests = [db_api.revision_get_digest(r) if r != 0 else r
+                       for r in (revision_id, comparison_revision_id)]
+            if common.conditional_get(req, resp, digests, detail, limit,
+                                      offset):
+                return
             resp_body = db_api.revision_diff(
                 revision_id, comparison_revision_id)
+            if detail:
+                documents_diff = db_api.revision_diff_documents(
+                    revision_id, comparison_revision_id, limit=limit,
+                    offset=offset)
+                resp_body = self.view_builder.show_detail(
+                    resp_body, documents_diff)
         except (errors.RevisionNotFound) as e:
             raise falcon.HTTPNotFound(description=e.format_message())
 
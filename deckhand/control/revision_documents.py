@@ -22,7 +22,9 @@ from deckhand.control.views import document as document_view
 from deckhand.db.sqlalchemy import api as db_api
 from deckhand.engine import secrets_manager
 from deckhand import errors
+from deckhand import metrics
 from deckhand import policy
+from deckhand import timing
 
 LOG = logging.getLogger(__name__)
 
@@ -56,6 +58,9 @@ class RevisionDocumentsResource(api_base.BaseResource):
         filters['deleted'] = False
 
         try:
+            digest = db_api.revision_get_digest(revision_id)
+            if common.conditional_get(req, resp, digest, filters):
+                return
             documents = db_api.revision_get_documents(
                 revision_id, **filters)
         except errors.RevisionNotFound as e:
@@ -95,6 +100,18 @@ class RenderedDocumentsResource(api_base.BaseResource):
             filters['metadata.storagePolicy'].append('encrypted')
 
         try:
+            digest = db_api.revision_get_digest(revision_id)
+            # Secrets are substituted from the latest version of their
+            # documents, in any revision, so the rendered documents may
+            # change whenever a new revision is created.
+            latest_digest = db_api.revision_get_latest_digest()
+            # Clients that revalidate their copy of the rendered documents
+            # spare rendering them again.
+            not_modified = common.conditional_get(
+                req, resp, digest, latest_digest, filters)
+            metrics.cache_lookup('rendered_documents', not_modified)
+            if not_modified:
+                return
             documents = db_api.revision_get_documents(
                 revision_id, **filters)
         except errors.RevisionNotFound as e:
@@ -108,7 +125,8 @@ class RenderedDocumentsResource(api_base.BaseResource):
         # layering has been fully integrated into this endpoint.
         secrets_substitution = secrets_manager.SecretsSubstitution(documents)
         try:
-            rendered_documents = secrets_substitution.substitute_all()
+            with timing.span('substitution'):
+                rendered_documents = secrets_substitution.substitute_all()
         except errors.DocumentNotFound as e:
             LOG.error('Failed to render the documents because a secret '
                       'document could not be found.')
@@ -47,7 +47,11 @@ class RevisionsResource(api_base.BaseResource):
         included.
         """
         try:
-            revision = db_api.revision_get(revision_id)
+            digest = db_api.revision_get_digest(
+                revision_id, include_history=False, include_tags=True)
+            if common.conditional_get(req, resp, digest):
+                return
+            revision = db_api.revision_get_summary(revision_id)
         except errors.RevisionNotFound as e:
             raise falcon.HTTPNotFound(description=e.format_message())
 
@@ -58,7 +62,7 @@ class RevisionsResource(api_base.BaseResource):
     @policy.authorize('deckhand:list_revisions')
     @common.sanitize_params(['tag'])
     def _list_revisions(self, req, resp, sanitized_params):
-        revisions = db_api.revision_get_all(**sanitized_params)
+        revisions = db_api.revision_get_all_summaries(**sanitized_params)
         revisions_resp = self.view_builder.list(revisions)
 
         resp.status = falcon.HTTP_200
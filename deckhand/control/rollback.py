@@ -29,19 +29,19 @@ class RollbackResource(api_base.BaseResource):
     @policy.authorize('deckhand:create_cleartext_documents')
     def on_post(self, req, resp, revision_id):
         try:
-            latest_revision = db_api.revision_get_latest()
+            has_encrypted_documents = (
+                db_api.revision_latest_has_encrypted_documents())
         except errors.RevisionNotFound as e:
             raise falcon.HTTPNotFound(description=e.format_message())
 
-        for document in latest_revision['documents']:
-            if document['metadata'].get('storagePolicy') == 'encrypted':
-                policy.conditional_authorize(
-                    'deckhand:create_encrypted_documents', req.context)
-                break
+        if has_encrypted_documents:
+            policy.conditional_authorize(
+                'deckhand:create_encrypted_documents', req.context)
 
         try:
-            rollback_revision = db_api.revision_rollback(
-                revision_id, latest_revision)
+            rollback_revision = db_api.revision_rollback(revision_id)
+        except errors.RevisionNotFound as e:
+            raise falcon.HTTPNotFound(description=e.format_message())
         except errors.InvalidRollback as e:
             raise falcon.HTTPBadRequest(description=e.format_message())
 
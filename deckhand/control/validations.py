@@ -12,13 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import yaml
-
 import falcon
 from oslo_log import log as logging
-import six
 
 from deckhand.control import base as api_base
+from deckhand.control import common
 from deckhand.control.views import validation as validation_view
 from deckhand.db.sqlalchemy import api as db_api
 from deckhand import errors
@@ -34,14 +32,7 @@ class ValidationsResource(api_base.BaseResource):
 
     @policy.authorize('deckhand:create_validation')
     def on_post(self, req, resp, revision_id, validation_name):
-        validation_data = req.stream.read(req.content_length or 0)
-        try:
-            validation_data = yaml.safe_load(validation_data)
-        except yaml.YAMLError as e:
-            error_msg = ("Could not parse the validation into YAML data. "
-                         "Details: %s." % e)
-            LOG.error(error_msg)
-            raise falcon.HTTPBadRequest(description=six.text_type(e))
+        validation_data = self.from_request(req)
 
         try:
             resp_body = db_api.validation_create(
@@ -50,7 +41,6 @@ class ValidationsResource(api_base.BaseResource):
             raise falcon.HTTPNotFound(description=e.format_message())
 
         resp.status = falcon.HTTP_201
-        resp.append_header('Content-Type', 'application/x-yaml')
         resp.body = self.view_builder.show(resp_body)
 
     def on_get(self, req, resp, revision_id, validation_name=None,
@@ -65,7 +55,6 @@ class ValidationsResource(api_base.BaseResource):
             resp_body = self._list_all_validations(req, resp, revision_id)
 
         resp.status = falcon.HTTP_200
-        resp.append_header('Content-Type', 'application/x-yaml')
         resp.body = resp_body
 
     @policy.authorize('deckhand:show_validation')
@@ -80,7 +69,7 @@ class ValidationsResource(api_base.BaseResource):
         try:
             entry = db_api.validation_get_entry(
                 revision_id, validation_name, entry_id)
-        except errors.RevisionNotFound as e:
+        except (errors.RevisionNotFound, errors.ValidationNotFound) as e:
             raise falcon.HTTPNotFound(description=e.format_message())
 
         resp_body = self.view_builder.show_entry(entry)
@@ -107,3 +96,35 @@ class ValidationsResource(api_base.BaseResource):
 
         resp_body = self.view_builder.list(validations)
         return resp_body
+
+
+class ValidationStatusesResource(api_base.BaseResource):
+    """API resource for retrieving the validation statuses of many revisions
+    at once.
+    """
+
+    view_builder = validation_view.ViewBuilder()
+
+    @policy.authorize('deckhand:list_validations')
+    def on_get(self, req, resp):
+        try:
+            revision_ids = [
+                int(x) for x in req.get_param_as_list('revision_id') or []]
+        except ValueError:
+            raise falcon.HTTPBadRequest(
+                description='The revision_id parameter must be a list of '
+                            'integers.')
+        if not revision_ids:
+            raise falcon.HTTPMissingParam('revision_id')
+
+        try:
+            validations = db_api.validation_get_all_by_revisions(revision_ids)
+        except errors.RevisionNotFound as e:
+            raise falcon.HTTPNotFound(description=e.format_message())
+
+        resp.status = falcon.HTTP_200
+        # Validations are posted continually, so the revisions' validation
+        # statuses themselves determine the entity tag.
+        if common.conditional_get(req, resp, sorted(validations.items())):
+            return
+        resp.body = self.view_builder.list_by_revisions(validations)
@@ -13,7 +13,6 @@
 # limitations under the License.
 
 from deckhand.control import common
-from deckhand import types
 from deckhand import utils
 
 
@@ -29,18 +28,14 @@ class ViewBuilder(common.ViewBuilder):
         }
 
         for revision in revisions:
-            body = {'tags': set(), 'buckets': set()}
-            rev_documents = revision.pop('documents')
+            body = {}
+            summary = revision['summary']
 
             for attr in ('id', 'created_at'):
                 body[utils.to_camel_case(attr)] = revision[attr]
 
-            body['tags'].update([t['tag'] for t in revision['tags']])
-            body['buckets'].update(
-                [d['bucket_name'] for d in rev_documents])
-
-            body['tags'] = sorted(body['tags'])
-            body['buckets'] = sorted(body['buckets'])
+            body['tags'] = sorted(summary['tags'])
+            body['buckets'] = sorted(summary['buckets'])
 
             resp_body['results'].append(body)
 
@@ -49,7 +44,8 @@ class ViewBuilder(common.ViewBuilder):
     def show(self, revision):
         """Generate view for showing revision details.
 
-        Each revision's documents should only be validation policies.
+        The validation policies, tags and buckets of the revision are taken
+        from its summary, rather than from its documents.
         """
         validation_policies = []
         # TODO(fmontei): For the time being we're only returning the tag name,
@@ -57,28 +53,21 @@ class ViewBuilder(common.ViewBuilder):
         # why this is a dictionary, not a list.
         tags = {}
         success_status = 'success'
+        summary = revision['summary']
 
-        for vp in [d for d in revision['documents']
-                   if d['schema'].startswith(types.VALIDATION_POLICY_SCHEMA)]:
+        for vp in summary['validation_policies']:
             validation_policy = {}
-            validation_policy['name'] = vp.get('name')
+            validation_policy['name'] = vp['name']
             validation_policy['url'] = self._gen_url(vp)
-            try:
-                validation_policy['status'] = vp['data']['validations'][0][
-                    'status']
-            except KeyError:
-                validation_policy['status'] = 'unknown'
+            validation_policy['status'] = vp['status']
 
             validation_policies.append(validation_policy)
 
             if validation_policy['status'] != 'success':
                 success_status = 'failed'
 
-        for tag in revision['tags']:
-            tags.setdefault(tag['tag'], {'name': tag['tag']})
-
-        buckets = sorted(
-            set([d['bucket_name'] for d in revision['documents']]))
+        for tag in summary['tags']:
+            tags.setdefault(tag, {'name': tag})
 
         return {
             'id': revision.get('id'),
@@ -87,5 +76,5 @@ class ViewBuilder(common.ViewBuilder):
             'validationPolicies': validation_policies,
             'status': success_status,
             'tags': tags,
-            'buckets': buckets
+            'buckets': sorted(summary['buckets'])
         }
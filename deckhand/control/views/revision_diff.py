@@ -0,0 +1,54 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from deckhand.control import common
+from deckhand.engine import document_diff
+
+
+class ViewBuilder(common.ViewBuilder):
+    """Model revision diff API responses as a python dictionary."""
+
+    _collection_name = 'revisions'
+
+    def show_detail(self, bucket_diff, documents_diff):
+        """Generate view for a detailed revision diff.
+
+        Changed documents are rendered as JSON patch operations transforming
+        the older version into the newer one. The ``data`` and ``metadata``
+        sections are only diffed if their hashes differ.
+        """
+        results = []
+
+        for document in documents_diff['results']:
+            result = {
+                'bucket': document['bucket_name'],
+                'schema': document['schema'],
+                'name': document['name'],
+                'status': document['status'],
+            }
+            if document['status'] == 'changed':
+                old, new = document['old'], document['new']
+                patch = []
+                for section in ('metadata', 'data'):
+                    if old[section + '_hash'] != new[section + '_hash']:
+                        patch.extend(document_diff.diff(
+                            old[section], new[section], '/' + section))
+                result['patch'] = patch
+            results.append(result)
+
+        return {
+            'buckets': bucket_diff,
+            'count': documents_diff['count'],
+            'results': results,
+        }
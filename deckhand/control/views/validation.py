@@ -28,6 +28,16 @@ class ViewBuilder(common.ViewBuilder):
             ]
         }
 
+    def list_by_revisions(self, validations):
+        return {
+            'count': len(validations),
+            'results': [
+                {'revision': revision_id,
+                 'validations': self.list(validations[revision_id])['results']}
+                for revision_id in sorted(validations)
+            ]
+        }
+
     def list_entries(self, entries):
         results = []
 
@@ -0,0 +1,46 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from alembic import context
+
+from deckhand.db.sqlalchemy import api as db_api
+from deckhand.db.sqlalchemy import models
+
+config = context.config
+target_metadata = models.BASE.metadata
+
+
+def run_migrations_online():
+    """Run migrations against the database configured for Deckhand.
+
+    A connection can be passed in via ``config.attributes['connection']``,
+    e.g. by tests; otherwise one is created from ``[database]/connection``.
+    """
+    connection = config.attributes.get('connection')
+    if connection is not None:
+        _run_migrations(connection)
+        return
+
+    with db_api.get_engine().connect() as connection:
+        _run_migrations(connection)
+
+
+def _run_migrations(connection):
+    context.configure(connection=connection,
+                      target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+run_migrations_online()
@@ -0,0 +1,128 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Initial schema
+
+Revision ID: 0c5d7e3b9f21
+Revises:
+Create Date: 2017-11-20 00:00:00.000000
+
+"""
+
+from alembic import op
+from oslo_db.sqlalchemy import types as oslo_types
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0c5d7e3b9f21'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _base_columns():
+    return [
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted', sa.Boolean(), nullable=False),
+    ]
+
+
+def upgrade():
+    op.create_table(
+        'buckets',
+        *(_base_columns() + [
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=36), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('name')
+        ]))
+
+    op.create_table(
+        'revisions',
+        *(_base_columns() + [
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('bucket_digests', oslo_types.JsonEncodedDict(),
+                      nullable=True),
+            sa.Column('digest', sa.String(length=64), nullable=True),
+            sa.Column('summary', oslo_types.JsonEncodedDict(),
+                      nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        ]))
+
+    op.create_table(
+        'documents',
+        *(_base_columns() + [
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=64), nullable=False),
+            sa.Column('schema', sa.String(length=64), nullable=False),
+            sa.Column('_metadata', oslo_types.JsonEncodedDict(),
+                      nullable=False),
+            sa.Column('data', oslo_types.JsonEncodedDict(), nullable=True),
+            sa.Column('data_hash', sa.String(), nullable=False),
+            sa.Column('metadata_hash', sa.String(), nullable=False),
+            sa.Column('is_secret', sa.Boolean(), nullable=False),
+            sa.Column('bucket_id', sa.Integer(), nullable=False),
+            sa.Column('revision_id', sa.Integer(), nullable=False),
+            sa.Column('orig_revision_id', sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(['bucket_id'], ['buckets.id'],
+                                    ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['revision_id'], ['revisions.id'],
+                                    ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['orig_revision_id'], ['revisions.id'],
+                                    ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id')
+        ]))
+
+    op.create_table(
+        'revision_tags',
+        *(_base_columns() + [
+            sa.Column('tag', sa.String(length=64), nullable=False),
+            sa.Column('data', oslo_types.JsonEncodedDict(), nullable=True),
+            sa.Column('revision_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['revision_id'], ['revisions.id'],
+                                    ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('tag')
+        ]))
+
+    op.create_table(
+        'validations',
+        *(_base_columns() + [
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=64), nullable=False),
+            sa.Column('status', sa.String(length=8), nullable=False),
+            sa.Column('validator', oslo_types.JsonEncodedDict(),
+                      nullable=False),
+            sa.Column('errors', oslo_types.JsonEncodedList(),
+                      nullable=False),
+            sa.Column('revision_id', sa.Integer(), nullable=False),
+            sa.Column('ordinal', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['revision_id'], ['revisions.id'],
+                                    ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('revision_id', 'name', 'ordinal')
+        ]))
+
+    op.create_table(
+        'validation_summaries',
+        *(_base_columns() + [
+            sa.Column('revision_id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=64), nullable=False),
+            sa.Column('status', sa.String(length=8), nullable=False),
+            sa.Column('entry_count', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['revision_id'], ['revisions.id'],
+                                    ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('revision_id', 'name')
+        ]))
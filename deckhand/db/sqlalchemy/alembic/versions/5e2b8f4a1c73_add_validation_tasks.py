@@ -0,0 +1,48 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Add validation tasks
+
+Revision ID: 5e2b8f4a1c73
+Revises: 0c5d7e3b9f21
+Create Date: 2017-12-04 00:00:00.000000
+
+"""
+
+from alembic import op
+from oslo_db.sqlalchemy import types as oslo_types
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5e2b8f4a1c73'
+down_revision = '0c5d7e3b9f21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'validation_tasks',
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.Column('deleted', sa.Boolean(), nullable=False),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('revision_id', sa.Integer(), nullable=False),
+        sa.Column('documents', oslo_types.JsonEncodedList(), nullable=False),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['revision_id'], ['revisions.id'],
+                                ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'))
@@ -16,23 +16,32 @@
 """Defines interface for DB access."""
 
 import ast
+import collections
 import copy
+import datetime
 import functools
 import hashlib
 import threading
+import timeit
 
 from oslo_config import cfg
+from oslo_db import api as oslo_db_api
 from oslo_db import exception as db_exception
 from oslo_db import options
 from oslo_db.sqlalchemy import session
 from oslo_log import log as logging
 from oslo_serialization import jsonutils as json
+from oslo_utils import timeutils
 import six
+import sqlalchemy as sa
 import sqlalchemy.orm as sa_orm
 from sqlalchemy import text
 
 from deckhand.db.sqlalchemy import models
+from deckhand.db.sqlalchemy import profiler
 from deckhand import errors
+from deckhand import metrics
+from deckhand import timing
 from deckhand import types
 from deckhand import utils
 
@@ -43,6 +52,31 @@ options.set_defaults(CONF)
 
 _FACADE = None
 _LOCK = threading.Lock()
+# Maximum number of values bound in a single ``IN`` clause, which keeps
+# queries below the bind parameter limits of the database backends.
+_MAX_IN_CLAUSE_SIZE = 500
+
+
+class _RequestScope(threading.local):
+    """Database state shared by the DB API calls made for a single request."""
+
+    def __init__(self):
+        self.active = False
+        self.use_slave = False
+        self.connections = {}
+        self.revision_ids = set()
+
+    def connect(self, engine):
+        """Return the request's connection to ``engine``."""
+        connection = self.connections.get(engine)
+        if connection is None:
+            name = 'primary' if engine is get_engine() else 'replica'
+            with metrics.DB_POOL_CHECKOUT_DURATION.labels(name).time():
+                connection = self.connections[engine] = engine.connect()
+        return connection
+
+
+_REQUEST_SCOPE = _RequestScope()
 
 
 def _retry_on_deadlock(exc):
@@ -54,25 +88,198 @@ def _retry_on_deadlock(exc):
     return False
 
 
+def _retry_on_conflict(exc):
+    """Retry a DB API call if a concurrent call wrote the same row first."""
+
+    if isinstance(exc, db_exception.DBDuplicateEntry):
+        LOG.debug("Duplicate entry detected. Retrying...")
+        return True
+    return _retry_on_deadlock(exc)
+
+
 def _create_facade_lazily():
     global _LOCK, _FACADE
     if _FACADE is None:
         with _LOCK:
             if _FACADE is None:
-                _FACADE = session.EngineFacade.from_config(
+                facade = session.EngineFacade.from_config(
                     CONF, sqlite_fk=True)
+                _instrument_engine(facade.get_engine(), 'primary')
+                if facade.get_engine(use_slave=True) is not \
+                        facade.get_engine():
+                    _instrument_engine(
+                        facade.get_engine(use_slave=True), 'replica')
+                _FACADE = facade
     return _FACADE
 
 
-def get_engine():
+def _get_statement_type(statement):
+    statement_type = statement.lstrip()[:6].upper()
+    if statement_type in ('SELECT', 'INSERT', 'UPDATE', 'DELETE'):
+        return statement_type
+    return 'OTHER'
+
+
+def _instrument_engine(engine, name):
+    """Report the connection pool usage and SQL statement durations of
+    ``engine`` as metrics.
+    """
+    connections = metrics.DB_POOL_CONNECTIONS.labels(name)
+    checked_out = metrics.DB_POOL_CHECKED_OUT.labels(name)
+
+    def on_connect(dbapi_connection, connection_record):
+        connections.inc()
+
+    def on_close(dbapi_connection, connection_record):
+        connections.dec()
+
+    def on_detach(dbapi_connection, connection_record):
+        connections.dec()
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_out.inc()
+
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out.dec()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context,
+                              executemany):
+        conn.info.setdefault('query_start_times', []).append(
+            timeit.default_timer())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context,
+                             executemany):
+        duration = timeit.default_timer() - conn.info[
+            'query_start_times'].pop()
+        metrics.DB_QUERY_DURATION.labels(
+            _get_statement_type(statement)).observe(duration)
+        profiler.record(conn.engine, statement, parameters, duration,
+                        executemany)
+
+    def on_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get(
+                'query_start_times'):
+            connection.info['query_start_times'].pop()
+
+    for event, listener in (('connect', on_connect),
+                            ('close', on_close),
+                            ('detach', on_detach),
+                            ('checkout', on_checkout),
+                            ('checkin', on_checkin),
+                            ('before_cursor_execute', before_cursor_execute),
+                            ('after_cursor_execute', after_cursor_execute),
+                            ('handle_error', on_error)):
+        sa.event.listen(engine, event, listener)
+
+
+def get_engine(use_slave=False):
+    """Return the database engine.
+
+    :param use_slave: Return the engine of the read-only replica configured
+        via ``[database]/slave_connection``. The primary engine is returned if
+        no replica is configured.
+    """
     facade = _create_facade_lazily()
-    return facade.get_engine()
+    return facade.get_engine(use_slave=use_slave)
+
 
+def has_slave():
+    """Return whether a read-only replica is configured."""
+    return get_engine(use_slave=True) is not get_engine()
 
-def get_session(autocommit=True, expire_on_commit=False):
+
+def get_session(autocommit=True, expire_on_commit=False, use_slave=None):
+    """Return a database session.
+
+    :param use_slave: Whether to use the read-only replica configured via
+        ``[database]/slave_connection``, if any. Defaults to using it only for
+        read-only requests (see :func:`begin_request`).
+    """
     facade = _create_facade_lazily()
-    return facade.get_session(autocommit=autocommit,
-                              expire_on_commit=expire_on_commit)
+    if use_slave is None:
+        use_slave = _REQUEST_SCOPE.active and _REQUEST_SCOPE.use_slave
+    kwargs = {}
+    if _REQUEST_SCOPE.active:
+        # Bind the session to the connection of the current request. If a
+        # transaction is already in progress on it, the session joins it.
+        kwargs['bind'] = _REQUEST_SCOPE.connect(
+            facade.get_engine(use_slave=use_slave))
+    return facade.get_session(use_slave=use_slave, autocommit=autocommit,
+                              expire_on_commit=expire_on_commit, **kwargs)
+
+
+def _get_primary_session(session):
+    """Return ``session``, or a session for the primary database if
+    ``session`` reads from the read-only replica.
+    """
+    if session.bind.engine is get_engine():
+        return session
+    return get_session(use_slave=False)
+
+
+def begin_request(read_only=False):
+    """Start the request scope of the current thread.
+
+    Until :func:`end_request` is called, every session returned by
+    :func:`get_session` in this thread uses the same connection, which is
+    checked out from the pool on first use, and revisions that were found to
+    exist are not looked up again.
+
+    :param read_only: Whether the request only reads data, in which case
+        it reads from the read-only replica, if one is configured.
+    """
+    _REQUEST_SCOPE.active = True
+    _REQUEST_SCOPE.use_slave = read_only
+
+
+def end_request():
+    """End the request scope of the current thread.
+
+    Returns the connections used by the request to their pools; a
+    transaction left open on them is rolled back.
+    """
+    connections = list(_REQUEST_SCOPE.connections.values())
+    _REQUEST_SCOPE.__init__()
+    for connection in connections:
+        connection.close()
+
+
+def read_after_write(f):
+    """Decorator to retry a read on the primary database if the data it
+    requires was not found on the read-only replica.
+
+    Replicas lag behind the primary, so a request for something that was
+    just created may not find it on them yet. The remainder of the request
+    then also reads from the primary.
+    """
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        try:
+            return f(*args, **kwargs)
+        except (errors.RevisionNotFound, errors.RevisionTagNotFound,
+                errors.ValidationNotFound) as e:
+            if not (_REQUEST_SCOPE.active and _REQUEST_SCOPE.use_slave and
+                    has_slave()):
+                raise
+            LOG.debug('%s Retrying on the primary database.',
+                      e.format_message())
+            _REQUEST_SCOPE.use_slave = False
+            return f(*args, **kwargs)
+    return wrapper
+
+
+def _api_call(f):
+    """Decorator for the public functions of the DB API.
+
+    The time spent in ``f`` is charged to the ``db`` phase of the request and
+    the SQL statements it executes are charged to ``f`` in SQL profiles.
+    """
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        with timing.span('db'), profiler.api_call(f.__name__):
+            return f(*args, **kwargs)
+    return wrapper
 
 
 def clear_db_env():
@@ -81,6 +288,17 @@ def clear_db_env():
     _FACADE = None
 
 
+def dispose_engine():
+    """Close all pooled database connections held by this process.
+
+    Must be called before forking so that no connection is inherited by, and
+    thus shared with, the child processes.
+    """
+    if _FACADE is not None:
+        _FACADE.get_engine().dispose()
+        _FACADE.get_engine(use_slave=True).dispose()
+
+
 def drop_db():
     models.unregister_models(get_engine())
 
@@ -125,28 +343,33 @@ def require_unique_document_schema(schema=None):
 
         @functools.wraps(f)
         def wrapper(bucket_name, documents, *args, **kwargs):
-            existing_documents = revision_get_documents(
-                schema=schema, deleted=False, include_history=False)
-            existing_document_names = [x['name'] for x in existing_documents]
-            # `conflict_names` is calculated by checking whether any documents
-            # in `documents` is a layering policy with a name not found in
-            # `existing_documents`.
-            conflicting_names = [
-                x['metadata']['name'] for x in documents
-                if x['metadata']['name'] not in existing_document_names and
-                   x['schema'].startswith(schema)]
-            if existing_document_names and conflicting_names:
-                raise errors.SingletonDocumentConflict(
-                    document=existing_document_names[0],
-                    conflict=conflicting_names)
+            _check_unique_document_schema(schema, documents)
             return f(bucket_name, documents, *args, **kwargs)
         return wrapper
     return decorator
 
 
+def _check_unique_document_schema(schema, documents):
+    existing_documents = revision_get_documents(
+        schema=schema, deleted=False, include_history=False)
+    existing_document_names = [x['name'] for x in existing_documents]
+    # `conflict_names` is calculated by checking whether any documents
+    # in `documents` is a layering policy with a name not found in
+    # `existing_documents`.
+    conflicting_names = [
+        x['metadata']['name'] for x in documents
+        if x['metadata']['name'] not in existing_document_names and
+           x['schema'].startswith(schema)]
+    if existing_document_names and conflicting_names:
+        raise errors.SingletonDocumentConflict(
+            document=existing_document_names[0],
+            conflict=conflicting_names)
+
+
+@_api_call
 @require_unique_document_schema(types.LAYERING_POLICY_SCHEMA)
 def documents_create(bucket_name, documents, validations=None,
-                     session=None):
+                     deferred_validations=None, session=None):
     """Create a set of documents and associated bucket.
 
     If no changes are detected, a new revision will not be created. This
@@ -156,88 +379,197 @@ def documents_create(bucket_name, documents, validations=None,
     :param bucket_name: The name of the bucket with which to associate created
         documents.
     :param documents: List of documents to be created.
-    :param validation_policies: List of validation policies to be created.
+    :param validations: List of validation entries to be created.
+    :param deferred_validations: List of (schema, name) of the documents whose
+        schema validation is queued, to be performed by background workers.
+        The ``deckhand-schema-validation`` validation of the revision is
+        ``pending`` until then.
     :param session: Database session object.
     :returns: List of created documents in dictionary format.
     :raises DocumentExists: If the (document.schema, document.metadata.name)
         already exists in another bucket.
     """
+    return _buckets_documents_create(
+        collections.OrderedDict([(bucket_name, documents)]), validations,
+        deferred_validations, session)
+
+
+@_api_call
+def buckets_documents_create(documents_by_bucket, validations=None,
+                             deferred_validations=None, session=None):
+    """Create the documents of several buckets in a single revision.
+
+    Each bucket is updated like by ``documents_create``, but all of them in
+    one transaction: either all the buckets are updated, in one revision, or
+    none is. Documents can be moved between the buckets.
+
+    :param documents_by_bucket: Ordered dictionary of the lists of documents
+        to be created, keyed with the name of their bucket. The documents of
+        a bucket mapped to an empty list are deleted.
+    :param validations: List of validation entries to be created.
+    :param deferred_validations: List of (schema, name) of the documents whose
+        schema validation is queued. See ``documents_create``.
+    :param session: Database session object.
+    :returns: List of created documents in dictionary format.
+    :raises DocumentExists: If the (document.schema, document.metadata.name)
+        is in several of the buckets, or already exists in another bucket.
+    :raises SingletonDocumentConflict: See
+        ``require_unique_document_schema``.
+    """
+    _check_unique_document_schema(
+        types.LAYERING_POLICY_SCHEMA,
+        [d for documents in documents_by_bucket.values() for d in documents])
+    return _buckets_documents_create(
+        documents_by_bucket, validations, deferred_validations, session)
+
+
+def _buckets_documents_create(documents_by_bucket, validations,
+                              deferred_validations, session):
     session = session or get_session()
-    documents_to_create = _documents_create(bucket_name, documents, session)
+    keys_by_bucket = dict(
+        (bucket_name, set((d['schema'], d['metadata']['name'])
+                          for d in documents))
+        for bucket_name, documents in documents_by_bucket.items())
+
+    # Ignore redundant validation policies as they are allowed to exist in
+    # multiple buckets.
+    buckets_by_key = {}
+    for bucket_name, keys in keys_by_bucket.items():
+        for schema, name in keys:
+            if schema.startswith(types.VALIDATION_POLICY_SCHEMA):
+                continue
+            if (schema, name) in buckets_by_key:
+                raise errors.DocumentExists(
+                    schema=schema, name=name,
+                    bucket=buckets_by_key[(schema, name)])
+            buckets_by_key[(schema, name)] = bucket_name
 
+    all_keys = set(key for keys in keys_by_bucket.values() for key in keys)
     resp = []
-
-    # The documents to be deleted are computed by comparing the documents for
-    # the previous revision (if it exists) that belong to `bucket_name` with
-    # `documents`: the difference between the former and the latter.
-    document_history = [(d['schema'], d['name'])
-                        for d in revision_get_documents(
-                            bucket_name=bucket_name)]
-    documents_to_delete = [
-        h for h in document_history if h not in
-        [(d['schema'], d['metadata']['name']) for d in documents]]
-
-    # Only create a revision if any docs have been created, changed or deleted.
-    if any([documents_to_create, documents_to_delete]):
-        bucket = bucket_get_or_create(bucket_name)
-        revision = revision_create()
-        if validations:
-            for validation in validations:
-                validation_create(revision['id'], validation['name'],
-                                  validation)
-
-    if documents_to_delete:
-        LOG.debug('Deleting documents: %s.', documents_to_delete)
-        deleted_documents = []
-
-        for d in documents_to_delete:
-            doc = models.Document()
-            with session.begin():
+    revision = None
+
+    with session.begin(subtransactions=True):
+        # Serialize writes, so that the digests of the buckets that aren't
+        # passed are carried over from the revision this one is based on.
+        latest_revision = _revision_lock_latest(session)
+        existing_documents = _get_existing_documents(all_keys, session)
+        documents_to_create = collections.OrderedDict(
+            (bucket_name, _documents_create(
+                bucket_name, documents, existing_documents, keys_by_bucket))
+            for bucket_name, documents in documents_by_bucket.items())
+
+        # The documents to be deleted from each bucket are those whose latest
+        # version belongs to the bucket and isn't deleted, unless they are
+        # passed for the bucket or, if moved, for another one. The revision
+        # history is retrieved once for all buckets.
+        latest_documents = collections.OrderedDict()
+        for d in sorted(revision_get_documents(unique_only=False,
+                                               session=session),
+                        key=lambda d: (d['created_at'], d['id'])):
+            latest_documents[(d['schema'], d['name'])] = d
+        documents_to_delete = collections.OrderedDict(
+            (bucket_name, [
+                key for key, d in latest_documents.items()
+                if d['bucket_name'] == bucket_name and not d['deleted'] and
+                key not in all_keys])
+            for bucket_name in documents_by_bucket)
+
+        # Only create a revision if any docs have been created, changed or
+        # deleted.
+        if (any(documents_to_create.values()) or
+                any(documents_to_delete.values())):
+            # The digests of all other buckets are carried over from the
+            # latest revision, as only the buckets passed are affected.
+            bucket_digests = _revision_get_latest_bucket_digests(
+                latest_revision, session)
+            buckets = dict(
+                (bucket_name, bucket_get_or_create(bucket_name, session))
+                for bucket_name in documents_by_bucket)
+            revision = revision_create(session)
+            if validations:
+                # Each document has a validation entry, so the entries are
+                # created in one transaction per validation rather than one
+                # per document.
+                validations_by_name = collections.OrderedDict()
+                for validation in validations:
+                    validations_by_name.setdefault(
+                        validation['name'], []).append(validation)
+                for name, vals_data in validations_by_name.items():
+                    _validations_create(
+                        revision['id'], name, vals_data, session)
+            if deferred_validations:
+                _validation_task_create(
+                    revision['id'], deferred_validations, session)
+
+        for bucket_name, keys in documents_to_delete.items():
+            if not keys:
+                continue
+            LOG.debug('Deleting documents from bucket %s: %s.', bucket_name,
+                      keys)
+            deleted_documents = []
+
+            for schema, name in keys:
+                doc = models.Document()
                 # Store bare minimum information about the document.
-                doc['schema'] = d[0]
-                doc['name'] = d[1]
+                doc['schema'] = schema
+                doc['name'] = name
                 doc['data'] = {}
                 doc['_metadata'] = {}
                 doc['data_hash'] = _make_hash({})
                 doc['metadata_hash'] = _make_hash({})
-                doc['bucket_id'] = bucket['id']
+                doc['bucket_id'] = buckets[bucket_name]['id']
                 doc['revision_id'] = revision['id']
 
                 # Save and mark the document as `deleted` in the database.
                 doc.save(session=session)
                 doc.safe_delete(session=session)
                 deleted_documents.append(doc)
-            resp.append(doc.to_dict())
-
-    if documents_to_create:
-        LOG.debug('Creating documents: %s.',
-                  [(d['schema'], d['name']) for d in documents_to_create])
-        for doc in documents_to_create:
-            with session.begin():
-                doc['bucket_id'] = bucket['id']
+            resp.extend(doc.to_dict() for doc in deleted_documents)
+
+        for bucket_name, documents in documents_to_create.items():
+            if not documents:
+                continue
+            LOG.debug('Creating documents in bucket %s: %s.', bucket_name,
+                      [(d['schema'], d['name']) for d in documents])
+            for doc in documents:
+                doc['bucket_id'] = buckets[bucket_name]['id']
                 doc['revision_id'] = revision['id']
                 doc.save(session=session)
-            resp.append(doc.to_dict())
-    # NOTE(fmontei): The orig_revision_id is not copied into the
-    # revision_id for each created document, because the revision_id here
-    # should reference the just-created revision. In case the user needs
-    # the original revision_id, that is returned as well.
+            resp.extend(doc.to_dict() for doc in documents)
+        # NOTE(fmontei): The orig_revision_id is not copied into the
+        # revision_id for each created document, because the revision_id here
+        # should reference the just-created revision. In case the user needs
+        # the original revision_id, that is returned as well.
+
+        if revision:
+            # The documents to create contain every document in their bucket,
+            # not just the changed ones, so they fully determine the bucket's
+            # digest.
+            for bucket_name, documents in documents_to_create.items():
+                bucket_digests.pop(bucket_name, None)
+                bucket_digests.update(_make_bucket_digests(
+                    (bucket_name, d['schema'], d['name'], d['data_hash'],
+                     d['metadata_hash']) for d in documents))
+            _revision_set_digests(revision['id'], bucket_digests, session)
+            _revision_update_summary(revision['id'], session)
 
     return resp
 
 
-def _documents_create(bucket_name, values_list, session=None):
+def _documents_create(bucket_name, values_list, existing_documents,
+                      keys_by_bucket):
+    """Prepare the documents to be created in ``bucket_name``.
+
+    :param existing_documents: The existing documents with the same
+        (schema, name) as any of the documents, as returned by
+        ``_get_existing_documents``.
+    :param keys_by_bucket: The (schema, name) of the documents to be created
+        in each of the buckets updated in the same revision.
+    :returns: List of ``Document`` models to be saved.
+    """
     values_list = copy.deepcopy(values_list)
-    session = session or get_session()
-    filters = ('name', 'schema')
     changed_documents = []
 
-    def _document_create(values):
-        document = models.Document()
-        with session.begin():
-            document.update(values)
-        return document
-
     for values in values_list:
         values.setdefault('data', {})
         values = _fill_in_metadata_defaults(values)
@@ -248,26 +580,26 @@ def _documents_create(bucket_name, values_list, session=None):
         values['data_hash'] = _make_hash(values['data'])
         values['metadata_hash'] = _make_hash(values['_metadata'])
 
-        try:
-            existing_document = document_get(
-                raw_dict=True, deleted=False,
-                **{x: values[x] for x in filters})
-        except errors.DocumentNotFound:
-            # Ignore bad data at this point. Allow creation to bubble up the
-            # error related to bad data.
-            existing_document = None
+    for values in values_list:
+        key = (values['schema'], values['name'])
+        existing_document = existing_documents.get(key)
 
         if existing_document:
+            existing_bucket_name = existing_document['bucket_name']
             # If the document already exists in another bucket, raise an error.
             # Ignore redundant validation policies as they are allowed to exist
             # in multiple buckets.
-            if (existing_document['bucket_name'] != bucket_name and
+            if (existing_bucket_name != bucket_name and
                 not existing_document['schema'].startswith(
                     types.VALIDATION_POLICY_SCHEMA)):
-                raise errors.DocumentExists(
-                    schema=existing_document['schema'],
-                    name=existing_document['name'],
-                    bucket=existing_document['bucket_name'])
+                # Unless the document is moved out of that bucket in the same
+                # revision, in which case it is new to `bucket_name`.
+                if key in keys_by_bucket.get(existing_bucket_name, (key,)):
+                    raise errors.DocumentExists(
+                        schema=existing_document['schema'],
+                        name=existing_document['name'],
+                        bucket=existing_bucket_name)
+                continue
 
             if (existing_document['data_hash'] == values['data_hash'] and
                 existing_document['metadata_hash'] == values['metadata_hash']):
@@ -284,12 +616,50 @@ def _documents_create(bucket_name, values_list, session=None):
     # Create all documents, even unchanged ones, for the current revision. This
     # makes the generation of the revision diff a lot easier.
     for values in values_list:
-        doc = _document_create(values)
-        changed_documents.append(doc)
+        document = models.Document()
+        document.update(values)
+        changed_documents.append(document)
 
     return changed_documents
 
 
+def _get_existing_documents(keys, session):
+    """Return the most recently created, non-deleted document with each of the
+    (schema, name) ``keys``, in any revision.
+
+    The documents are looked up with one query per ``_MAX_IN_CLAUSE_SIZE``
+    names rather than one query per document, and only the columns needed to
+    detect conflicts and unchanged documents are loaded.
+
+    :returns: Dictionary keyed with (schema, name), with dictionaries with the
+        ``schema``, ``name``, ``bucket_name``, ``data_hash``,
+        ``metadata_hash``, ``revision_id`` and ``orig_revision_id`` of the
+        documents found.
+    """
+    columns = (models.Document.schema, models.Document.name,
+               models.Bucket.name.label('bucket_name'),
+               models.Document.data_hash, models.Document.metadata_hash,
+               models.Document.revision_id, models.Document.orig_revision_id)
+    names = sorted(set(name for _, name in keys))
+    existing_documents = {}
+
+    for idx in range(0, len(names), _MAX_IN_CLAUSE_SIZE):
+        documents = session.query(*columns)\
+            .join(models.Bucket,
+                  models.Bucket.id == models.Document.bucket_id)\
+            .filter(models.Document.name.in_(
+                names[idx:idx + _MAX_IN_CLAUSE_SIZE]))\
+            .filter(models.Document.deleted == sa.false())\
+            .order_by(models.Document.created_at.desc(),
+                      models.Document.id.desc())
+        for document in documents:
+            key = (document.schema, document.name)
+            if key in keys and key not in existing_documents:
+                existing_documents[key] = document._asdict()
+
+    return existing_documents
+
+
 def _fill_in_metadata_defaults(values):
     values['_metadata'] = values.pop('metadata')
     values['name'] = values['_metadata']['name']
@@ -311,6 +681,27 @@ def _make_hash(data):
         json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
 
 
+def _make_bucket_digests(documents):
+    """Compute the digest of each bucket from its documents' hashes.
+
+    :param documents: Iterable of (bucket_name, schema, name, data_hash,
+        metadata_hash) tuples for the non-deleted documents in a revision.
+    :returns: Dictionary of bucket digests keyed with bucket name. Buckets
+        without any documents are omitted.
+    """
+    buckets = {}
+    for bucket_name, schema, name, data_hash, metadata_hash in documents:
+        # NOTE: Validation policies are ignored by revision diffing, as
+        # they are allowed to exist in multiple buckets.
+        if schema.startswith(types.VALIDATION_POLICY_SCHEMA):
+            continue
+        buckets.setdefault(bucket_name, []).append(
+            (schema, name, data_hash, metadata_hash))
+    return {bucket_name: _make_hash(sorted(entries))
+            for bucket_name, entries in buckets.items()}
+
+
+@_api_call
 def document_get(session=None, raw_dict=False, **filters):
     """Retrieve a document from the DB.
 
@@ -349,6 +740,7 @@ def document_get(session=None, raw_dict=False, **filters):
     raise errors.DocumentNotFound(document=filters)
 
 
+@_api_call
 def document_get_all(session=None, raw_dict=False, revision_id=None,
                      **filters):
     """Retrieve all documents for ``revision_id`` that match ``filters``.
@@ -402,6 +794,7 @@ def document_get_all(session=None, raw_dict=False, revision_id=None,
 ####################
 
 
+@_api_call
 def bucket_get_or_create(bucket_name, session=None):
     """Retrieve or create bucket.
 
@@ -421,7 +814,7 @@ def bucket_get_or_create(bucket_name, session=None):
             .one()
     except sa_orm.exc.NoResultFound:
         bucket = models.Bucket()
-        with session.begin():
+        with session.begin(subtransactions=True):
             bucket.update({'name': bucket_name})
             bucket.save(session=session)
 
@@ -431,6 +824,18 @@ def bucket_get_or_create(bucket_name, session=None):
 ####################
 
 
+def _revision_query(session):
+    """Query revisions along with their documents, the documents' buckets and
+    their tags, all of which ``Revision.to_dict`` needs, so that converting
+    the revisions doesn't issue further queries for each revision.
+    """
+    return session.query(models.Revision).options(
+        sa_orm.subqueryload(models.Revision.documents)
+        .joinedload(models.Document.bucket),
+        sa_orm.subqueryload(models.Revision.tags))
+
+
+@_api_call
 def revision_create(session=None):
     """Create a revision.
 
@@ -440,12 +845,14 @@ def revision_create(session=None):
     session = session or get_session()
 
     revision = models.Revision()
-    with session.begin():
+    with session.begin(subtransactions=True):
         revision.save(session=session)
 
     return revision.to_dict()
 
 
+@_api_call
+@read_after_write
 def revision_get(revision_id=None, session=None):
     """Return the specified `revision_id`.
 
@@ -457,18 +864,60 @@ def revision_get(revision_id=None, session=None):
     session = session or get_session()
 
     try:
-        revision = session.query(models.Revision)\
+        revision = _revision_query(session)\
             .filter_by(id=revision_id)\
             .one()\
             .to_dict()
     except sa_orm.exc.NoResultFound:
         raise errors.RevisionNotFound(revision=revision_id)
 
+    _remember_revision_exists(revision['id'])
     revision['documents'] = _update_revision_history(revision['documents'])
+    revision['summary'] = _revision_get_summary(
+        revision['id'], revision['summary'], session)
 
     return revision
 
 
+@_api_call
+@read_after_write
+def revision_get_summary(revision_id, session=None):
+    """Return the summary of the specified `revision_id`.
+
+    Unlike :func:`revision_get`, the revision's documents are not loaded.
+
+    :param revision_id: The ID corresponding to the ``Revision`` object.
+    :param session: Database session object.
+    :returns: Dictionary with the ``id``, ``created_at``, ``tags`` and
+        ``summary`` of the revision.
+    :raises: RevisionNotFound if the revision was not found.
+    """
+    session = session or get_session()
+
+    try:
+        revision = session.query(models.Revision.id,
+                                 models.Revision.created_at,
+                                 models.Revision.summary)\
+            .filter_by(id=revision_id)\
+            .one()
+    except sa_orm.exc.NoResultFound:
+        raise errors.RevisionNotFound(revision=revision_id)
+
+    return _make_revision_summary(revision, session)
+
+
+def _make_revision_summary(revision, session):
+    summary = _revision_get_summary(revision.id, revision.summary, session)
+    return {
+        'id': revision.id,
+        'created_at': revision.created_at.isoformat(),
+        'tags': [{'tag': tag} for tag in summary['tags']],
+        'summary': summary
+    }
+
+
+@_api_call
+@read_after_write
 def revision_get_latest(session=None):
     """Return the latest revision.
 
@@ -478,7 +927,7 @@ def revision_get_latest(session=None):
     """
     session = session or get_session()
 
-    latest_revision = session.query(models.Revision)\
+    latest_revision = _revision_query(session)\
         .order_by(models.Revision.created_at.desc())\
         .first()
     if not latest_revision:
@@ -492,6 +941,312 @@ def revision_get_latest(session=None):
     return latest_revision
 
 
+@_api_call
+@read_after_write
+def revision_get_digest(revision_id, include_history=True,
+                        include_tags=False, session=None):
+    """Return a digest of the contents of the specified `revision_id`.
+
+    Only the identifiers and content hashes of documents are queried, never
+    the documents themselves, so this is much cheaper than retrieving the
+    revision or its documents. Because documents are never modified once
+    written, the digest only changes if the revision is deleted and its ID
+    reused (or if its tags change, when ``include_tags`` is ``True``).
+
+    :param revision_id: The ID corresponding to the ``Revision`` object.
+    :param include_history: Include the documents from all prior revisions,
+        mirroring :func:`revision_get_documents`. Default is ``True``.
+    :param include_tags: Include the revision's tags. Default is ``False``.
+    :param session: Database session object.
+    :returns: Hex digest of the revision's contents.
+    :raises: RevisionNotFound if the revision was not found.
+    """
+    session = session or get_session()
+
+    try:
+        revision = session.query(models.Revision.id,
+                                  models.Revision.created_at)\
+            .filter_by(id=revision_id)\
+            .one()
+    except sa_orm.exc.NoResultFound:
+        raise errors.RevisionNotFound(revision=revision_id)
+
+    query = session.query(models.Document.id, models.Document.data_hash,
+                          models.Document.metadata_hash)
+    if include_history:
+        query = query.join(
+            models.Revision,
+            models.Revision.id == models.Document.revision_id)\
+            .filter(models.Revision.created_at <= revision.created_at)
+    else:
+        query = query.filter(models.Document.revision_id == revision.id)
+
+    digest = hashlib.sha256()
+    digest.update(('%s:%s' % (revision.id, revision.created_at.isoformat())
+                   ).encode('utf-8'))
+    for document in query.order_by(models.Document.id):
+        digest.update(('|%s:%s:%s' % tuple(document)).encode('utf-8'))
+
+    if include_tags:
+        tags = session.query(models.RevisionTag.tag, models.RevisionTag.data)\
+            .filter_by(revision_id=revision.id)\
+            .order_by(models.RevisionTag.tag)
+        for tag, data in tags:
+            digest.update(('|%s:%s' % (tag, _make_hash(data))).encode(
+                'utf-8'))
+
+    return digest.hexdigest()
+
+
+@_api_call
+@read_after_write
+def revision_get_latest_digest(session=None):
+    """Return a digest identifying the latest revision.
+
+    Only the ID and creation time of the latest revision are queried. As
+    revisions are immutable, they are enough to tell it apart from any other
+    revision.
+
+    :param session: Database session object.
+    :returns: Hex digest of the latest revision, or ``None`` if there is no
+        revision.
+    """
+    session = session or get_session()
+
+    latest_revision = session.query(models.Revision.id,
+                                    models.Revision.created_at)\
+        .order_by(models.Revision.created_at.desc())\
+        .first()
+    if not latest_revision:
+        return None
+    return _make_hash([latest_revision.id,
+                       latest_revision.created_at.isoformat()])
+
+
+@_api_call
+@read_after_write
+def revision_latest_has_encrypted_documents(session=None):
+    """Return whether the latest revision has encrypted documents.
+
+    Only the ID of the latest revision and the metadata of those of its
+    documents that could be encrypted are queried.
+
+    :param session: Database session object.
+    :returns: True if any document in the latest revision has an
+        ``encrypted`` storage policy, else False.
+    :raises: RevisionNotFound if the latest revision was not found.
+    """
+    session = session or get_session()
+
+    latest_revision = session.query(models.Revision.id)\
+        .order_by(models.Revision.created_at.desc())\
+        .first()
+    if not latest_revision:
+        raise errors.RevisionNotFound(revision='latest')
+
+    # The metadata is stored as serialized JSON, so it is first filtered in
+    # the database and only the remaining candidates are inspected.
+    candidates = session.query(models.Document._metadata)\
+        .filter(models.Document.revision_id == latest_revision.id,
+                sa.type_coerce(models.Document._metadata, sa.Text)
+                .like('%encrypted%'))
+    return any(metadata.get('storagePolicy') == 'encrypted'
+               for metadata, in candidates)
+
+
+def _revision_get_document_hashes(revision_created_at, session,
+                                  bucket_names=None):
+    """Return the hashes of the documents in a revision.
+
+    Considers the latest version of each document, as of the revision
+    created at ``revision_created_at``, that hasn't been deleted. Only the
+    ID and hash columns are queried.
+
+    :param bucket_names: Only consider documents in these buckets, if
+        specified.
+    :returns: Dictionary keyed with (schema, name), with (id, bucket_name,
+        data_hash, metadata_hash) values.
+    """
+    documents = session.query(
+        models.Document.id, models.Document.schema, models.Document.name,
+        models.Document.data_hash, models.Document.metadata_hash,
+        models.Document.deleted, models.Bucket.name)\
+        .join(models.Revision,
+              models.Revision.id == models.Document.revision_id)\
+        .join(models.Bucket, models.Bucket.id == models.Document.bucket_id)\
+        .filter(models.Revision.created_at <= revision_created_at)
+    if bucket_names is not None:
+        documents = documents.filter(models.Bucket.name.in_(bucket_names))
+
+    latest = {}
+    for (document_id, schema, name, data_hash, metadata_hash, deleted,
+         bucket_name) in documents.order_by(models.Revision.created_at,
+                                            models.Document.id):
+        latest[(schema, name)] = (
+            None if deleted else
+            (document_id, bucket_name, data_hash, metadata_hash))
+
+    return {k: v for k, v in latest.items() if v is not None}
+
+
+def _revision_compute_bucket_digests(revision_created_at, session):
+    """Compute the bucket digests of a revision from document hashes."""
+    document_hashes = _revision_get_document_hashes(
+        revision_created_at, session)
+    return _make_bucket_digests(
+        (bucket_name, schema, name, data_hash, metadata_hash)
+        for (schema, name), (_, bucket_name, data_hash, metadata_hash)
+        in document_hashes.items())
+
+
+def _revision_set_digests(revision_id, bucket_digests, session):
+    with session.begin(subtransactions=True):
+        session.query(models.Revision)\
+            .filter_by(id=revision_id)\
+            .update({'bucket_digests': bucket_digests,
+                     'digest': _make_hash(bucket_digests)},
+                    synchronize_session=False)
+
+
+def _revision_get_bucket_digests(revision_id, session):
+    """Return the ``created_at`` and bucket digests of a revision.
+
+    Digests are computed and stored for revisions created before they were
+    recorded at write time.
+
+    :raises: RevisionNotFound if the revision was not found.
+    """
+    try:
+        revision = session.query(models.Revision.id,
+                                 models.Revision.created_at,
+                                 models.Revision.bucket_digests,
+                                 models.Revision.digest)\
+            .filter_by(id=revision_id)\
+            .one()
+    except sa_orm.exc.NoResultFound:
+        raise errors.RevisionNotFound(revision=revision_id)
+
+    bucket_digests = revision.bucket_digests
+    if revision.digest is None:
+        bucket_digests = _revision_compute_bucket_digests(
+            revision.created_at, session)
+        _revision_set_digests(revision.id, bucket_digests,
+                              _get_primary_session(session))
+
+    return revision.created_at, bucket_digests
+
+
+def _revision_compute_summary(revision_id, session):
+    """Summarize the buckets, validation policies and tags of a revision.
+
+    Only the revision's validation policies are loaded; its other documents
+    are counted by the database.
+    """
+    buckets = session.query(
+        models.Bucket.name,
+        sa.func.count(sa.case([(models.Document.deleted, None)],
+                              else_=models.Document.id)))\
+        .join(models.Document, models.Document.bucket_id == models.Bucket.id)\
+        .filter(models.Document.revision_id == revision_id)\
+        .group_by(models.Bucket.name)
+
+    validation_policies = []
+    for document_id, name, data in session.query(
+            models.Document.id, models.Document.name, models.Document.data)\
+            .filter(models.Document.revision_id == revision_id,
+                    models.Document.schema.startswith(
+                        types.VALIDATION_POLICY_SCHEMA),
+                    models.Document.deleted == sa.false())\
+            .order_by(models.Document.id):
+        try:
+            status = data['validations'][0]['status']
+        except (KeyError, IndexError):
+            status = 'unknown'
+        validation_policies.append(
+            {'id': document_id, 'name': name, 'status': status})
+
+    return {
+        'buckets': dict(buckets),
+        'validation_policies': validation_policies,
+        'tags': _revision_get_tag_names(revision_id, session)
+    }
+
+
+def _revision_get_tag_names(revision_id, session):
+    return [t.tag for t in session.query(models.RevisionTag.tag)
+            .filter_by(revision_id=revision_id)
+            .order_by(models.RevisionTag.tag)]
+
+
+def _revision_update_summary(revision_id, session, tags_only=False):
+    """Compute and store the summary of a revision.
+
+    :param tags_only: Only recompute the tags of the summary, if the revision
+        already has one.
+    :returns: The revision's summary.
+    """
+    with session.begin(subtransactions=True):
+        # Lock the revision so that concurrent updates are serialized.
+        summary = session.query(models.Revision.summary)\
+            .filter_by(id=revision_id)\
+            .with_for_update()\
+            .scalar()
+        if tags_only and summary:
+            summary = dict(summary,
+                           tags=_revision_get_tag_names(revision_id, session))
+        else:
+            summary = _revision_compute_summary(revision_id, session)
+        session.query(models.Revision)\
+            .filter_by(id=revision_id)\
+            .update({'summary': summary}, synchronize_session=False)
+    return summary
+
+
+def _revision_get_summary(revision_id, summary, session):
+    # Summaries are computed and stored for revisions created before they
+    # were maintained at write time.
+    return summary or _revision_update_summary(
+        revision_id, _get_primary_session(session))
+
+
+def _revision_lock_latest(session):
+    """Lock the latest revision, to serialize the creation of revisions.
+
+    Must be called at the start of the transaction creating a revision, so
+    that the revision is based on the latest one. If another revision was
+    committed while waiting for the lock, that one is locked instead.
+
+    :returns: The ``id``, ``created_at``, ``bucket_digests`` and ``digest``
+        of the latest revision, or ``None`` if there is none.
+    """
+    locked_revision = None
+    while True:
+        latest_revision = session.query(models.Revision.id,
+                                        models.Revision.created_at,
+                                        models.Revision.bucket_digests,
+                                        models.Revision.digest)\
+            .order_by(models.Revision.created_at.desc(),
+                      models.Revision.id.desc())\
+            .with_for_update()\
+            .first()
+        if (latest_revision is None or (
+                locked_revision and locked_revision.id == latest_revision.id)):
+            return latest_revision
+        locked_revision = latest_revision
+
+
+def _revision_get_latest_bucket_digests(latest_revision, session):
+    """Return the bucket digests of the revision locked with
+    ``_revision_lock_latest``.
+    """
+    if not latest_revision:
+        return {}
+    if latest_revision.digest is None:
+        return _revision_compute_bucket_digests(
+            latest_revision.created_at, session)
+    return dict(latest_revision.bucket_digests)
+
+
 def require_revision_exists(f):
     """Decorator to require the specified revision to exist.
 
@@ -501,11 +1256,36 @@ def require_revision_exists(f):
     @functools.wraps(f)
     def wrapper(revision_id=None, *args, **kwargs):
         if revision_id:
-            revision_get(revision_id)
+            _revision_check_exists(revision_id)
         return f(revision_id, *args, **kwargs)
     return wrapper
 
 
+def _remember_revision_exists(revision_id):
+    if _REQUEST_SCOPE.active:
+        _REQUEST_SCOPE.revision_ids.add(str(revision_id))
+
+
+def _revision_check_exists(revision_id, session=None):
+    """Raise RevisionNotFound unless the revision exists.
+
+    Within a request scope, a revision is only looked up the first time.
+    """
+    if _REQUEST_SCOPE.active:
+        known = str(revision_id) in _REQUEST_SCOPE.revision_ids
+        metrics.cache_lookup('revision_exists', known)
+        if known:
+            return
+
+    session = session or get_session()
+    if not session.query(
+            session.query(models.Revision)
+            .filter_by(id=revision_id)
+            .exists()).scalar():
+        raise errors.RevisionNotFound(revision=revision_id)
+    _remember_revision_exists(revision_id)
+
+
 def _update_revision_history(documents):
     # Since documents that are unchanged across revisions need to be saved for
     # each revision, we need to ensure that the original revision is shown
@@ -579,6 +1359,7 @@ def _apply_filters(dct, **filters):
     return True
 
 
+@_api_call
 def revision_get_all(session=None, **filters):
     """Return list of all revisions.
 
@@ -586,7 +1367,7 @@ def revision_get_all(session=None, **filters):
     :returns: List of dictionary representations of retrieved revisions.
     """
     session = session or get_session()
-    revisions = session.query(models.Revision)\
+    revisions = _revision_query(session)\
         .all()
 
     result = []
@@ -595,11 +1376,40 @@ def revision_get_all(session=None, **filters):
         if _apply_filters(revision_dict, **filters):
             revision_dict['documents'] = _update_revision_history(
                 revision_dict['documents'])
+            revision_dict['summary'] = _revision_get_summary(
+                revision_dict['id'], revision_dict['summary'], session)
             result.append(revision_dict)
 
     return result
 
 
+@_api_call
+def revision_get_all_summaries(session=None, **filters):
+    """Return the summaries of all revisions.
+
+    Unlike :func:`revision_get_all`, the revisions' documents are not loaded.
+
+    :param session: Database session object.
+    :param filters: Key-value pairs used for filtering out revisions.
+    :returns: List of dictionaries with the ``id``, ``created_at``, ``tags``
+        and ``summary`` of each revision.
+    """
+    session = session or get_session()
+    revisions = session.query(models.Revision.id,
+                              models.Revision.created_at,
+                              models.Revision.summary)\
+        .order_by(models.Revision.created_at, models.Revision.id)
+
+    result = []
+    for revision in revisions.all():
+        revision_dict = _make_revision_summary(revision, session)
+        if _apply_filters(revision_dict, **filters):
+            result.append(revision_dict)
+
+    return result
+
+
+@_api_call
 def revision_delete_all(session=None):
     """Delete all revisions.
 
@@ -609,23 +1419,28 @@ def revision_delete_all(session=None):
     session = session or get_session()
     session.query(models.Revision)\
         .delete(synchronize_session=False)
+    _REQUEST_SCOPE.revision_ids.clear()
 
 
 def _exclude_deleted_documents(documents):
     """Excludes all documents with ``deleted=True`` field including all
     documents earlier in the revision history with the same `metadata.name`
     and `schema` from ``documents``.
+
+    A document is excluded if it was created no later than the most recent
+    deletion of a document with the same ``schema`` and ``metadata.name``,
+    which is found with a single pass over ``documents``.
     """
-    for doc in copy.copy(documents):
+    tombstones = {}
+    for doc in documents:
         if doc['deleted']:
-            docs_to_delete = [
-                d for d in documents if
-                    (d['schema'], d['name']) == (doc['schema'], doc['name'])
-                    and d['created_at'] <= doc['deleted_at']
-            ]
-            for d in list(docs_to_delete):
-                documents.remove(d)
-    return documents
+            key = (doc['schema'], doc['name'])
+            if key not in tombstones or tombstones[key] < doc['deleted_at']:
+                tombstones[key] = doc['deleted_at']
+
+    return [d for d in documents
+            if (d['schema'], d['name']) not in tombstones or
+            d['created_at'] > tombstones[(d['schema'], d['name'])]]
 
 
 def _filter_revision_documents(documents, unique_only, **filters):
@@ -665,6 +1480,8 @@ def _filter_revision_documents(documents, unique_only, **filters):
     return sorted(filtered_documents.values(), key=lambda d: d['created_at'])
 
 
+@_api_call
+@read_after_write
 @require_revision_exists
 def revision_get_documents(revision_id=None, include_history=True,
                            unique_only=True, session=None, **filters):
@@ -689,12 +1506,12 @@ def revision_get_documents(revision_id=None, include_history=True,
 
     try:
         if revision_id:
-            revision = session.query(models.Revision)\
+            revision = _revision_query(session)\
                 .filter_by(id=revision_id)\
                 .one()
         else:
             # If no revision_id is specified, grab the latest one.
-            revision = session.query(models.Revision)\
+            revision = _revision_query(session)\
                 .order_by(models.Revision.created_at.desc())\
                 .first()
 
@@ -702,7 +1519,7 @@ def revision_get_documents(revision_id=None, include_history=True,
                               if revision else [])
 
         if include_history and revision:
-            older_revisions = session.query(models.Revision)\
+            older_revisions = _revision_query(session)\
                 .filter(models.Revision.created_at < revision.created_at)\
                 .order_by(models.Revision.created_at)\
                 .all()
@@ -723,8 +1540,10 @@ def revision_get_documents(revision_id=None, include_history=True,
 
 
 # NOTE(fmontei): No need to include `@require_revision_exists` decorator as
-# the this function immediately calls `revision_get_documents` for both
-# revision IDs, which has the decorator applied to it.
+# the this function immediately retrieves the digests for both revision IDs,
+# which raises `RevisionNotFound` if either doesn't exist.
+@_api_call
+@read_after_write
 def revision_diff(revision_id, comparison_revision_id):
     """Generate the diff between two revisions.
 
@@ -770,36 +1589,17 @@ def revision_diff(revision_id, comparison_revision_id):
         # GET /api/v1.0/revisions/0/diff/0
         {}
     """
-    # Retrieve document history for each revision. Since `revision_id` of 0
-    # doesn't exist, treat it as a special case: empty list.
-    docs = (revision_get_documents(revision_id,
-                                   include_history=True,
-                                   unique_only=False)
-            if revision_id != 0 else [])
-    comparison_docs = (revision_get_documents(comparison_revision_id,
-                                              include_history=True,
-                                              unique_only=False)
-                       if comparison_revision_id != 0 else [])
-
-    # Remove each deleted document and its older counterparts because those
-    # documents technically don't exist.
-    for documents in (docs, comparison_docs):
-        documents = _exclude_deleted_documents(documents)
-
-    revision = revision_get(revision_id) if revision_id != 0 else None
-    comparison_revision = (revision_get(comparison_revision_id)
-                           if comparison_revision_id != 0 else None)
-
-    # Each dictionary below, keyed with the bucket's name, references the list
-    # of documents related to each bucket.
-    buckets = {}
-    comparison_buckets = {}
-    for doc in docs:
-        buckets.setdefault(doc['bucket_name'], [])
-        buckets[doc['bucket_name']].append(doc)
-    for doc in comparison_docs:
-        comparison_buckets.setdefault(doc['bucket_name'], [])
-        comparison_buckets[doc['bucket_name']].append(doc)
+    session = get_session()
+
+    # Only the bucket digests recorded for each revision are compared; no
+    # documents are loaded. Since `revision_id` of 0 doesn't exist, treat it
+    # as a special case: no buckets.
+    created_at, buckets = (
+        _revision_get_bucket_digests(revision_id, session)
+        if revision_id != 0 else (None, {}))
+    comparison_created_at, comparison_buckets = (
+        _revision_get_bucket_digests(comparison_revision_id, session)
+        if comparison_revision_id != 0 else (None, {}))
 
     # `shared_buckets` references buckets shared by both `revision_id` and
     # `comparison_revision_id` -- i.e. their intersection.
@@ -812,31 +1612,21 @@ def revision_diff(revision_id, comparison_revision_id):
 
     result = {}
 
-    def _compare_buckets(b1, b2):
-        # Checks whether buckets' documents are identical.
-        return (sorted([(d['data_hash'], d['metadata_hash']) for d in b1]) ==
-                sorted([(d['data_hash'], d['metadata_hash']) for d in b2]))
-
-    # If the list of documents for each bucket is indentical, then the result
+    # If the digests of the bucket's documents are identical, then the result
     # is "unmodified", else "modified".
     for bucket_name in shared_buckets:
-        unmodified = _compare_buckets(buckets[bucket_name],
-                                      comparison_buckets[bucket_name])
+        unmodified = buckets[bucket_name] == comparison_buckets[bucket_name]
         result[bucket_name] = 'unmodified' if unmodified else 'modified'
 
     for bucket_name in unshared_buckets:
-        # If neither revision has documents, then there's nothing to compare.
-        # This is always True for revision_id == comparison_revision_id == 0.
-        if not any([revision, comparison_revision]):
-            break
         # Else if one revision == 0 and the other revision != 0, then the
         # bucket has been created. Which is zero or non-zero doesn't matter.
-        elif not all([revision, comparison_revision]):
+        if not all([created_at, comparison_created_at]):
             result[bucket_name] = 'created'
         # Else if `revision` is newer than `comparison_revision`, then if the
         # `bucket_name` isn't in the `revision` buckets, then it has been
         # deleted. Otherwise it has been created.
-        elif revision['created_at'] > comparison_revision['created_at']:
+        elif created_at > comparison_created_at:
             if bucket_name not in buckets:
                 result[bucket_name] = 'deleted'
             elif bucket_name not in comparison_buckets:
@@ -853,9 +1643,103 @@ def revision_diff(revision_id, comparison_revision_id):
     return result
 
 
+@_api_call
+@read_after_write
+def revision_diff_documents(revision_id, comparison_revision_id, limit=None,
+                            offset=0):
+    """Generate the document-level diff between two revisions.
+
+    The older of the two revisions is diffed against the newer one, so, like
+    :func:`revision_diff`, the order of the two revision IDs doesn't matter.
+    Revision 0 stands for an empty revision.
+
+    The work is kept proportional to what has changed: buckets with identical
+    digests are skipped entirely, documents are compared using their stored
+    hashes, and only the changed documents within the requested page are
+    loaded.
+
+    :param revision_id: ID of the first revision.
+    :param comparison_revision_id: ID of the second revision.
+    :param limit: Maximum number of documents to return. All documents are
+        returned if ``None``.
+    :param offset: Number of documents to skip.
+    :returns: Dictionary with the total ``count`` of documents that differ
+        and the ``results`` within the requested page, ordered by bucket,
+        schema and name. Each result has a ``status`` of "added", "removed"
+        or "changed", along with the ``bucket_name``, ``schema`` and
+        ``name`` of the document. For "changed" documents, ``old`` and
+        ``new`` hold the ``data``, ``metadata``, ``data_hash`` and
+        ``metadata_hash`` of each version.
+    :raises: RevisionNotFound if either revision was not found.
+    """
+    session = get_session()
+
+    revisions = []
+    for rev_id in (revision_id, comparison_revision_id):
+        if rev_id == 0:
+            revisions.append((None, {}))
+        else:
+            revisions.append(_revision_get_bucket_digests(rev_id, session))
+    # Diff from the older revision to the newer one. Revision 0 is oldest.
+    revisions.sort(key=lambda r: (r[0] is not None, r[0]))
+    (old_created_at, old_buckets), (new_created_at, new_buckets) = revisions
+
+    changed_buckets = [
+        b for b in set(old_buckets).union(new_buckets)
+        if old_buckets.get(b) != new_buckets.get(b)]
+
+    old_hashes, new_hashes = [
+        _revision_get_document_hashes(created_at, session,
+                                      bucket_names=changed_buckets)
+        if created_at and changed_buckets else {}
+        for created_at in (old_created_at, new_created_at)]
+
+    differences = []
+    for key in set(old_hashes).union(new_hashes):
+        if key[0].startswith(types.VALIDATION_POLICY_SCHEMA):
+            continue
+        old, new = old_hashes.get(key), new_hashes.get(key)
+        if old is None:
+            status, bucket_name = 'added', new[1]
+        elif new is None:
+            status, bucket_name = 'removed', old[1]
+        elif old[1:] != new[1:]:
+            status, bucket_name = 'changed', new[1]
+        else:
+            continue
+        differences.append((bucket_name, key[0], key[1], status, old, new))
+    differences.sort()
+
+    page = differences[offset:offset + limit if limit is not None else None]
+
+    # Only load the bodies of the changed documents within the page.
+    document_ids = [d[i][0] for d in page if d[3] == 'changed' for i in (4, 5)]
+    bodies = {}
+    if document_ids:
+        for document_id, data, metadata in session.query(
+                models.Document.id, models.Document.data,
+                models.Document._metadata)\
+                .filter(models.Document.id.in_(document_ids)):
+            bodies[document_id] = {'data': data, 'metadata': metadata}
+
+    results = []
+    for bucket_name, schema, name, status, old, new in page:
+        result = {'bucket_name': bucket_name, 'schema': schema, 'name': name,
+                  'status': status}
+        if status == 'changed':
+            for attr, version in (('old', old), ('new', new)):
+                result[attr] = dict(bodies[version[0]],
+                                    data_hash=version[2],
+                                    metadata_hash=version[3])
+        results.append(result)
+
+    return {'count': len(differences), 'results': results}
+
+
 ####################
 
 
+@_api_call
 @require_revision_exists
 def revision_tag_create(revision_id, tag, data=None, session=None):
     """Create a revision tag.
@@ -884,10 +1768,14 @@ def revision_tag_create(revision_id, tag, data=None, session=None):
         resp = tag_model.to_dict()
     except db_exception.DBDuplicateEntry:
         resp = None
+    else:
+        _revision_update_summary(revision_id, session, tags_only=True)
 
     return resp
 
 
+@_api_call
+@read_after_write
 @require_revision_exists
 def revision_tag_get(revision_id, tag, session=None):
     """Retrieve tag details.
@@ -910,6 +1798,8 @@ def revision_tag_get(revision_id, tag, session=None):
     return tag.to_dict()
 
 
+@_api_call
+@read_after_write
 @require_revision_exists
 def revision_tag_get_all(revision_id, session=None):
     """Return list of tags for a revision.
@@ -928,6 +1818,7 @@ def revision_tag_get_all(revision_id, session=None):
     return [t.to_dict() for t in tags]
 
 
+@_api_call
 @require_revision_exists
 def revision_tag_delete(revision_id, tag, session=None):
     """Delete a specific tag for a revision.
@@ -943,8 +1834,10 @@ def revision_tag_delete(revision_id, tag, session=None):
                 .delete(synchronize_session=False)
     if result == 0:
         raise errors.RevisionTagNotFound(tag=tag, revision=revision_id)
+    _revision_update_summary(revision_id, session, tags_only=True)
 
 
+@_api_call
 @require_revision_exists
 def revision_tag_delete_all(revision_id, session=None):
     """Delete all tags for a revision.
@@ -957,147 +1850,380 @@ def revision_tag_delete_all(revision_id, session=None):
     session.query(models.RevisionTag)\
         .filter_by(revision_id=revision_id)\
         .delete(synchronize_session=False)
+    _revision_update_summary(revision_id, session, tags_only=True)
 
 
 ####################
 
 
-def revision_rollback(revision_id, latest_revision, session=None):
+@_api_call
+def revision_rollback(revision_id, session=None):
     """Rollback the latest revision to revision specified by ``revision_id``.
 
     Rolls back the latest revision to the revision specified by ``revision_id``
     thereby creating a new, carbon-copy revision.
 
+    The documents of the target revision are compared with those of the latest
+    revision and copied into the new revision by the database, using a single
+    ``INSERT ... SELECT`` statement in the same transaction that creates the
+    new revision. Only the summary of the new revision is returned, so none
+    of the documents are loaded into memory.
+
+    The documents are compared with those of the latest revision once it has
+    been locked, so that the comparison isn't affected by concurrent writes.
+
     :param revision_id: Revision ID to which to rollback.
-    :param latest_revision: Dictionary representation of the latest revision
-        in the system.
-    :returns: The newly created revision.
+    :returns: The summary of the newly created revision, as returned by
+        :func:`revision_get_summary`.
+    :raises: RevisionNotFound if the target revision or the latest revision
+        was not found.
+    :raises: InvalidRollback if the target revision matches the latest one.
     """
     session = session or get_session()
-    latest_revision_hashes = [
-        (d['data_hash'], d['metadata_hash'])
-        for d in latest_revision['documents']]
-
-    # If the rollback revision is the same as the latest revision, then there's
-    # no point in rolling back.
-    if latest_revision['id'] == revision_id:
-        raise errors.InvalidRollback(revision_id=revision_id)
-
-    orig_revision = revision_get(revision_id, session=session)
-
-    # A mechanism for determining whether a particular document has changed
-    # between revisions. Keyed with the document_id, the value is True if
-    # it has changed, else False.
-    doc_diff = {}
-    for orig_doc in orig_revision['documents']:
-        if ((orig_doc['data_hash'], orig_doc['metadata_hash'])
-            not in latest_revision_hashes):
-            doc_diff[orig_doc['id']] = True
-        else:
-            doc_diff[orig_doc['id']] = False
+    documents = models.Document.__table__
+    latest_documents = documents.alias('latest_documents')
 
-    # If no changes have been made between the target revision to rollback to
-    # and the latest revision, raise an exception.
-    if set(doc_diff.values()) == set([False]):
-        raise errors.InvalidRollback(revision_id=revision_id)
-
-    # Create the new revision,
-    new_revision = models.Revision()
     with session.begin():
-        new_revision.save(session=session)
+        latest_revision = _revision_lock_latest(session)
+        if latest_revision is None:
+            raise errors.RevisionNotFound(revision='latest')
+
+        # If the rollback revision is the same as the latest revision, then
+        # there's no point in rolling back.
+        if latest_revision.id == revision_id:
+            raise errors.InvalidRollback(revision_id=revision_id)
+
+        # A document is unchanged if the latest revision contains a document
+        # with the same data and metadata hashes.
+        unchanged = sa.exists().where(sa.and_(
+            latest_documents.c.revision_id == latest_revision.id,
+            latest_documents.c.data_hash == documents.c.data_hash,
+            latest_documents.c.metadata_hash == documents.c.metadata_hash))
+
+        try:
+            orig_revision = session.query(models.Revision.id)\
+                .filter_by(id=revision_id)\
+                .one()
+        except sa_orm.exc.NoResultFound:
+            raise errors.RevisionNotFound(revision=revision_id)
+
+        num_documents, num_changed = session.query(
+            sa.func.count(documents.c.id),
+            sa.func.count(sa.case([(unchanged, None)],
+                                  else_=documents.c.id)))\
+            .filter(documents.c.revision_id == orig_revision.id)\
+            .one()
 
-    # Create the documents for the revision.
-    for orig_document in orig_revision['documents']:
-        orig_document['revision_id'] = new_revision['id']
-        orig_document['_metadata'] = orig_document.pop('metadata')
+        # If no changes have been made between the target revision to rollback
+        # to and the latest revision, raise an exception.
+        if num_documents and not num_changed:
+            raise errors.InvalidRollback(revision_id=revision_id)
 
-        new_document = models.Document()
-        new_document.update({x: orig_document[x] for x in (
-            'name', '_metadata', 'data', 'data_hash', 'metadata_hash',
-            'schema', 'bucket_id')})
-        new_document['revision_id'] = new_revision['id']
+        new_revision = models.Revision()
+        new_revision.save(session=session)
 
         # If the document has changed, then use the revision_id of the new
         # revision, otherwise use the original revision_id to preserve the
         # revision history.
-        if doc_diff[orig_document['id']]:
-            new_document['orig_revision_id'] = new_revision['id']
-        else:
-            new_document['orig_revision_id'] = orig_revision['id']
-
-        with session.begin():
-            new_document.save(session=session)
-
-    new_revision = new_revision.to_dict()
-    new_revision['documents'] = _update_revision_history(
-        new_revision['documents'])
-
-    return new_revision
+        orig_revision_id = sa.case(
+            [(unchanged, sa.literal(orig_revision.id))],
+            else_=sa.literal(new_revision.id))
+        columns = ('name', 'schema', '_metadata', 'data', 'data_hash',
+                   'metadata_hash', 'is_secret', 'bucket_id')
+        copied_documents = sa.select(
+            [documents.c[x] for x in columns] + [
+                sa.literal(new_revision.id), orig_revision_id,
+                sa.literal(new_revision.created_at),
+                sa.literal(new_revision.created_at), sa.false()])\
+            .where(documents.c.revision_id == orig_revision.id)\
+            .order_by(documents.c.id)
+        session.execute(documents.insert().from_select(
+            columns + ('revision_id', 'orig_revision_id', 'created_at',
+                       'updated_at', 'deleted'),
+            copied_documents))
+
+        _revision_set_digests(
+            new_revision.id,
+            _revision_compute_bucket_digests(new_revision.created_at,
+                                             session),
+            session)
+        _revision_update_summary(new_revision.id, session)
+
+    return revision_get_summary(new_revision.id, session=session)
 
 
 ####################
 
 
+@_api_call
 @require_revision_exists
+@oslo_db_api.wrap_db_retry(max_retries=5, exception_checker=_retry_on_conflict)
 def validation_create(revision_id, val_name, val_data, session=None):
+    """Create a validation entry and update the validation's summary.
+
+    The entry's ordinal is assigned from, and the entry recorded in, the
+    summary of the validation for the revision, in the same transaction.
+
+    :param revision_id: The ID corresponding to the ``Revision`` object.
+    :param val_name: The name of the validation.
+    :param val_data: Dictionary with the ``status``, ``validator`` and
+        ``errors`` of the validation entry.
+    :param session: Database session object.
+    :returns: Dictionary representation of created validation entry.
+    """
     session = session or get_session()
+    return _validations_create(revision_id, val_name, [val_data], session)[0]
 
-    validation_kwargs = {
-        'revision_id': revision_id,
-        'name': val_name,
-        'status': val_data.get('status', None),
-        'validator': val_data.get('validator', None),
-        'errors': val_data.get('errors', []),
-    }
 
-    validation = models.Validation()
+def _validations_create(revision_id, val_name, vals_data, session):
+    """Create validation entries for ``val_name`` and update the validation's
+    summary once for all of them, in a single transaction.
+
+    :returns: List of dictionary representations of created validation
+        entries.
+    """
+    validations = []
+
+    with session.begin(subtransactions=True):
+        summary = session.query(models.ValidationSummary)\
+            .filter_by(revision_id=revision_id, name=val_name)\
+            .with_for_update()\
+            .first()
+        if summary is None:
+            summary = models.ValidationSummary()
+            summary.update({'revision_id': revision_id, 'name': val_name,
+                            'status': vals_data[0].get('status', None),
+                            'entry_count': 0})
+
+        for val_data in vals_data:
+            validation_kwargs = {
+                'revision_id': revision_id,
+                'name': val_name,
+                'status': val_data.get('status', None),
+                'validator': val_data.get('validator', None),
+                'errors': val_data.get('errors', []),
+            }
+            if validation_kwargs['status'] is not None:
+                # Prioritize 'failure' over 'success' via alphabetical
+                # ordering.
+                summary.status = (
+                    min(summary.status, validation_kwargs['status'])
+                    if summary.status else validation_kwargs['status'])
+
+            validation = models.Validation()
+            validation.update(validation_kwargs)
+            validation.ordinal = summary.entry_count
+            summary.entry_count += 1
+            validations.append(validation)
+
+        summary.save(session=session)
+        for validation in validations:
+            validation.save(session=session)
+
+    return [validation.to_dict() for validation in validations]
+
+
+def _validation_task_create(revision_id, documents, session):
+    """Queue the schema validation of ``documents`` of a revision and mark
+    its ``deckhand-schema-validation`` validation as ``pending``.
+    """
+    with session.begin(subtransactions=True):
+        task = models.ValidationTask()
+        task.update({'revision_id': revision_id,
+                     'documents': [list(d) for d in documents]})
+        task.save(session=session)
+
+        summary = session.query(models.ValidationSummary)\
+            .filter_by(revision_id=revision_id,
+                       name=types.DECKHAND_SCHEMA_VALIDATION)\
+            .with_for_update()\
+            .first()
+        if summary is None:
+            summary = models.ValidationSummary()
+            summary.update({'revision_id': revision_id,
+                            'name': types.DECKHAND_SCHEMA_VALIDATION,
+                            'entry_count': 0})
+        # 'failure' still takes priority over 'pending', as it is final.
+        summary.status = min(summary.status or 'pending', 'pending')
+        summary.save(session=session)
+
+
+@_api_call
+def validation_task_claim(timeout, session=None):
+    """Start the oldest queued validation task that isn't in progress.
+
+    A task is in progress if it was started less than ``timeout`` seconds
+    ago. Tasks are claimed with a conditional update, so that a task is only
+    started by one of the workers looking for one at the same time, even
+    across processes.
+
+    :param timeout: Time, in seconds, after which a started task that wasn't
+        completed may be started again.
+    :param session: Database session object.
+    :returns: Dictionary representation of the claimed task, whose
+        ``attempts`` include this one, or None if there is no task to start.
+    """
+    session = session or get_session()
+    now = timeutils.utcnow()
+    claimable = sa.or_(
+        models.ValidationTask.claimed_at.is_(None),
+        models.ValidationTask.claimed_at <
+        now - datetime.timedelta(seconds=timeout))
+
+    task_ids = session.query(models.ValidationTask.id)\
+        .filter(claimable)\
+        .order_by(models.ValidationTask.id)\
+        .limit(10)\
+        .all()
+    for task_id, in task_ids:
+        with session.begin():
+            claimed = session.query(models.ValidationTask)\
+                .filter(models.ValidationTask.id == task_id)\
+                .filter(claimable)\
+                .update({'claimed_at': now,
+                         'attempts': models.ValidationTask.attempts + 1},
+                        synchronize_session=False)
+        if claimed:
+            task = session.query(models.ValidationTask)\
+                .filter_by(id=task_id)\
+                .first()
+            if task is not None:
+                return task.to_dict()
+    return None
+
+
+@_api_call
+def validation_task_complete(task_id, revision_id, vals_data, session=None):
+    """Record the results of a validation task and remove it from the queue.
+
+    The entries are created under ``deckhand-schema-validation`` and the
+    status of the validation is computed again from all of its entries, in
+    the same transaction as the task's removal.
+
+    :param task_id: The ID of the completed task.
+    :param revision_id: The ID of the revision the task was queued for.
+    :param vals_data: List of dictionaries with the ``status``,
+        ``validator`` and ``errors`` of each validation entry to create.
+    :param session: Database session object.
+    :returns: Whether the results were recorded, which they aren't if the
+        task was already completed by another worker.
+    """
+    session = session or get_session()
+    val_name = types.DECKHAND_SCHEMA_VALIDATION
 
     with session.begin():
-        validation.update(validation_kwargs)
-        validation.save(session=session)
+        removed = session.query(models.ValidationTask)\
+            .filter_by(id=task_id)\
+            .delete(synchronize_session=False)
+        if not removed:
+            return False
+
+        if vals_data:
+            _validations_create(revision_id, val_name, vals_data, session)
+        status = session.query(sa.func.min(models.Validation.status))\
+            .filter_by(revision_id=revision_id, name=val_name)\
+            .scalar()
+        session.query(models.ValidationSummary)\
+            .filter_by(revision_id=revision_id, name=val_name)\
+            .update({'status': status or 'success'},
+                    synchronize_session=False)
 
-    return validation.to_dict()
+    return True
 
 
+@_api_call
+@read_after_write
 @require_revision_exists
 def validation_get_all(revision_id, session=None):
-    # Query selects only unique combinations of (name, status) from the
-    # `Validations` table and prioritizes 'failure' result over 'success'
-    # result via alphabetical ordering of the status column. Each document
-    # has its own validation but for this query we want to return the result
-    # of the overall validation for the revision. If just 1 document failed
-    # validation, we regard the validation for the whole revision as 'failure'.
-    query = raw_query("""
-        SELECT DISTINCT name, status FROM validations as v1
-            WHERE revision_id = :revision_id AND status = (
-                SELECT status FROM validations as v2
-                    WHERE v2.name = v1.name
-                    ORDER BY status
-                    LIMIT 1
-            )
-            GROUP BY name, status
-            ORDER BY name, status;
-    """, revision_id=revision_id)
-
-    result = query.fetchall()
-    return result
+    """Return the overall status of each validation for a revision.
 
+    Each validation entry has its own status, but the overall status of a
+    validation for a revision is 'failure' if just 1 entry failed.
 
+    :param revision_id: The ID corresponding to the ``Revision`` object.
+    :param session: Database session object.
+    :returns: List of (name, status) tuples, ordered by name.
+    """
+    session = session or get_session()
+
+    return session.query(models.ValidationSummary.name,
+                         models.ValidationSummary.status)\
+        .filter_by(revision_id=revision_id)\
+        .order_by(models.ValidationSummary.name)\
+        .all()
+
+
+@_api_call
+@read_after_write
+def validation_get_all_by_revisions(revision_ids, session=None):
+    """Return the overall status of each validation for many revisions.
+
+    :param revision_ids: List of IDs corresponding to ``Revision`` objects.
+    :param session: Database session object.
+    :returns: Dictionary keyed with each revision ID, whose value is the list
+        of (name, status) tuples for the revision, ordered by name.
+    :raises: RevisionNotFound if any of the revisions was not found.
+    """
+    session = session or get_session()
+    revision_ids = sorted(set(revision_ids))
+    results = {}
+
+    # The revisions are looked up ``_MAX_IN_CLAUSE_SIZE`` at a time, as the
+    # number of revision IDs requested isn't bounded.
+    for idx in range(0, len(revision_ids), _MAX_IN_CLAUSE_SIZE):
+        batch = revision_ids[idx:idx + _MAX_IN_CLAUSE_SIZE]
+
+        existing_ids = set(
+            r.id for r in session.query(models.Revision.id)
+            .filter(models.Revision.id.in_(batch)))
+        missing_ids = set(batch) - existing_ids
+        if missing_ids:
+            raise errors.RevisionNotFound(revision=min(missing_ids))
+
+        results.update((revision_id, []) for revision_id in batch)
+        summaries = session.query(models.ValidationSummary.revision_id,
+                                  models.ValidationSummary.name,
+                                  models.ValidationSummary.status)\
+            .filter(models.ValidationSummary.revision_id.in_(batch))\
+            .order_by(models.ValidationSummary.name)
+        for revision_id, name, status in summaries:
+            results[revision_id].append((name, status))
+
+    return results
+
+
+@_api_call
+@read_after_write
 @require_revision_exists
 def validation_get_all_entries(revision_id, val_name, session=None):
     session = session or get_session()
 
     entries = session.query(models.Validation)\
         .filter_by(**{'revision_id': revision_id, 'name': val_name})\
-        .order_by(models.Validation.created_at.asc())\
+        .order_by(models.Validation.ordinal)\
         .all()
 
     return [e.to_dict() for e in entries]
 
 
+@_api_call
+@read_after_write
 @require_revision_exists
 def validation_get_entry(revision_id, val_name, entry_id, session=None):
+    """Return the validation entry with ordinal ``entry_id``.
+
+    :raises: ValidationNotFound if the entry was not found.
+    """
     session = session or get_session()
-    entries = validation_get_all_entries(
-        revision_id, val_name, session=session)
-    return entries[entry_id]
+
+    try:
+        entry = session.query(models.Validation)\
+            .filter_by(revision_id=revision_id, name=val_name,
+                       ordinal=entry_id)\
+            .one()
+    except sa_orm.exc.NoResultFound:
+        raise errors.ValidationNotFound(
+            revision_id=revision_id, validation_name=val_name,
+            entry_id=entry_id)
+
+    return entry.to_dict()
@@ -0,0 +1,84 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Database schema management using Alembic migrations."""
+
+import os
+
+from alembic import command as alembic_command
+from alembic import config as alembic_config
+from alembic import migration as alembic_migration
+from alembic import script as alembic_script
+from oslo_log import log as logging
+
+from deckhand.db.sqlalchemy import api as db_api
+from deckhand import errors
+
+LOG = logging.getLogger(__name__)
+
+_SCRIPT_LOCATION = os.path.join(os.path.dirname(__file__), 'alembic')
+
+
+def _get_alembic_config(connection=None):
+    config = alembic_config.Config()
+    config.set_main_option('script_location', _SCRIPT_LOCATION)
+    if connection is not None:
+        config.attributes['connection'] = connection
+    return config
+
+
+def _get_script_heads():
+    script = alembic_script.ScriptDirectory.from_config(_get_alembic_config())
+    return set(script.get_heads())
+
+
+def db_version(engine=None):
+    """Return the schema versions the database is at.
+
+    :param engine: Engine to connect with; defaults to Deckhand's engine.
+    :returns: Set of Alembic revision identifiers, empty if the schema was
+        never created.
+    """
+    engine = engine or db_api.get_engine()
+    with engine.connect() as connection:
+        context = alembic_migration.MigrationContext.configure(connection)
+        return set(context.get_current_heads())
+
+
+def db_sync(version='heads', engine=None):
+    """Create or upgrade the database schema to ``version``.
+
+    :param version: Alembic revision to upgrade to. Defaults to the latest.
+    :param engine: Engine to connect with; defaults to Deckhand's engine.
+    """
+    engine = engine or db_api.get_engine()
+    with engine.begin() as connection:
+        alembic_command.upgrade(_get_alembic_config(connection), version)
+
+
+def check_db_version(engine=None):
+    """Check that the database schema is current.
+
+    Only the schema version recorded in the database is read, so this is
+    cheap enough to run each time a worker starts.
+
+    :param engine: Engine to connect with; defaults to Deckhand's engine.
+    :raises DatabaseNotCurrent: If the schema must be created or upgraded.
+    """
+    current, expected = db_version(engine), _get_script_heads()
+    if current != expected:
+        raise errors.DatabaseNotCurrent(
+            current=', '.join(sorted(current)) or 'none',
+            expected=', '.join(sorted(expected)))
+    LOG.debug('Database schema is at version %s.', ', '.join(current))
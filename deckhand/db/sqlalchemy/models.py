@@ -100,6 +100,16 @@ class Revision(BASE, DeckhandBase):
                              primaryjoin="Revision.id==Document.revision_id")
     tags = relationship("RevisionTag")
     validations = relationship("Validation")
+    # Aggregate digests of the revision's contents, computed when the
+    # revision is created: one per bucket, keyed with the bucket name, and
+    # one for the entire revision. They allow revisions to be diffed without
+    # loading any documents.
+    bucket_digests = Column(oslo_types.JsonEncodedDict(), nullable=True)
+    digest = Column(String(64), nullable=True)
+    # Summary of the revision's buckets, validation policies and tags,
+    # maintained whenever any of them are written, so that revisions can be
+    # shown and listed without loading their documents.
+    summary = Column(oslo_types.JsonEncodedDict(), nullable=True)
 
     def to_dict(self):
         d = super(Revision, self).to_dict()
@@ -180,6 +190,9 @@ class Document(BASE, DeckhandBase):
 
 class Validation(BASE, DeckhandBase):
     __tablename__ = 'validations'
+    __table_args__ = (
+        UniqueConstraint('revision_id', 'name', 'ordinal'),
+        DeckhandBase.__table_args__)
 
     id = Column(Integer, primary_key=True)
     name = Column(String(64), nullable=False)
@@ -189,17 +202,58 @@ class Validation(BASE, DeckhandBase):
     revision_id = Column(
         Integer, ForeignKey('revisions.id', ondelete='CASCADE'),
                             nullable=False)
+    # Zero-based position of the entry among all the entries posted for the
+    # same validation in the same revision. This is the entry's ID in the API.
+    ordinal = Column(Integer, nullable=False)
+
+
+class ValidationSummary(BASE, DeckhandBase):
+    """Aggregate status of all the entries of a validation for a revision.
+
+    Maintained whenever a validation entry is created, so that the status of
+    a revision's validations can be retrieved without scanning its entries.
+    """
+    __tablename__ = 'validation_summaries'
+
+    revision_id = Column(
+        Integer, ForeignKey('revisions.id', ondelete='CASCADE'),
+        primary_key=True)
+    name = Column(String(64), primary_key=True)
+    # The lowest status, alphabetically, of all entries: any 'failure' entry
+    # takes priority over 'success' entries.
+    status = Column(String(8), nullable=False)
+    entry_count = Column(Integer, nullable=False, default=0)
+
+
+class ValidationTask(BASE, DeckhandBase):
+    """Schema validation of documents of a revision, queued to be performed
+    by background workers after the revision was created.
+    """
+    __tablename__ = 'validation_tasks'
+
+    id = Column(Integer, primary_key=True)
+    revision_id = Column(
+        Integer, ForeignKey('revisions.id', ondelete='CASCADE'),
+        nullable=False)
+    # The [schema, name] of each document of the revision to validate.
+    documents = Column(oslo_types.JsonEncodedList(), nullable=False)
+    # When a worker last started the task, which is None until then. Tasks
+    # started too long ago are started again by another worker.
+    claimed_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
 
 
 def register_models(engine):
     """Create database tables for all models with the given engine."""
-    models = [Bucket, Document, Revision, RevisionTag, Validation]
+    models = [Bucket, Document, Revision, RevisionTag, Validation,
+              ValidationSummary, ValidationTask]
     for model in models:
         model.metadata.create_all(engine)
 
 
 def unregister_models(engine):
     """Drop database tables for all models with the given engine."""
-    models = [Bucket, Document, Revision, RevisionTag, Validation]
+    models = [Bucket, Document, Revision, RevisionTag, Validation,
+              ValidationSummary, ValidationTask]
     for model in models:
         model.metadata.drop_all(engine)
@@ -0,0 +1,179 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Profiling of the SQL statements executed via the DB API.
+
+While a profile is active in a thread, every statement executed by the thread
+is recorded in it, together with its duration and the DB API call that
+executed it. Statements executed by nested DB API calls are charged to the
+outermost call.
+
+Example::
+
+    with profiler.profile() as profile:
+        db_api.revision_get_documents(revision_id)
+    LOG.info(profile.format_report())
+"""
+
+import collections
+import contextlib
+import threading
+
+from oslo_log import log as logging
+import six
+
+LOG = logging.getLogger(__name__)
+
+_local = threading.local()
+
+Statement = collections.namedtuple(
+    'Statement',
+    ['statement', 'parameters', 'duration', 'call', 'engine', 'executemany'])
+
+
+def _get_state():
+    if not hasattr(_local, 'profiles'):
+        _local.profiles = []
+        _local.calls = []
+    return _local
+
+
+class QueryProfile(object):
+    """The SQL statements executed while the profile was active."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    @property
+    def duration(self):
+        return sum(s.duration for s in self.statements)
+
+    def by_call(self):
+        """Return the number of statements and their total duration for each
+        DB API call, in the order the calls were first made.
+        """
+        calls = collections.OrderedDict()
+        for statement in self.statements:
+            count, duration = calls.get(statement.call, (0, 0.0))
+            calls[statement.call] = (count + 1, duration + statement.duration)
+        return calls
+
+    def slowest(self, limit):
+        return sorted(self.statements, key=lambda s: s.duration,
+                      reverse=True)[:limit]
+
+    def format_report(self, slowest=5, explain=False):
+        """Format the profile for humans.
+
+        :param slowest: Number of slowest statements to include.
+        :param explain: Include the query plans of the slowest ``SELECT``
+            statements.
+        """
+        lines = ['%d statements in %.1f ms' % (
+            self.count, self.duration * 1000)]
+        for call, (count, duration) in self.by_call().items():
+            lines.append('  %s: %d statements in %.1f ms' % (
+                call or '<outside the DB API>', count, duration * 1000))
+        if slowest:
+            lines.append('Slowest statements:')
+        for statement in self.slowest(slowest):
+            lines.append('  %.1f ms in %s: %s' % (
+                statement.duration * 1000, statement.call,
+                ' '.join(statement.statement.split())))
+            if explain:
+                for line in explain_statement(statement):
+                    lines.append('    | %s' % line)
+        return '\n'.join(lines)
+
+
+def start():
+    """Start a profile in the current thread."""
+    profile = QueryProfile()
+    _get_state().profiles.append(profile)
+    return profile
+
+
+def stop():
+    """Stop the profile started last in the current thread.
+
+    :returns: The ``QueryProfile``, or None if no profile was active.
+    """
+    profiles = _get_state().profiles
+    return profiles.pop() if profiles else None
+
+
+@contextlib.contextmanager
+def profile():
+    """Profile the SQL statements executed in the ``with`` block."""
+    query_profile = start()
+    try:
+        yield query_profile
+    finally:
+        stop()
+
+
+@contextlib.contextmanager
+def api_call(name):
+    """Charge the statements executed in the ``with`` block to the DB API
+    call ``name``, unless it is nested in another DB API call.
+    """
+    state = _get_state()
+    state.calls.append(name)
+    try:
+        yield
+    finally:
+        state.calls.pop()
+
+
+def is_active():
+    return bool(getattr(_local, 'profiles', None))
+
+
+def record(engine, statement, parameters, duration, executemany):
+    """Record an executed statement in the active profiles, if any."""
+    if not is_active():
+        return
+    state = _get_state()
+    call = state.calls[0] if state.calls else None
+    executed = Statement(statement, parameters, duration, call, engine,
+                         executemany)
+    for query_profile in state.profiles:
+        query_profile.statements.append(executed)
+
+
+def explain_statement(statement):
+    """Return the lines of the query plan of ``statement``.
+
+    Only ``SELECT`` statements are explained, since explaining a statement
+    may execute it.
+    """
+    if (statement.executemany or
+            not statement.statement.lstrip()[:6].upper() == 'SELECT'):
+        return []
+    if statement.engine.dialect.name == 'sqlite':
+        explain = 'EXPLAIN QUERY PLAN '
+    else:
+        explain = 'EXPLAIN '
+    try:
+        with statement.engine.connect() as connection:
+            rows = connection.execute(
+                explain + statement.statement, statement.parameters)
+            return [' '.join(six.text_type(c) for c in row) for row in rows]
+    except Exception as e:
+        LOG.debug('Could not explain statement: %s', e)
+        return ['(could not explain statement: %s)' % e]
@@ -0,0 +1,117 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Field-level differences between documents as JSON patch operations."""
+
+import hashlib
+
+from oslo_serialization import jsonutils as json
+import six
+
+
+def _escape(key):
+    # JSON pointer escaping, per RFC 6901.
+    return six.text_type(key).replace('~', '~0').replace('/', '~1')
+
+
+def _hash_tree(node, hashes):
+    """Compute the hash of every subtree of ``node`` bottom-up.
+
+    Hashes of dictionaries and lists are stored in ``hashes``, keyed with the
+    ``id`` of the container, so that each subtree is hashed exactly once.
+    """
+    if isinstance(node, dict):
+        digest = hashlib.sha256(b'{')
+        for key in sorted(node):
+            digest.update(json.dumps(key).encode('utf-8'))
+            digest.update(_hash_tree(node[key], hashes).encode('utf-8'))
+        hashes[id(node)] = digest.hexdigest()
+        return hashes[id(node)]
+    elif isinstance(node, list):
+        digest = hashlib.sha256(b'[')
+        for item in node:
+            digest.update(_hash_tree(item, hashes).encode('utf-8'))
+        hashes[id(node)] = digest.hexdigest()
+        return hashes[id(node)]
+    return hashlib.sha256(
+        json.dumps(node, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class _Differ(object):
+
+    def __init__(self, old, new):
+        self.old_hashes = {}
+        self.new_hashes = {}
+        _hash_tree(old, self.old_hashes)
+        _hash_tree(new, self.new_hashes)
+        self.operations = []
+
+    def _is_same(self, old, new):
+        if isinstance(old, (dict, list)) and type(old) is type(new):
+            return self.old_hashes[id(old)] == self.new_hashes[id(new)]
+        return type(old) is type(new) and old == new
+
+    def diff(self, old, new, path):
+        # Identical subtrees are skipped without being traversed.
+        if self._is_same(old, new):
+            return
+
+        if isinstance(old, dict) and isinstance(new, dict):
+            for key in sorted(old):
+                child_path = '%s/%s' % (path, _escape(key))
+                if key not in new:
+                    self.operations.append(
+                        {'op': 'remove', 'path': child_path})
+                else:
+                    self.diff(old[key], new[key], child_path)
+            for key in sorted(new):
+                if key not in old:
+                    self.operations.append(
+                        {'op': 'add', 'path': '%s/%s' % (path, _escape(key)),
+                         'value': new[key]})
+        elif (isinstance(old, list) and isinstance(new, list) and
+                len(old) == len(new)):
+            for idx, (old_item, new_item) in enumerate(zip(old, new)):
+                self.diff(old_item, new_item, '%s/%d' % (path, idx))
+        else:
+            self.operations.append(
+                {'op': 'replace', 'path': path, 'value': new})
+
+
+def diff(old, new, path=''):
+    """Generate the JSON patch operations that transform ``old`` into ``new``.
+
+    Every subtree of both structures is hashed once, and subtrees with
+    identical hashes are skipped, so the cost of diffing two large, mostly
+    identical trees is proportional to their size plus the size of the
+    differences, rather than to the number of paths compared.
+
+    Lists of different lengths are replaced as a whole.
+
+    :param old: The original structure.
+    :param new: The modified structure.
+    :param path: JSON pointer prefix for the paths of the operations.
+    :returns: List of ``add``, ``remove`` and ``replace`` operations, as
+        defined by RFC 6902.
+    :rtype: list[dict]
+
+    Example::
+
+        >>> diff({'a': {'x': 1, 'y': 2}}, {'a': {'x': 1, 'z': 3}}, '/data')
+        [{'op': 'remove', 'path': '/data/a/y'},
+         {'op': 'add', 'path': '/data/a/z', 'value': 3}]
+    """
+    differ = _Differ(old, new)
+    differ.diff(old, new, path)
+    return differ.operations
@@ -22,25 +22,65 @@ from deckhand.engine import document as document_wrapper
 from deckhand.engine.schema import base_schema
 from deckhand.engine.schema import v1_0
 from deckhand import errors
+from deckhand import metrics
 from deckhand import types
 
 LOG = logging.getLogger(__name__)
 
+_VALIDATORS = {}
+
+
+def _get_validator(schema_module):
+    """Return a validator for one of Deckhand's built-in schema modules.
+
+    ``jsonschema.validate`` checks the schema against its meta-schema on every
+    call, which is wasted work for schemas that never change, so validators
+    for them are built once and reused.
+    """
+    validator = _VALIDATORS.get(schema_module.__name__)
+    metrics.cache_lookup('validator', validator is not None)
+    if validator is None:
+        schema = schema_module.schema
+        validator_cls = jsonschema.validators.validator_for(schema)
+        validator_cls.check_schema(schema)
+        validator = _VALIDATORS[schema_module.__name__] = validator_cls(schema)
+    return validator
+
+
+def preload_validators():
+    """Build the validators for all built-in schemas."""
+    _get_validator(base_schema)
+    for schema_info in DocumentValidation.SchemaType.schema_versions_info:
+        if not isinstance(schema_info['schema'], dict):
+            _get_validator(schema_info['schema'])
+
 
 class DocumentValidation(object):
 
-    def __init__(self, documents):
+    def __init__(self, documents, defer_data_schemas=False):
         """Class for document validation logic for YAML files.
 
         This class is responsible for validating YAML files according to their
         schema.
 
-        :param documents: Documents to be validated.
-        :type documents: list[dict]
+        :param documents: Documents to be validated. May also be an iterator
+            (e.g. one that parses documents incrementally from a request
+            body), in which case each document is validated as soon as it is
+            produced.
+        :type documents: list[dict] or iterator
+        :param defer_data_schemas: Whether ``validate_all`` should skip the
+            detailed validation of the documents with a schema registered via
+            a ``DataSchema`` document, which are listed in
+            ``deferred_documents`` instead, to be validated later by
+            ``validate_deferred``.
         """
-        if not isinstance(documents, (list, tuple)):
+        if isinstance(documents, dict):
             documents = [documents]
-        self.documents = [document_wrapper.Document(d) for d in documents]
+        self._raw_documents = documents
+        self._data_schemas = []
+        self._defer_data_schemas = defer_data_schemas
+        self.documents = []
+        self.deferred_documents = []
 
     class SchemaType(object):
         """Class for retrieving correct schema for pre-validation on YAML.
@@ -80,28 +120,42 @@ class DocumentValidation(object):
             '^([A-Za-z]+\/[A-Za-z]+\/v[1]{1}(\.[0]{1}){0,1})$')
 
         @classmethod
-        def _register_data_schemas(cls):
+        def get_data_schemas(cls, revision_id=None):
             """Dynamically detect schemas for document validation that have
             been registered by external services via ``DataSchema`` documents.
+
+            :param revision_id: The revision whose ``DataSchema`` documents,
+                including those created in older revisions, register the
+                schemas. If omitted, only the ``DataSchema`` documents of the
+                latest revision are used.
+            :returns: The registered schemas, in the format of
+                ``schema_versions_info``.
             """
-            data_schemas = db_api.document_get_all(
-                schema=types.DATA_SCHEMA_SCHEMA)
+            if revision_id is None:
+                data_schemas = db_api.document_get_all(
+                    schema=types.DATA_SCHEMA_SCHEMA)
+            else:
+                data_schemas = db_api.revision_get_documents(
+                    revision_id, schema=types.DATA_SCHEMA_SCHEMA,
+                    deleted=False)
 
+            registered_schemas = []
             for data_schema in data_schemas:
                 if cls.schema_re.match(data_schema['metadata']['name']):
                     schema_id = '/'.join(
                         data_schema['metadata']['name'].split('/')[:2])
                 else:
                     schema_id = data_schema['metadata']['name']
-                cls.schema_versions_info.append({
+                registered_schemas.append({
                     'id': schema_id,
                     'schema': data_schema['data'],
                     'version': '1.0',
                     'registered': True,
                 })
+            return registered_schemas
 
         @classmethod
-        def _get_schema_by_property(cls, schema_re, field):
+        def _get_schema_by_property(cls, schema_re, field, schemas):
             if schema_re.match(field):
                 schema_id = '/'.join(field.split('/')[:2])
             else:
@@ -109,7 +163,7 @@ class DocumentValidation(object):
 
             matching_schemas = []
 
-            for schema in cls.schema_versions_info:
+            for schema in schemas:
                 # Can't use `startswith` below to avoid namespace false
                 # positives like `CertificateKey` and `Certificate`.
                 if schema_id == schema['id']:
@@ -117,23 +171,28 @@ class DocumentValidation(object):
             return matching_schemas
 
         @classmethod
-        def get_schemas(cls, doc):
+        def get_schemas(cls, doc, data_schemas=None):
             """Retrieve the relevant schema based on the document's ``schema``.
 
             :param dict doc: The document used for finding the correct schema
                 to validate it based on its ``schema``.
+            :param list data_schemas: The schemas registered via
+                ``DataSchema`` documents, as returned by
+                ``get_data_schemas``. Retrieved from the database if omitted.
             :returns: A schema to be used by ``jsonschema`` for document
                 validation.
             :rtype: dict
             """
-            cls._register_data_schemas()
+            if data_schemas is None:
+                data_schemas = cls.get_data_schemas()
+            schemas = cls.schema_versions_info + data_schemas
 
             # FIXME(fmontei): Remove this once all Deckhand tests have been
             # refactored to account for dynamic schema registeration via
             # ``DataSchema`` documents. Otherwise most tests will fail.
             for doc_field in [doc['schema'], doc['metadata']['schema']]:
                 matching_schemas = cls._get_schema_by_property(
-                    cls.schema_re, doc_field)
+                    cls.schema_re, doc_field, schemas)
                 if matching_schemas:
                     return matching_schemas
 
@@ -170,7 +229,7 @@ class DocumentValidation(object):
         try:
             # Subject every document to basic validation to verify that each
             # main section is present (schema, metadata, data).
-            jsonschema.validate(raw_dict, base_schema.schema)
+            _get_validator(base_schema).validate(raw_dict)
         except jsonschema.exceptions.ValidationError as e:
             LOG.debug('Document failed top-level schema validation. Details: '
                       '%s.', e.message)
@@ -179,7 +238,8 @@ class DocumentValidation(object):
             raise errors.InvalidDocumentFormat(
                 detail=e.message, schema=e.schema)
 
-        schemas_to_use = self.SchemaType.get_schemas(raw_dict)
+        schemas_to_use = self.SchemaType.get_schemas(
+            raw_dict, self._data_schemas)
 
         if not schemas_to_use:
             LOG.debug('Document schema %s not recognized.',
@@ -190,8 +250,28 @@ class DocumentValidation(object):
             raise errors.InvalidDocumentSchema(
                 document_schema=document.get_schema(),
                 schema_list=[
-                    s['id'] for s in self.SchemaType.schema_versions_info])
-
+                    s['id'] for s in (self.SchemaType.schema_versions_info +
+                                      self._data_schemas)])
+
+        if self._can_defer(document, schemas_to_use):
+            self.deferred_documents.append(document)
+            return None
+
+        return self._validate_schemas(document, schemas_to_use)
+
+    def _can_defer(self, document, schemas_to_use):
+        # NOTE: The data of secret documents is replaced before they are
+        # stored, so they can only be validated before that.
+        return (self._defer_data_schemas and
+                not document.is_abstract() and
+                any(s.get('registered') for s in schemas_to_use) and
+                not any(document.get_schema().startswith(t)
+                        for t in types.DOCUMENT_SECRET_TYPES) and
+                document.to_dict()['metadata'].get('storagePolicy') !=
+                'encrypted')
+
+    def _validate_schemas(self, document, schemas_to_use):
+        raw_dict = document.to_dict()
         result = {'errors': []}
 
         # Perform more detailed validation on each document depending on
@@ -208,8 +288,8 @@ class DocumentValidation(object):
                         jsonschema.validate(raw_dict.get('data', {}),
                                             schema_validator)
                     else:
-                        schema_validator = schema_to_use['schema'].schema
-                        jsonschema.validate(raw_dict, schema_validator)
+                        _get_validator(schema_to_use['schema']).validate(
+                            raw_dict)
                 except jsonschema.exceptions.ValidationError as e:
                     LOG.error(
                         'Document failed schema validation for schema %s.'
@@ -256,6 +336,9 @@ class DocumentValidation(object):
                any other non-critical exceptions, which are returned together
                later.
 
+        If ``defer_data_schemas`` was requested, the second stage is skipped
+        for the documents listed in ``deferred_documents``.
+
         :returns: A list of validations (one for each document validated).
         :rtype: list[dict]
         :raises errors.InvalidDocumentFormat: If the document failed schema
@@ -264,10 +347,52 @@ class DocumentValidation(object):
             found for executing document validation.
         """
         validation_results = []
-
-        for document in self.documents:
+        # Retrieve the registered schemas once rather than for each document.
+        self._data_schemas = self.SchemaType.get_data_schemas()
+
+        # NOTE: Documents are wrapped and validated one at a time so that, if
+        # they are being parsed incrementally, a critical failure is raised
+        # before the remaining documents are read.
+        for raw_document in self._raw_documents:
+            document = document_wrapper.Document(raw_document)
             result = self._validate_one(document)
-            validation_results.append(result)
+            self.documents.append(document)
+            if result is not None:
+                validation_results.append(result)
 
         validations = self._format_validation_results(validation_results)
         return validations
+
+    def validate_deferred(self, revision_id):
+        """Perform the detailed validation of documents deferred by
+        ``validate_all``.
+
+        The documents are expected to have passed ``validate_all`` already, so
+        documents whose schema isn't recognized, because the ``DataSchema``
+        documents registering it were deleted in the meantime, are reported as
+        failures rather than raising an exception.
+
+        :param revision_id: The revision the documents were created in, whose
+            ``DataSchema`` documents are used.
+        :returns: A list of validations (one for each document validated).
+        :rtype: list[dict]
+        """
+        validation_results = []
+        self._data_schemas = self.SchemaType.get_data_schemas(revision_id)
+
+        for raw_document in self._raw_documents:
+            document = document_wrapper.Document(raw_document)
+            schemas_to_use = self.SchemaType.get_schemas(
+                document.to_dict(), self._data_schemas)
+            if schemas_to_use:
+                result = self._validate_schemas(document, schemas_to_use)
+            else:
+                result = {'status': 'failure', 'errors': [{
+                    'schema': document.get_schema(),
+                    'name': document.get_name(),
+                    'message': 'The schema of the document is not '
+                               'recognized.'}]}
+            self.documents.append(document)
+            validation_results.append(result)
+
+        return self._format_validation_results(validation_results)
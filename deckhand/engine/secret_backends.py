@@ -0,0 +1,158 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Storage backends for the payloads of encrypted documents."""
+
+import abc
+import threading
+
+from oslo_log import log as logging
+from oslo_serialization import jsonutils as json
+import six
+
+from deckhand.conf import config
+from deckhand import errors
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+_BACKEND = None
+_LOCK = threading.Lock()
+
+
+@six.add_metaclass(abc.ABCMeta)
+class SecretStorageBackend(object):
+    """Interface for storing and retrieving secret payloads.
+
+    A backend receives the payload of a document with
+    ``metadata.storagePolicy`` = "encrypted" and returns a reference which
+    Deckhand stores in place of the payload. The same reference is later
+    passed back to the backend in order to retrieve the original payload.
+    """
+
+    name = None
+
+    @abc.abstractmethod
+    def create_secret(self, name, secret_type, payload):
+        """Store ``payload`` and return a reference to it.
+
+        :param name: The ``metadata.name`` of the secret document.
+        :param secret_type: The secret type: certificate, private or
+            passphrase.
+        :param payload: The ``data`` section of the secret document.
+        :returns: Reference to the stored secret, to be persisted by Deckhand.
+        """
+
+    @abc.abstractmethod
+    def get_secret(self, secret_ref):
+        """Return the payload referenced by ``secret_ref``.
+
+        :param secret_ref: Reference previously returned by
+            ``create_secret``.
+        :returns: The original secret payload.
+        """
+
+
+class BarbicanSecretBackend(SecretStorageBackend):
+    """Store secret payloads in Barbican.
+
+    Deckhand only stores the secret reference (URL) returned by Barbican.
+    """
+
+    name = 'barbican'
+
+    def __init__(self):
+        # Imported here so that Barbican and Keystone client libraries are
+        # only loaded by processes which actually use this backend.
+        from deckhand.barbican import driver
+        self.barbican_driver = driver.BarbicanDriver()
+
+    def create_secret(self, name, secret_type, payload):
+        resp = self.barbican_driver.create_secret(
+            name=name, secret_type=secret_type, payload=payload)
+        return resp['secret_href']
+
+    def get_secret(self, secret_ref):
+        return self.barbican_driver.get_secret(secret_ref)
+
+
+class LocalSecretBackend(SecretStorageBackend):
+    """Encrypt secret payloads locally and store the ciphertext in Deckhand.
+
+    Payloads are serialized to JSON and encrypted with Fernet
+    (AES-128-CBC with an HMAC-SHA256 signature) using
+    ``[secrets]/encryption_key``. The resulting token is stored in Deckhand's
+    database in place of the payload, so no external service is involved.
+    """
+
+    name = 'local'
+
+    def __init__(self, encryption_key=None):
+        encryption_key = encryption_key or CONF.secrets.encryption_key
+        if not encryption_key:
+            raise errors.SecretStorageException(
+                backend=self.name,
+                details='[secrets]/encryption_key must be set')
+        from cryptography import fernet
+        self._invalid_token = fernet.InvalidToken
+        try:
+            self._fernet = fernet.Fernet(encryption_key)
+        except (TypeError, ValueError) as e:
+            raise errors.SecretStorageException(
+                backend=self.name,
+                details='invalid encryption key: %s' % six.text_type(e))
+
+    def create_secret(self, name, secret_type, payload):
+        plaintext = json.dumps(payload).encode('utf-8')
+        return self._fernet.encrypt(plaintext).decode('utf-8')
+
+    def get_secret(self, secret_ref):
+        try:
+            plaintext = self._fernet.decrypt(secret_ref.encode('utf-8'))
+        except self._invalid_token:
+            raise errors.SecretStorageException(
+                backend=self.name,
+                details='the secret could not be decrypted with the '
+                        'configured encryption key')
+        return json.loads(plaintext.decode('utf-8'))
+
+
+_BACKENDS = {
+    BarbicanSecretBackend.name: BarbicanSecretBackend,
+    LocalSecretBackend.name: LocalSecretBackend,
+}
+
+
+def get_backend():
+    """Return the secret storage backend configured via
+    ``[secrets]/storage_backend``.
+
+    The backend is instantiated once and cached for the lifetime of the
+    process.
+    """
+    global _BACKEND
+    if _BACKEND is None:
+        with _LOCK:
+            if _BACKEND is None:
+                backend_name = CONF.secrets.storage_backend
+                LOG.debug('Using the %s secret storage backend.',
+                          backend_name)
+                _BACKEND = _BACKENDS[backend_name]()
+    return _BACKEND
+
+
+def reset_backend():
+    """Discard the cached backend so that it is rebuilt on next use."""
+    global _BACKEND
+    _BACKEND = None
@@ -14,9 +14,10 @@
 
 from oslo_log import log as logging
 
-from deckhand.barbican import driver
 from deckhand.db.sqlalchemy import api as db_api
 from deckhand.engine import document as document_wrapper
+from deckhand.engine import secret_backends
+from deckhand import timing
 from deckhand import utils
 
 LOG = logging.getLogger(__name__)
@@ -26,12 +27,15 @@ ENCRYPTED = 'encrypted'
 
 
 class SecretsManager(object):
-    """Internal API resource for interacting with Barbican.
+    """Internal API resource for interacting with secret storage backends.
 
-    Currently only supports Barbican.
+    The backend is selected via ``[secrets]/storage_backend``: either Barbican
+    or local symmetric encryption with the ciphertext stored in Deckhand.
     """
 
-    barbican_driver = driver.BarbicanDriver()
+    @property
+    def backend(self):
+        return secret_backends.get_backend()
 
     def create(self, secret_doc):
         """Securely store secrets contained in ``secret_doc``.
@@ -44,9 +48,9 @@ class SecretsManager(object):
         Documents with ``metadata.storagePolicy`` == "clearText" have their
         secrets stored directly in Deckhand.
 
-        Documents with ``metadata.storagePolicy`` == "encrypted" are stored in
-        Barbican directly. Deckhand in turn stores the reference returned
-        by Barbican in Deckhand.
+        Documents with ``metadata.storagePolicy`` == "encrypted" are stored
+        using the configured secret storage backend. Deckhand in turn stores
+        the reference returned by the backend in Deckhand.
 
         :param secret_doc: A Deckhand document with one of the following
             schemas:
@@ -68,15 +72,31 @@ class SecretsManager(object):
                 'secret_type': secret_type,
                 'payload': secret_doc['data']
             }
-            resp = self.barbican_driver.create_secret(**kwargs)
-
-            secret_ref = resp['secret_href']
+            with timing.span('secrets'):
+                secret_ref = self.backend.create_secret(**kwargs)
             created_secret = {'secret': secret_ref}
         elif encryption_type == CLEARTEXT:
             created_secret = {'secret': secret_doc['data']}
 
         return created_secret
 
+    def get(self, secret_doc):
+        """Retrieve the secret payload for ``secret_doc``.
+
+        :param secret_doc: A stored Deckhand secret document, whose ``data``
+            section is ``{'secret': <secret>}``.
+        :returns: The ``data`` section of ``secret_doc`` with the secret
+            payload resolved via the configured backend if the document is
+            encrypted.
+        """
+        encryption_type = secret_doc['metadata'].get('storagePolicy')
+
+        if encryption_type == ENCRYPTED:
+            secret_ref = secret_doc['data']['secret']
+            with timing.span('secrets'):
+                return {'secret': self.backend.get_secret(secret_ref)}
+        return secret_doc['data']
+
     def _get_secret_type(self, schema):
         """Get the Barbican secret type based on the following mapping:
 
@@ -109,6 +129,7 @@ class SecretsSubstitution(object):
         substitute_docs = [document_wrapper.Document(d) for d in documents if
                            'substitutions' in d['metadata']]
         self.documents = substitute_docs
+        self.secrets_mgr = SecretsManager()
 
     def substitute_all(self):
         """Substitute all documents that have a `metadata.substitutions` field.
@@ -134,12 +155,11 @@ class SecretsSubstitution(object):
                 if src_path == '.':
                     src_path = '.secret'
 
-                # TODO(fmontei): Use secrets_manager for this logic. Need to
-                # check Barbican for the secret if it has been encrypted.
                 src_doc = db_api.document_get(
                     schema=src_schema, name=src_name, is_secret=True,
                     **{'metadata.layeringDefinition.abstract': False})
-                src_secret = utils.jsonpath_parse(src_doc['data'], src_path)
+                src_data = self.secrets_mgr.get(src_doc)
+                src_secret = utils.jsonpath_parse(src_data, src_path)
 
                 dest_path = sub['dest']['path']
                 dest_pattern = sub['dest'].get('pattern', None)
@@ -0,0 +1,134 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Background workers performing the schema validations queued when
+``[validation]/schema_validation_mode`` is ``deferred``.
+
+Validations are queued in the database, in the same request that creates the
+revision, so any worker of any API process may perform them. Each process
+runs its own pool of worker threads, which are woken up as soon as a
+validation is queued by the same process, and otherwise poll the queue.
+"""
+
+import os
+import threading
+
+from oslo_log import log as logging
+
+from deckhand.conf import config
+from deckhand.db.sqlalchemy import api as db_api
+from deckhand.engine import document_validation
+from deckhand import types
+
+CONF = config.CONF
+LOG = logging.getLogger(__name__)
+
+_LOCK = threading.Lock()
+_WAKE_UP = threading.Event()
+# The ID of the process whose workers were started, as threads are not
+# inherited by forked processes.
+_PID = None
+
+
+def is_enabled():
+    return CONF.validation.schema_validation_mode == 'deferred'
+
+
+def start():
+    """Start the workers of this process, unless they are already running."""
+    global _PID
+    with _LOCK:
+        if _PID == os.getpid():
+            return
+        _PID = os.getpid()
+        LOG.debug('Starting %d background validation workers in process %d.',
+                  CONF.validation.workers, _PID)
+        for idx in range(CONF.validation.workers):
+            thread = threading.Thread(
+                target=_run, name='validation-worker-%d' % idx)
+            thread.daemon = True
+            thread.start()
+
+
+def notify():
+    """Wake up the idle workers of this process, after queueing a
+    validation.
+    """
+    _WAKE_UP.set()
+
+
+def _run():
+    while True:
+        try:
+            processed = process_next()
+        except Exception:
+            # The validation is performed again once its task times out.
+            LOG.exception('Failed to perform a queued validation.')
+            processed = False
+        if not processed:
+            _WAKE_UP.wait(CONF.validation.poll_interval)
+            _WAKE_UP.clear()
+
+
+def process_next():
+    """Perform the oldest queued validation that isn't in progress, and
+    record its results.
+
+    :returns: Whether a validation was performed.
+    """
+    task = db_api.validation_task_claim(CONF.validation.task_timeout)
+    if task is None:
+        return False
+
+    documents_by_key = dict(
+        ((d['schema'], d['name']),
+         {'schema': d['schema'], 'metadata': d['metadata'], 'data': d['data']})
+        for d in db_api.document_get_all(
+            revision_id=task['revision_id'], deleted=False))
+    keys = [tuple(k) for k in task['documents']]
+    found_keys = [k for k in keys if k in documents_by_key]
+
+    if task['attempts'] > CONF.validation.max_attempts:
+        LOG.error('Giving up validating the documents of revision %d after '
+                  '%d attempts.', task['revision_id'], task['attempts'] - 1)
+        results = dict(
+            (k, _failure(k, 'The document could not be validated.'))
+            for k in keys)
+    else:
+        doc_validator = document_validation.DocumentValidation(
+            [documents_by_key[k] for k in found_keys])
+        results = dict(zip(
+            found_keys, doc_validator.validate_deferred(task['revision_id'])))
+
+    # Validation entries are created in the order the documents were PUT.
+    # Documents that can't be found aren't reported as valid.
+    validations = [
+        results.get(k) or _failure(k, 'The document could not be found.')
+        for k in keys]
+
+    if db_api.validation_task_complete(
+            task['id'], task['revision_id'], validations):
+        LOG.debug('Validated %d documents of revision %d.',
+                  len(validations), task['revision_id'])
+    return True
+
+
+def _failure(key, message):
+    schema, name = key
+    return {
+        'name': types.DECKHAND_SCHEMA_VALIDATION,
+        'status': 'failure',
+        'validator': {'name': 'deckhand', 'version': '1.0'},
+        'errors': [{'schema': schema, 'name': name, 'message': message}]
+    }
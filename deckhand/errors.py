@@ -13,12 +13,13 @@
 # limitations under the License.
 
 import traceback
-import yaml
 
 import falcon
 from oslo_log import log as logging
 import six
 
+from deckhand.control import content_types
+
 LOG = logging.getLogger(__name__)
 
 
@@ -104,8 +105,12 @@ def format_error_resp(req,
         'retry': True if status_code is falcon.HTTP_500 else False
     }
 
-    resp.body = yaml.safe_dump(error_response)
+    resp.body = error_response
     resp.status = status_code
+    # NOTE: The response middleware isn't invoked for errors raised by the
+    # request middleware itself (e.g. an unsupported Content-Type), so go
+    # through the serialization step here. It is a no-op when called again.
+    content_types.serialize_response(req, resp)
 
 
 def default_exception_handler(ex, req, resp, params):
@@ -256,18 +261,38 @@ class RevisionTagBadFormat(DeckhandException):
     code = 400
 
 
+class ValidationNotFound(DeckhandException):
+    msg_fmt = ("The requested validation entry %(entry_id)s was not found "
+               "for validation %(validation_name)s and revision "
+               "%(revision_id)s.")
+    code = 404
+
+
 class InvalidRollback(DeckhandException):
     msg_fmt = ("The requested rollback for target revision %(revision)s is "
                "invalid as the latest revision matches the target revision.")
     code = 400
 
 
+class DatabaseNotCurrent(DeckhandException):
+    msg_fmt = ("The database schema is at version %(current)s, but version "
+               "%(expected)s is required. Run `deckhand-manage db sync` to "
+               "create or upgrade the schema.")
+    code = 500
+
+
 class BarbicanException(DeckhandException):
 
     def __init__(self, message, code):
         super(BarbicanException, self).__init__(message=message, code=code)
 
 
+class SecretStorageException(DeckhandException):
+    msg_fmt = ("The %(backend)s secret storage backend failed to process the "
+               "secret. Details: %(details)s.")
+    code = 500
+
+
 class PolicyNotAuthorized(DeckhandException):
     msg_fmt = "Policy doesn't allow %(action)s to be performed."
     code = 403
@@ -0,0 +1,80 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Command-line utility for administering Deckhand.
+
+Usage::
+
+    deckhand-manage [--config-file deckhand.conf] db sync [version]
+    deckhand-manage [--config-file deckhand.conf] db version
+
+The configuration file defaults to ``deckhand.conf`` in the directory given by
+``OS_DECKHAND_CONFIG_DIR`` (``/etc/deckhand`` by default), like the API.
+"""
+
+import os
+import sys
+
+from oslo_config import cfg
+
+from deckhand.control import api
+from deckhand.db.sqlalchemy import migration
+
+CONF = cfg.CONF
+
+
+def do_db_sync():
+    migration.db_sync(CONF.command.version)
+
+
+def do_db_version():
+    print(', '.join(sorted(migration.db_version())) or 'None')
+
+
+def add_command_parsers(subparsers):
+    db_parser = subparsers.add_parser(
+        'db', help='Manage the database schema.')
+    db_subparsers = db_parser.add_subparsers(dest='db_command')
+    db_subparsers.required = True
+
+    sync_parser = db_subparsers.add_parser(
+        'sync', help='Create the database schema or upgrade it to the '
+                     'latest (or given) version.')
+    sync_parser.add_argument('version', nargs='?', default='heads')
+    sync_parser.set_defaults(func=do_db_sync)
+
+    version_parser = db_subparsers.add_parser(
+        'version', help='Print the current version of the database schema.')
+    version_parser.set_defaults(func=do_db_version)
+
+
+command_opt = cfg.SubCommandOpt('command', title='Commands',
+                                handler=add_command_parsers)
+
+
+def main(argv=None):
+    CONF.register_cli_opt(command_opt)
+
+    default_config_files = [
+        f for f in api._get_config_files()
+        if f.endswith('.conf') and os.path.exists(f)]
+    CONF(sys.argv[1:] if argv is None else argv, project='deckhand',
+         default_config_files=default_config_files)
+    api.setup_logging(CONF)
+
+    CONF.command.func()
+
+
+if __name__ == '__main__':
+    main()
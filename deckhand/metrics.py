@@ -0,0 +1,111 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Prometheus metrics exposed via the ``/metrics`` endpoint.
+
+When Deckhand runs in several uWSGI workers, the ``PROMETHEUS_MULTIPROC_DIR``
+environment variable must point to an empty directory, shared by the workers,
+before Deckhand is imported. Each worker then writes its metrics to files in
+that directory and ``/metrics`` reports the aggregate of all the workers,
+whichever worker serves it.
+"""
+
+import os
+
+import prometheus_client
+from prometheus_client import multiprocess
+
+MULTIPROC_DIR_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+
+# Buckets for the number of documents in a bucket PUT.
+_DOCUMENT_COUNT_BUCKETS = (1, 10, 50, 100, 500, 1000, 5000, 10000, 50000,
+                           float('inf'))
+
+REQUEST_DURATION = prometheus_client.Histogram(
+    'deckhand_request_duration_seconds',
+    'Time spent handling API requests.',
+    ['route', 'method', 'status'])
+
+REQUESTS_IN_FLIGHT = prometheus_client.Gauge(
+    'deckhand_requests_in_flight',
+    'Number of API requests being handled.',
+    multiprocess_mode='livesum')
+
+DB_POOL_CHECKOUT_DURATION = prometheus_client.Histogram(
+    'deckhand_db_pool_checkout_duration_seconds',
+    'Time spent waiting for a connection from the database pool.',
+    ['engine'])
+
+DB_POOL_CONNECTIONS = prometheus_client.Gauge(
+    'deckhand_db_pool_connections',
+    'Number of open connections in the database pool.',
+    ['engine'], multiprocess_mode='livesum')
+
+DB_POOL_CHECKED_OUT = prometheus_client.Gauge(
+    'deckhand_db_pool_checked_out_connections',
+    'Number of database pool connections in use.',
+    ['engine'], multiprocess_mode='livesum')
+
+DB_QUERY_DURATION = prometheus_client.Histogram(
+    'deckhand_db_query_duration_seconds',
+    'Time spent executing SQL statements, by type of statement.',
+    ['statement'])
+
+CACHE_REQUESTS = prometheus_client.Counter(
+    'deckhand_cache_requests',
+    'Lookups in internal caches, by cache and result (hit or miss).',
+    ['cache', 'result'])
+
+BARBICAN_REQUEST_DURATION = prometheus_client.Histogram(
+    'deckhand_barbican_request_duration_seconds',
+    'Time spent in calls to Barbican, by operation.',
+    ['operation'])
+
+BUCKET_DOCUMENTS = prometheus_client.Histogram(
+    'deckhand_bucket_documents',
+    'Number of documents processed per bucket PUT.',
+    buckets=_DOCUMENT_COUNT_BUCKETS)
+
+
+def cache_lookup(cache, hit):
+    """Count a lookup in ``cache``."""
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def is_multiprocess():
+    return bool(os.environ.get(MULTIPROC_DIR_ENV))
+
+
+def generate():
+    """Return the current metrics in the Prometheus text format.
+
+    :returns: Tuple of the payload and its content type.
+    """
+    if is_multiprocess():
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return (prometheus_client.generate_latest(registry),
+            prometheus_client.CONTENT_TYPE_LATEST)
+
+
+def mark_process_dead(pid=None):
+    """Discard the gauges of an exited worker.
+
+    Counters and histograms of exited workers are kept, so that the
+    aggregates do not go backwards.
+    """
+    if is_multiprocess():
+        multiprocess.mark_process_dead(pid or os.getpid())
@@ -16,6 +16,7 @@ import itertools
 
 from deckhand.policies import base
 from deckhand.policies import document
+from deckhand.policies import profiler
 from deckhand.policies import revision
 from deckhand.policies import revision_tag
 from deckhand.policies import validation
@@ -25,6 +26,7 @@ def list_rules():
     return itertools.chain(
         base.list_rules(),
         document.list_rules(),
+        profiler.list_rules(),
         revision.list_rules(),
         revision_tag.list_rules(),
         validation.list_rules()
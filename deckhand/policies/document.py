@@ -30,6 +30,10 @@ the new revision.""",
                 'method': 'PUT',
                 'path': '/api/v1.0/buckets/{bucket_name}/documents'
             },
+            {
+                'method': 'PUT',
+                'path': '/api/v1.0/buckets'
+            },
             {
                 'method': 'POST',
                 'path': '/api/v1.0/rollback/{target_revision_id}'
@@ -52,6 +56,10 @@ the request body have a ``metadata.storagePolicy`` of "encrypted".""",
                 'method': 'PUT',
                 'path': '/api/v1.0/buckets/{bucket_name}/documents'
             },
+            {
+                'method': 'PUT',
+                'path': '/api/v1.0/buckets'
+            },
             {
                 'method': 'POST',
                 'path': '/api/v1.0/rollback/{target_revision_id}'
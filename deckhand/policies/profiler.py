@@ -0,0 +1,49 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from oslo_policy import policy
+
+from deckhand.policies import base
+
+
+profiler_policies = [
+    policy.DocumentedRuleDefault(
+        base.POLICY_ROOT % 'profile_request',
+        base.RULE_ADMIN_API,
+        """Profile a request with cProfile and/or tracemalloc, via the
+X-Deckhand-Profile header. The profile reveals the code paths taken to handle
+the request.""",
+        [
+            {
+                'method': 'GET',
+                'path': '/api/v1.0/*'
+            },
+            {
+                'method': 'PUT',
+                'path': '/api/v1.0/*'
+            },
+            {
+                'method': 'POST',
+                'path': '/api/v1.0/*'
+            },
+            {
+                'method': 'DELETE',
+                'path': '/api/v1.0/*'
+            }
+        ]),
+]
+
+
+def list_rules():
+    return profiler_policies
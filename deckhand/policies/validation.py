@@ -32,12 +32,17 @@ validation_policies = [
         base.POLICY_ROOT % 'list_validations',
         base.RULE_ADMIN_API,
         """"List all validations that have been reported for a revision. Also
-lists the validation entries for a particular validation.""",
+lists the validation entries for a particular validation, and the
+validations of several revisions at once.""",
         [
             {
                 'method': 'GET',
                 'path': '/api/v1.0/revisions/{revision_id}/validations'
             },
+            {
+                'method': 'GET',
+                'path': '/api/v1.0/validations'
+            },
             {
                 'method': 'GET',
                 'path': '/api/v1.0/revisions/{revision_id}/validations/'
@@ -0,0 +1,144 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""On-demand CPU and memory profiling of individual requests.
+
+A ``RequestProfile`` runs the code between its ``start`` and ``stop`` under
+``cProfile`` (the ``cpu`` mode) and/or ``tracemalloc`` (the ``memory`` mode),
+and reports the functions that took the most time and the source lines that
+allocated the most memory.
+
+Only one request per process is profiled at a time: ``cProfile`` only
+profiles the thread that started it, but ``tracemalloc`` traces the
+allocations of all threads.
+"""
+
+import cProfile
+import pstats
+import threading
+
+import six
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2.7
+    tracemalloc = None
+
+CPU = 'cpu'
+MEMORY = 'memory'
+MODES = (CPU, MEMORY)
+
+_LOCK = threading.Lock()
+
+
+def is_supported(mode):
+    return mode == CPU or (mode == MEMORY and tracemalloc is not None)
+
+
+class RequestProfile(object):
+    """The CPU and/or memory profile of a request."""
+
+    def __init__(self, modes):
+        self.modes = [m for m in MODES if m in modes]
+        self.cpu_stats = None
+        self.memory_statistics = None
+        self.memory_peak = None
+        self._profiler = None
+        self._memory_baseline = None
+
+    def start(self):
+        """Start profiling.
+
+        :returns: False if another request of this process is being
+            profiled, in which case profiling isn't started.
+        """
+        if not _LOCK.acquire(False):
+            return False
+        if MEMORY in self.modes:
+            if tracemalloc.is_tracing():
+                # Only report the memory allocated during the request.
+                self._memory_baseline = self._take_snapshot()
+            else:
+                tracemalloc.start()
+        if CPU in self.modes:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return True
+
+    def stop(self):
+        """Stop profiling and collect the results."""
+        try:
+            if self._profiler is not None:
+                self._profiler.disable()
+                self.cpu_stats = pstats.Stats(self._profiler)
+            if MEMORY in self.modes:
+                snapshot = self._take_snapshot()
+                if self._memory_baseline is None:
+                    self.memory_statistics = snapshot.statistics('lineno')
+                    self.memory_peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                else:
+                    self.memory_statistics = snapshot.compare_to(
+                        self._memory_baseline, 'lineno')
+        finally:
+            _LOCK.release()
+
+    @staticmethod
+    def _take_snapshot():
+        return tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),))
+
+    def format_report(self, top):
+        """Format the profile for humans.
+
+        :param top: Number of functions and of allocating source lines to
+            include.
+        """
+        sections = []
+        if self.cpu_stats is not None:
+            stream = six.StringIO()
+            self.cpu_stats.stream = stream
+            self.cpu_stats.sort_stats('cumulative').print_stats(top)
+            sections.append('CPU profile, by cumulative time:\n%s' %
+                            stream.getvalue().strip('\n'))
+        if self.memory_statistics is not None:
+            statistics = self.memory_statistics
+            # Statistics compared to a baseline have a size_diff instead.
+            size = sum(getattr(s, 'size_diff', s.size) for s in statistics)
+            lines = ['Memory allocated and not yet freed at the end of the '
+                     'request: %.1f KiB' % (size / 1024.0)]
+            if self.memory_peak is not None:
+                lines.append('Peak of traced memory: %.1f KiB' % (
+                    self.memory_peak / 1024.0))
+            lines.append('Top %d allocations, by source line:' % top)
+            lines.extend('  %s' % s for s in statistics[:top])
+            sections.append('\n'.join(lines))
+        return '\n\n'.join(sections) + '\n'
+
+    def dump(self, path_prefix, top):
+        """Write the profile to files whose paths start with
+        ``path_prefix``: the report (``.txt``) and, for the ``cpu`` mode,
+        the raw ``cProfile`` statistics (``.pstats``), which tools like
+        ``snakeviz`` can load.
+
+        :returns: The paths of the files written.
+        """
+        paths = [path_prefix + '.txt']
+        with open(paths[0], 'w') as f:
+            f.write(self.format_report(top))
+        if self.cpu_stats is not None:
+            paths.append(path_prefix + '.pstats')
+            self.cpu_stats.dump_stats(paths[1])
+        return paths
@@ -19,6 +19,7 @@ from oslo_log import log
 from deckhand.control import base
 from deckhand.control import buckets
 from deckhand.control import health
+from deckhand.control import metrics
 from deckhand.control import middleware
 from deckhand.control import revision_diffing
 from deckhand.control import revision_documents
@@ -36,6 +37,7 @@ LOG = log.getLogger(__name__)
 def configure_app(app, version=''):
 
     v1_0_routes = [
+        ('buckets', buckets.BucketsBatchResource()),
         ('buckets/{bucket_name}/documents', buckets.BucketsResource()),
         ('health', health.HealthResource()),
         ('revisions', revisions.RevisionsResource()),
@@ -55,12 +57,14 @@ def configure_app(app, version=''):
             validations.ValidationsResource()),
         ('revisions/{revision_id}/validations/{validation_name}/{entry_id}',
             validations.ValidationsResource()),
-        ('rollback/{revision_id}', rollback.RollbackResource())
+        ('rollback/{revision_id}', rollback.RollbackResource()),
+        ('validations', validations.ValidationStatusesResource())
     ]
 
     for path, res in v1_0_routes:
         app.add_route(os.path.join('/api/%s' % version, path), res)
     app.add_route('/versions', versions.VersionsResource())
+    app.add_route('/metrics', metrics.MetricsResource())
 
     # Error handlers (FILO handling).
     app.add_error_handler(Exception, errors.default_exception_handler)
@@ -73,9 +77,17 @@ def configure_app(app, version=''):
 def deckhand_app_factory(global_config, **local_config):
     # The order of the middleware is important because the `process_response`
     # method for `YAMLTranslator` should execute after that of any other
-    # middleware to convert the response to YAML format.
-    middleware_list = [middleware.YAMLTranslator(),
-                       middleware.ContextMiddleware()]
+    # middleware to convert the response to YAML format, except for
+    # `CompressionMiddleware`, which compresses the serialized response, and
+    # `TimingMiddleware` and `ProfilingMiddleware`, whose timings and profiles
+    # include serializing the response.
+    middleware_list = [middleware.TimingMiddleware(),
+                       middleware.MetricsMiddleware(),
+                       middleware.CompressionMiddleware(),
+                       middleware.ProfilingMiddleware(),
+                       middleware.YAMLTranslator(),
+                       middleware.ContextMiddleware(),
+                       middleware.DBRequestScopeMiddleware()]
 
     app = falcon.API(request_type=base.DeckhandRequest,
                      middleware=middleware_list)
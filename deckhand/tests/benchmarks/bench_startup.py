@@ -0,0 +1,79 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure the import time and memory footprint of a fresh Deckhand worker.
+
+Each sample imports ``module`` in a new interpreter, which is what a uWSGI
+worker pays before handling its first request, and reports the wall-clock
+import time, the peak RSS of the interpreter and which of the heavy optional
+dependencies ended up loaded.
+
+Usage::
+
+    python -m deckhand.tests.benchmarks.bench_startup [module] [repeat]
+"""
+
+from __future__ import print_function
+
+import json
+import subprocess
+import sys
+
+# Dependencies that are only needed for some requests and therefore should
+# not be loaded when a worker starts.
+LAZY_MODULES = (
+    'barbicanclient',
+    'cryptography.fernet',
+    'jsonpath_ng',
+    'keystoneauth1.identity',
+)
+
+_PROBE = """
+import json, resource, sys, time
+start = time.time()
+import %(module)s
+elapsed = time.time() - start
+print(json.dumps({
+    'import_time': elapsed,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'loaded': [m for m in %(lazy_modules)r if m in sys.modules],
+}))
+"""
+
+
+def measure(module='deckhand.service'):
+    """Import ``module`` in a new interpreter and return its measurements."""
+    probe = _PROBE % {'module': module, 'lazy_modules': LAZY_MODULES}
+    output = subprocess.check_output([sys.executable, '-c', probe])
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def run(module='deckhand.service', repeat=5):
+    samples = [measure(module) for _ in range(repeat)]
+    import_time = min(s['import_time'] for s in samples)
+    max_rss_kb = min(s['max_rss_kb'] for s in samples)
+
+    print('module: %s, samples: %d' % (module, repeat))
+    print('import time: %8.4fs' % import_time)
+    print('peak RSS:    %8.1f MiB' % (max_rss_kb / 1024.0))
+    print('lazy modules loaded at import: %s' % (
+        ', '.join(samples[0]['loaded']) or 'none'))
+    return {'import_time': import_time, 'max_rss_kb': max_rss_kb,
+            'loaded': samples[0]['loaded']}
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:3]
+    run(*([args[0]] if args else []) +
+        ([int(args[1])] if len(args) > 1 else []))
@@ -0,0 +1,361 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark layering, validation, secret substitution and the database
+write and revision read paths at increasing scales.
+
+Each benchmark runs at several scales, which are either a number of
+documents or a number of revisions. The database runs against a fresh
+in-memory SQLite database unless ``--connection`` is given.
+
+For each benchmark the scaling exponent is reported: the slope of its best
+time against its scale on a log-log scale. It is about 1 for linear and 2
+for quadratic behaviour and, unlike absolute times, barely depends on the
+machine. Results can be written as JSON with ``--output`` and compared with
+those of an earlier run with ``--baseline``. The exit status is then 1 if a
+benchmark got slower by more than ``--tolerance``, or if its scaling
+exponent grew by more than 0.3.
+
+Usage::
+
+    python -m deckhand.tests.benchmarks.bench_suite [--preset quick|full]
+        [--only NAME[,NAME...]] [--repeat N] [--connection URL]
+        [--output FILE] [--baseline FILE] [--tolerance FRACTION]
+"""
+
+from __future__ import print_function
+
+import argparse
+import collections
+import copy
+import datetime
+import json
+import math
+import platform
+import sys
+import timeit
+
+from oslo_config import cfg
+
+from deckhand.db.sqlalchemy import api as db_api
+from deckhand.engine import document_validation
+from deckhand.engine import layering
+from deckhand.engine import secrets_manager
+from deckhand import factories
+from deckhand.tests.benchmarks import bench_yaml_codec
+
+CONF = cfg.CONF
+
+PRESETS = {
+    'quick': {'documents': (100, 1000), 'revisions': (10, 100)},
+    'full': {'documents': (100, 1000, 10000, 50000),
+             'revisions': (10, 100, 1000)},
+}
+
+# Number of secrets shared by the documents of the substitution benchmark.
+NUM_SECRETS = 10
+# Number of documents in the bucket of the revision read benchmarks.
+DOCS_PER_REVISION = 20
+# Growth of a scaling exponent that is reported as a regression.
+EXPONENT_TOLERANCE = 0.3
+
+Benchmark = collections.namedtuple(
+    'Benchmark', ['name', 'unit', 'setup', 'func', 'mutates'])
+"""A benchmark.
+
+``setup(scale)`` is not timed and returns the argument passed to the timed
+``func``. If ``mutates`` is true, ``setup`` is run again before each timed
+run since ``func`` changes its argument or the database.
+"""
+
+
+def _reset_db():
+    db_api.setup_db()
+
+
+def gen_site(num_docs):
+    """Generate a site with ``num_docs`` documents whose site layer
+    documents are concrete and spread across the region layer documents.
+    """
+    _, num_regions, num_sites = bench_yaml_codec.get_docs_per_layer(num_docs)
+    parent_selectors = [{'region': 'region%d' % (idx % num_regions + 1)}
+                        for idx in range(num_sites)]
+    return bench_yaml_codec.gen_site_payload(
+        num_docs, site_abstract=False,
+        site_parent_selectors=parent_selectors)
+
+
+def _setup_render(num_docs):
+    return gen_site(num_docs)
+
+
+def _render(documents):
+    layering.DocumentLayering(documents).render()
+
+
+def _setup_validate(num_docs):
+    # Validation looks up the DataSchema documents in the database.
+    _reset_db()
+    return gen_site(num_docs)
+
+
+def _validate(documents):
+    document_validation.DocumentValidation(documents).validate_all()
+
+
+def _setup_substitute(num_docs):
+    _reset_db()
+    secrets_factory = factories.DocumentSecretFactory()
+    secrets = []
+    for idx in range(NUM_SECRETS):
+        secret = secrets_factory.gen_test(
+            'Passphrase', 'cleartext', data={'secret': 'password%d' % idx})
+        secret['metadata']['name'] = 'passphrase%d' % idx
+        secrets.append(secret)
+    db_api.documents_create('secrets', secrets)
+
+    documents = gen_site(num_docs)[1:]
+    for idx, document in enumerate(documents):
+        document['metadata']['substitutions'] = [{
+            'dest': {'path': '.chart.values.password'},
+            'src': {'schema': 'deckhand/Passphrase/v1',
+                    'name': 'passphrase%d' % (idx % NUM_SECRETS),
+                    'path': '.'}
+        }]
+    return documents
+
+
+def _substitute(documents):
+    secrets_manager.SecretsSubstitution(documents).substitute_all()
+
+
+def _setup_documents_create(num_docs):
+    _reset_db()
+    return gen_site(num_docs)
+
+
+def _documents_create(documents):
+    db_api.documents_create('site', documents)
+
+
+def _setup_documents_update(num_docs):
+    _reset_db()
+    documents = gen_site(num_docs)
+    db_api.documents_create('site', documents)
+    documents = copy.deepcopy(documents)
+    documents[-1]['data']['updated'] = True
+    return documents
+
+
+def _setup_revisions(num_revisions):
+    """Create ``num_revisions`` revisions of a bucket, each of which changes
+    a single document.
+    """
+    _reset_db()
+    documents = gen_site(DOCS_PER_REVISION)
+    for idx in range(num_revisions):
+        documents[-1]['data']['revision'] = idx
+        db_api.documents_create('site', documents)
+    return db_api.revision_get_latest()['id']
+
+
+def _revision_get_all_summaries(latest_revision_id):
+    db_api.revision_get_all_summaries()
+
+
+def _revision_get(latest_revision_id):
+    db_api.revision_get_summary(latest_revision_id)
+    db_api.revision_get_digest(latest_revision_id)
+
+
+def _revision_get_documents(latest_revision_id):
+    db_api.revision_get_digest(latest_revision_id)
+    db_api.revision_get_documents(latest_revision_id)
+
+
+def _revision_diff(latest_revision_id):
+    db_api.revision_diff(1, latest_revision_id)
+    db_api.revision_diff_documents(1, latest_revision_id)
+
+
+BENCHMARKS = [
+    Benchmark('layering.render', 'documents', _setup_render, _render, True),
+    Benchmark('validation.validate_all', 'documents', _setup_validate,
+              _validate, False),
+    Benchmark('substitution.substitute_all', 'documents', _setup_substitute,
+              _substitute, False),
+    Benchmark('db.documents_create', 'documents', _setup_documents_create,
+              _documents_create, True),
+    Benchmark('db.documents_update', 'documents', _setup_documents_update,
+              _documents_create, True),
+    Benchmark('db.revision_list', 'revisions', _setup_revisions,
+              _revision_get_all_summaries, False),
+    Benchmark('db.revision_show', 'revisions', _setup_revisions,
+              _revision_get, False),
+    Benchmark('db.revision_documents', 'revisions', _setup_revisions,
+              _revision_get_documents, False),
+    Benchmark('db.revision_diff', 'revisions', _setup_revisions,
+              _revision_diff, False),
+]
+
+
+def _time(func, arg):
+    start = timeit.default_timer()
+    func(arg)
+    return timeit.default_timer() - start
+
+
+def run_benchmark(benchmark, scale, repeat):
+    """Run ``benchmark`` at ``scale`` and return the timings of each run."""
+    samples = []
+    arg = None
+    for idx in range(repeat):
+        if idx == 0 or benchmark.mutates:
+            arg = benchmark.setup(scale)
+        samples.append(_time(benchmark.func, arg))
+    return samples
+
+
+def scaling_exponent(points):
+    """Return the least-squares slope of ``log(time)`` against
+    ``log(scale)``, or ``None`` if there are fewer than 2 points.
+
+    :param points: List of ``(scale, time)`` tuples.
+    """
+    points = [(math.log(s), math.log(t)) for s, t in points if t > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var_x:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def run(scales=None, benchmarks=None, repeat=3):
+    """Run the benchmark suite.
+
+    The database must already be configured.
+
+    :param scales: Dictionary with the ``documents`` and ``revisions`` scales
+        to run the benchmarks at. Defaults to the "quick" preset.
+    :param benchmarks: Names of the benchmarks to run. Defaults to all.
+    :param repeat: Number of timed runs per benchmark and scale; the best one
+        is reported.
+    :returns: Dictionary of results, which can be serialized as JSON.
+    """
+    scales = scales or PRESETS['quick']
+    results = []
+    exponents = {}
+
+    for benchmark in BENCHMARKS:
+        if benchmarks and benchmark.name not in benchmarks:
+            continue
+        print('%s (%s)' % (benchmark.name, benchmark.unit))
+        points = []
+        for scale in scales[benchmark.unit]:
+            samples = run_benchmark(benchmark, scale, repeat)
+            best = min(samples)
+            points.append((scale, best))
+            results.append({'benchmark': benchmark.name,
+                            'unit': benchmark.unit,
+                            'scale': scale,
+                            'best': best,
+                            'samples': samples})
+            print('  %8d %12.4fs %12.1fus/%s' % (
+                scale, best, best / scale * 1e6, benchmark.unit[:-1]))
+        exponents[benchmark.name] = scaling_exponent(points)
+        if exponents[benchmark.name] is not None:
+            print('  scaling exponent: %.2f' % exponents[benchmark.name])
+
+    return {
+        'metadata': {
+            'created_at': datetime.datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'connection': CONF.database.connection,
+            'repeat': repeat,
+        },
+        'results': results,
+        'scaling_exponents': exponents,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Compare ``results`` with those of an earlier run.
+
+    :returns: List of regressions, as human-readable strings.
+    """
+    baseline_best = {(r['benchmark'], r['scale']): r['best']
+                     for r in baseline['results']}
+    regressions = []
+
+    for result in results['results']:
+        key = (result['benchmark'], result['scale'])
+        if key not in baseline_best:
+            continue
+        ratio = result['best'] / baseline_best[key]
+        if ratio > 1 + tolerance:
+            regressions.append('%s at %d: %.4fs vs %.4fs (%.2fx)' % (
+                key[0], key[1], result['best'], baseline_best[key], ratio))
+
+    for name, exponent in results['scaling_exponents'].items():
+        baseline_exponent = baseline['scaling_exponents'].get(name)
+        if (exponent is not None and baseline_exponent is not None and
+                exponent - baseline_exponent > EXPONENT_TOLERANCE):
+            regressions.append('%s: scaling exponent %.2f vs %.2f' % (
+                name, exponent, baseline_exponent))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='quick')
+    parser.add_argument('--only', help='Comma-separated benchmark names.')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--connection', default='sqlite://',
+                        help='SQLAlchemy connection string of the database '
+                             'to run against. Its contents are deleted.')
+    parser.add_argument('--output', help='Write the results to this file.')
+    parser.add_argument('--baseline',
+                        help='Results of an earlier run to compare with.')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Slowdown reported as a regression, as a '
+                             'fraction of the baseline time.')
+    args = parser.parse_args(argv)
+
+    CONF([], project='deckhand', default_config_files=[])
+    CONF.set_override('connection', args.connection, group='database')
+
+    benchmarks = args.only.split(',') if args.only else None
+    results = run(PRESETS[args.preset], benchmarks, args.repeat)
+    db_api.drop_db()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print('REGRESSION: %s' % regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the pure-Python and libyaml YAML codecs on a large site payload.
+
+Usage::
+
+    python -m deckhand.tests.benchmarks.bench_yaml_codec [num_docs] [repeat]
+"""
+
+from __future__ import print_function
+
+import sys
+import timeit
+
+import yaml
+
+from deckhand import factories
+from deckhand import yaml_codec
+
+
+def get_docs_per_layer(num_docs):
+    """Split ``num_docs`` between the global, region and site layers."""
+    return (max(1, num_docs // 10), max(1, num_docs // 5),
+            max(1, num_docs - num_docs // 10 - num_docs // 5))
+
+
+def gen_site_payload(num_docs, **kwargs):
+    """Generate a 3-layer site with roughly ``num_docs`` documents, each with
+    a moderately nested ``data`` section.
+
+    :param kwargs: Passed to ``DocumentFactory.gen_test``.
+    """
+    docs_per_layer = get_docs_per_layer(num_docs)
+    mapping = {}
+    for layer, count in zip(('GLOBAL', 'REGION', 'SITE'), docs_per_layer):
+        for idx in range(1, count + 1):
+            mapping['_%s_DATA_%d_' % (layer, idx)] = {'data': {
+                'chart': {
+                    'name': 'chart-%d' % idx,
+                    'values': {
+                        'replicas': idx,
+                        'labels': {'node-%d' % n: 'enabled' for n in range(5)},
+                        'endpoints': [
+                            'http://svc-%d.%s:8080/v1' % (n, layer.lower())
+                            for n in range(5)],
+                    }
+                }
+            }}
+            mapping['_%s_ACTIONS_%d_' % (layer, idx)] = {
+                'actions': [{'method': 'merge', 'path': '.'}]}
+    return factories.DocumentFactory(3, docs_per_layer).gen_test(
+        mapping, **kwargs)
+
+
+def _time(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def run(num_docs=1000, repeat=5):
+    documents = gen_site_payload(num_docs)
+    payload = yaml_codec.safe_dump_all(documents)
+
+    results = {}
+    codecs = [('python', yaml.SafeLoader, yaml.SafeDumper)]
+    if yaml_codec.HAS_LIBYAML:
+        codecs.append(('libyaml', yaml.CSafeLoader, yaml.CSafeDumper))
+
+    for name, loader, dumper in codecs:
+        results[name] = {
+            'load': _time(lambda: list(yaml_codec.safe_load_all(
+                payload, loader=loader)), repeat),
+            'dump': _time(lambda: yaml_codec.safe_dump_all(
+                documents, dumper=dumper), repeat),
+        }
+
+    print('documents: %d, payload: %d bytes' % (len(documents), len(payload)))
+    for name in sorted(results):
+        print('%-8s load: %8.4fs  dump: %8.4fs' % (
+            name, results[name]['load'], results[name]['dump']))
+    if 'libyaml' in results:
+        for op in ('load', 'dump'):
+            print('libyaml %s speedup: %.1fx' % (
+                op, results['python'][op] / results['libyaml'][op]))
+    return results
+
+
+if __name__ == '__main__':
+    run(*[int(arg) for arg in sys.argv[1:3]])
@@ -14,6 +14,7 @@
 
 from __future__ import absolute_import
 
+import contextlib
 import os
 
 import fixtures
@@ -23,6 +24,7 @@ from oslo_log import log as logging
 import testtools
 
 from deckhand.db.sqlalchemy import api as db_api
+from deckhand.db.sqlalchemy import profiler
 
 CONF = cfg.CONF
 logging.register_options(CONF)
@@ -85,3 +87,19 @@ class DeckhandWithDBTestCase(DeckhandTestCase):
             group='database')
         db_api.setup_db()
         self.addCleanup(db_api.drop_db)
+
+    @contextlib.contextmanager
+    def assertMaxQueries(self, max_queries):
+        """Assert that the ``with`` block executes at most ``max_queries``
+        SQL statements.
+
+        Use it to guard against N+1 query patterns, e.g. lazily loading a
+        relationship of each row in a loop, by checking that the number of
+        statements does not grow with the amount of data.
+        """
+        with profiler.profile() as query_profile:
+            yield query_profile
+        if query_profile.count > max_queries:
+            self.fail('Expected at most %d SQL statements, got %s' % (
+                max_queries, query_profile.format_report(
+                    slowest=query_profile.count)))
@@ -20,6 +20,7 @@ import mock
 from deckhand.control import api
 from deckhand.control import buckets
 from deckhand.control import health
+from deckhand.control import metrics
 from deckhand.control import revision_diffing
 from deckhand.control import revision_documents
 from deckhand.control import revision_tags
@@ -36,9 +37,9 @@ class TestApi(test_base.DeckhandTestCase):
     def setUp(self):
         super(TestApi, self).setUp()
         # Mock the API resources.
-        for resource in (buckets, health, revision_diffing, revision_documents,
-                         revision_tags, revisions, rollback, validations,
-                         versions):
+        for resource in (buckets, health, metrics, revision_diffing,
+                         revision_documents, revision_tags, revisions,
+                         rollback, validations, versions):
             class_names = self._get_module_class_names(resource)
             for class_name in class_names:
                 resource_obj = self.patchobject(
@@ -62,18 +63,20 @@ class TestApi(test_base.DeckhandTestCase):
                        if inspect.isclass(obj)]
         return class_names
 
-    @mock.patch.object(api, 'policy', autospec=True)
     @mock.patch.object(api, 'db_api', autospec=True)
+    @mock.patch.object(api, 'policy', autospec=True)
+    @mock.patch.object(api, 'migration', autospec=True)
     @mock.patch.object(api, 'logging', autospec=True)
     @mock.patch.object(api, 'CONF', autospec=True)
     @mock.patch('deckhand.service.falcon', autospec=True)
     def test_init_application(self, mock_falcon, mock_config, mock_logging,
-                              mock_db_api, _):
+                              mock_migration, mock_policy, mock_db_api):
         mock_falcon_api = mock_falcon.API.return_value
 
         api.init_application()
 
         mock_falcon_api.add_route.assert_has_calls([
+            mock.call('/api/v1.0/buckets', self.buckets_batch_resource()),
             mock.call('/api/v1.0/buckets/{bucket_name}/documents',
                       self.buckets_resource()),
             mock.call('/api/v1.0/health', self.health_resource()),
@@ -101,8 +104,32 @@ class TestApi(test_base.DeckhandTestCase):
             mock.call('/api/v1.0/revisions/{revision_id}/validations/'
                       '{validation_name}/{entry_id}',
                       self.validations_resource()),
-            mock.call('/versions', self.versions_resource())
+            mock.call('/api/v1.0/validations',
+                      self.validation_statuses_resource()),
+            mock.call('/versions', self.versions_resource()),
+            mock.call('/metrics', self.metrics_resource())
         ], any_order=True)
 
-        mock_db_api.drop_db.assert_called_once_with()
-        mock_db_api.setup_db.assert_called_once_with()
+        # Workers only check the schema version; they never run DDL.
+        mock_migration.check_db_version.assert_called_once_with()
+        mock_policy.init.assert_called_once_with()
+        # Connections opened during startup must not leak into workers
+        # forked from this process.
+        mock_db_api.dispose_engine.assert_called_once_with()
+
+    @mock.patch.object(api, 'atexit', autospec=True)
+    @mock.patch.object(api, 'db_api', autospec=True)
+    def test_post_fork(self, mock_db_api, mock_atexit):
+        api.post_fork()
+        mock_db_api.clear_db_env.assert_called_once_with()
+        mock_atexit.register.assert_called_once_with(
+            api.metrics.mark_process_dead, os.getpid())
+
+    @mock.patch.object(api, 'validation_worker', autospec=True)
+    @mock.patch.object(api, 'atexit', autospec=True)
+    @mock.patch.object(api, 'db_api', autospec=True)
+    def test_post_fork_starts_validation_workers(
+            self, mock_db_api, mock_atexit, mock_validation_worker):
+        mock_validation_worker.is_enabled.return_value = True
+        api.post_fork()
+        mock_validation_worker.start.assert_called_once_with()
@@ -12,12 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import yaml
 
 import mock
 from oslo_config import cfg
 
 from deckhand.control import buckets
+from deckhand.db.sqlalchemy import api as db_api
 from deckhand import factories
 from deckhand.tests import test_utils
 from deckhand.tests.unit.control import base as test_base
@@ -110,6 +112,80 @@ class TestBucketsController(test_base.BaseControllerTest):
             _do_test([payload[-1]])
 
 
+class TestBucketsBatchController(test_base.BaseControllerTest):
+    """Test suite for validating positive scenarios for updating several
+    buckets in one request.
+    """
+
+    def setUp(self):
+        super(TestBucketsBatchController, self).setUp()
+        rules = {'deckhand:create_cleartext_documents': '@',
+                 'deckhand:list_cleartext_documents': '@',
+                 'deckhand:list_encrypted_documents': '@'}
+        self.policy.set_rules(rules)
+        self.payload = factories.DocumentFactory(2, [1, 1]).gen_test({})
+
+    def _put_buckets(self, documents_by_bucket):
+        return self.app.simulate_put(
+            '/api/v1.0/buckets',
+            headers={'Content-Type': 'application/x-yaml'},
+            body=yaml.safe_dump_all([
+                {'bucket': bucket_name, 'documents': documents}
+                for bucket_name, documents in documents_by_bucket]))
+
+    def _get_buckets(self, revision_id):
+        resp = self.app.simulate_get(
+            '/api/v1.0/revisions/%s/documents' % revision_id,
+            headers={'Content-Type': 'application/x-yaml'})
+        self.assertEqual(200, resp.status_code)
+        return sorted((d['metadata']['name'], d['status']['bucket'])
+                      for d in yaml.safe_load_all(resp.text))
+
+    def test_put_buckets_creates_one_revision(self):
+        resp = self._put_buckets([('mop', self.payload[:2]),
+                                  ('mip', self.payload[2:])])
+        self.assertEqual(200, resp.status_code)
+        created_documents = list(yaml.safe_load_all(resp.text))
+        self.assertEqual(3, len(created_documents))
+        revision_ids = set(d['status']['revision'] for d in created_documents)
+        self.assertEqual(1, len(revision_ids))
+
+        expected = sorted(
+            [(d['metadata']['name'], 'mop') for d in self.payload[:2]] +
+            [(d['metadata']['name'], 'mip') for d in self.payload[2:]])
+        self.assertEqual(expected, self._get_buckets(revision_ids.pop()))
+
+    def test_put_buckets_with_json(self):
+        resp = self.app.simulate_put(
+            '/api/v1.0/buckets',
+            headers={'Content-Type': 'application/json'},
+            body=json.dumps([{'bucket': 'mop', 'documents': self.payload}]))
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual(3, len(list(yaml.safe_load_all(resp.text))))
+
+    def test_put_buckets_moves_document(self):
+        resp = self._put_buckets([('mop', self.payload[:2]),
+                                  ('mip', self.payload[2:])])
+        self.assertEqual(200, resp.status_code)
+
+        # Move a document from `mip` to `mop`, leaving `mip` empty.
+        resp = self._put_buckets([('mop', self.payload), ('mip', [])])
+        self.assertEqual(200, resp.status_code)
+        revision_id = list(yaml.safe_load_all(resp.text))[0]['status'][
+            'revision']
+        expected = sorted((d['metadata']['name'], 'mop')
+                          for d in self.payload)
+        self.assertEqual(expected, self._get_buckets(revision_id))
+
+        # The document is no longer in `mip`, which is left unchanged.
+        resp = self.app.simulate_put(
+            '/api/v1.0/buckets/mip/documents',
+            headers={'Content-Type': 'application/x-yaml'},
+            body='')
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual('', resp.text)
+
+
 class TestBucketsControllerNegative(test_base.BaseControllerTest):
     """Test suite for validating negative scenarios for bucket controller."""
 
@@ -125,7 +201,7 @@ schema:
 """
         invalid_payloads = ['garbage', no_colon_spaces]
         error_re = ['.*The provided document YAML failed schema validation.*',
-                    '.*mapping values are not allowed here.*']
+                    '.*mapping values are not allowed.*']
 
         for idx, payload in enumerate(invalid_payloads):
             resp = self.app.simulate_put(
@@ -135,6 +211,42 @@ schema:
             self.assertEqual(400, resp.status_code)
             self.assertRegexpMatches(resp.text, error_re[idx])
 
+    def test_put_bucket_exceeding_max_request_body_size(self):
+        rules = {'deckhand:create_cleartext_documents': '@'}
+        self.policy.set_rules(rules)
+
+        payload = yaml.safe_dump_all(
+            factories.DocumentFactory(2, [1, 1]).gen_test({}))
+        self.override_config('max_request_body_size', len(payload) - 1)
+
+        resp = self.app.simulate_put(
+            '/api/v1.0/buckets/mop/documents',
+            headers={'Content-Type': 'application/x-yaml'},
+            body=payload)
+        self.assertEqual(413, resp.status_code)
+        self.assertRegexpMatches(
+            resp.text, '.*exceeds the maximum of %d bytes.*' % (
+                len(payload) - 1))
+
+    def test_put_bucket_exceeding_max_documents_per_request(self):
+        rules = {'deckhand:create_cleartext_documents': '@'}
+        self.policy.set_rules(rules)
+        self.override_config('max_documents_per_request', 2)
+
+        payload = factories.DocumentFactory(2, [1, 1]).gen_test({})
+        self.assertEqual(3, len(payload))
+
+        for content_type, body in (
+                ('application/x-yaml', yaml.safe_dump_all(payload)),
+                ('application/json', json.dumps(payload))):
+            resp = self.app.simulate_put(
+                '/api/v1.0/buckets/mop/documents',
+                headers={'Content-Type': content_type},
+                body=body)
+            self.assertEqual(413, resp.status_code)
+            self.assertRegexpMatches(
+                resp.text, '.*more than the maximum of 2 documents.*')
+
     def test_put_conflicting_layering_policy(self):
         rules = {'deckhand:create_cleartext_documents': '@'}
         self.policy.set_rules(rules)
@@ -162,6 +274,88 @@ schema:
         self.assertRegexpMatches(resp_error, error_re)
 
 
+class TestBucketsBatchControllerNegative(test_base.BaseControllerTest):
+    """Test suite for validating negative scenarios for updating several
+    buckets in one request.
+    """
+
+    def setUp(self):
+        super(TestBucketsBatchControllerNegative, self).setUp()
+        rules = {'deckhand:create_cleartext_documents': '@'}
+        self.policy.set_rules(rules)
+        self.payload = factories.DocumentFactory(2, [1, 1]).gen_test({})
+
+    def _put_buckets(self, entries):
+        return self.app.simulate_put(
+            '/api/v1.0/buckets',
+            headers={'Content-Type': 'application/x-yaml'},
+            body=yaml.safe_dump_all(entries))
+
+    def test_put_buckets_with_invalid_entries(self):
+        invalid_entries = [
+            ['garbage'],
+            [{'bucket': 'mop'}],
+            [{'bucket': 'mop', 'documents': self.payload, 'foo': 'bar'}],
+            [{'bucket': '', 'documents': self.payload}],
+            [{'bucket': 'mop', 'documents': self.payload[0]}],
+        ]
+        for entries in invalid_entries:
+            resp = self._put_buckets(entries)
+            self.assertEqual(400, resp.status_code)
+            self.assertRegexpMatches(
+                resp.text, '.*Each entry must consist of the name of a '
+                           'bucket.*')
+
+        resp = self._put_buckets([
+            {'bucket': 'mop', 'documents': self.payload[:2]},
+            {'bucket': 'mop', 'documents': self.payload[2:]}])
+        self.assertEqual(400, resp.status_code)
+        self.assertRegexpMatches(
+            resp.text, '.*The bucket mop is specified more than once.*')
+
+    def test_put_buckets_with_invalid_document(self):
+        resp = self._put_buckets([
+            {'bucket': 'mop', 'documents': self.payload},
+            {'bucket': 'mip', 'documents': [{'schema': 'garbage'}]}])
+        self.assertEqual(400, resp.status_code)
+
+    def test_put_buckets_exceeding_max_documents_per_request(self):
+        self.override_config('max_documents_per_request', 2)
+
+        resp = self._put_buckets([
+            {'bucket': 'mop', 'documents': self.payload[:2]},
+            {'bucket': 'mip', 'documents': self.payload[2:]}])
+        self.assertEqual(413, resp.status_code)
+        self.assertRegexpMatches(
+            resp.text, '.*more than the maximum of 2 documents.*')
+
+    def test_put_buckets_with_same_document_is_atomic(self):
+        resp = self._put_buckets([
+            {'bucket': 'mop', 'documents': self.payload},
+            {'bucket': 'mip', 'documents': self.payload[2:]}])
+        self.assertEqual(409, resp.status_code)
+        self.assertRegexpMatches(' '.join(resp.text.split()),
+                                 '.*already exists in bucket mop.*')
+
+        # None of the buckets was updated.
+        self.assertEqual([], db_api.revision_get_all())
+
+    def test_put_buckets_conflicting_with_other_bucket_is_atomic(self):
+        resp = self.app.simulate_put(
+            '/api/v1.0/buckets/other/documents',
+            headers={'Content-Type': 'application/x-yaml'},
+            body=yaml.safe_dump_all(self.payload[2:]))
+        self.assertEqual(200, resp.status_code)
+
+        resp = self._put_buckets([
+            {'bucket': 'mop', 'documents': self.payload[:2]},
+            {'bucket': 'mip', 'documents': self.payload[2:]}])
+        self.assertEqual(409, resp.status_code)
+        self.assertRegexpMatches(' '.join(resp.text.split()),
+                                 '.*already exists in bucket other.*')
+        self.assertEqual(1, len(db_api.revision_get_all()))
+
+
 class TestBucketsControllerNegativeRBAC(test_base.BaseControllerTest):
     """Test suite for validating negative RBAC scenarios for bucket
     controller.
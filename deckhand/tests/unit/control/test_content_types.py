@@ -0,0 +1,142 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import json
+import yaml
+
+import falcon
+
+from deckhand.control import base as api_base
+from deckhand.control import content_types
+from deckhand import factories
+from deckhand.tests.unit import base as test_base
+
+
+class TestDeserializeDocuments(test_base.DeckhandTestCase):
+
+    def setUp(self):
+        super(TestDeserializeDocuments, self).setUp()
+        self.documents = factories.DocumentFactory(2, [1, 1]).gen_test({})
+
+    def _deserialize(self, media_type, payload):
+        stream = io.BytesIO(payload.encode('utf-8'))
+        return list(content_types.deserialize_documents(media_type, stream))
+
+    def test_deserialize_yaml_documents(self):
+        self.assertEqual(
+            self.documents,
+            self._deserialize(content_types.YAML,
+                              yaml.safe_dump_all(self.documents)))
+
+    def test_deserialize_json_documents(self):
+        payload = json.dumps(self.documents, indent=2)
+        self.assertEqual(self.documents,
+                         self._deserialize(content_types.JSON, payload))
+
+    def test_deserialize_json_documents_split_across_chunks(self):
+        # Use a tiny chunk size so that documents, strings, numbers and
+        # multi-byte characters all straddle chunk boundaries.
+        self.documents[-1]['data'] = {'unicode': u'é中', 'n': 12345}
+        payload = json.dumps(self.documents, ensure_ascii=False)
+        stream = io.BytesIO(payload.encode('utf-8'))
+
+        parser = content_types._JSONDocumentStream(stream, chunk_size=3)
+        self.assertEqual(self.documents, list(parser))
+
+    def test_deserialize_truncated_tokens_split_across_chunks(self):
+        # Values cut off at the end of a chunk are retried with more data,
+        # rather than rejected.
+        documents = [{'a': float('-inf'), 'b': u'\U0001f600', 'c': None}]
+        payload = json.dumps(documents)
+        for chunk_size in range(1, len(payload) + 1):
+            stream = io.BytesIO(payload.encode('utf-8'))
+            parser = content_types._JSONDocumentStream(
+                stream, chunk_size=chunk_size)
+            self.assertEqual(documents, list(parser))
+
+    def test_deserialize_single_json_document(self):
+        payload = json.dumps(self.documents[0])
+        self.assertEqual([self.documents[0]],
+                         self._deserialize(content_types.JSON, payload))
+
+    def test_deserialize_empty_payload(self):
+        for media_type in content_types.SUPPORTED_MEDIA_TYPES:
+            self.assertEqual([], self._deserialize(media_type, ''))
+        self.assertEqual([], self._deserialize(content_types.JSON, ' [ ] '))
+
+    def test_deserialize_documents_incrementally(self):
+        """Validate that documents are yielded before the rest of the stream
+        has been read.
+        """
+        for media_type, payload in (
+                (content_types.YAML, yaml.safe_dump_all(self.documents)),
+                (content_types.JSON, json.dumps(self.documents))):
+            payload += ' ' * (1024 * 1024)
+            stream = io.BytesIO(payload.encode('utf-8'))
+
+            documents = content_types.deserialize_documents(
+                media_type, stream)
+            self.assertEqual(self.documents[0], next(documents))
+            self.assertLess(stream.tell(), len(payload))
+
+
+class TestDeserializeDocumentsNegative(test_base.DeckhandTestCase):
+
+    def _deserialize(self, media_type, payload):
+        stream = io.BytesIO(payload.encode('utf-8'))
+        return list(content_types.deserialize_documents(media_type, stream))
+
+    def test_deserialize_malformed_json(self):
+        for payload in ('[{"a": 1}', '[{"a": 1} {"b": 2}]', '[{"a": }]',
+                        '{"a": 1} {"b": 2}', '[{"a": 1}] garbage'):
+            self.assertRaises(ValueError, self._deserialize,
+                              content_types.JSON, payload)
+
+    def test_malformed_json_rejected_without_reading_the_rest(self):
+        payload = '[{"a": x}, ' + ', '.join(['{"b": "%s"}' % ('c' * 64)] *
+                                           64 * 1024) + ']'
+        stream = io.BytesIO(payload.encode('utf-8'))
+        documents = content_types.deserialize_documents(
+            content_types.JSON, stream)
+        self.assertRaises(ValueError, next, documents)
+        self.assertEqual(content_types._CHUNK_SIZE, stream.tell())
+
+    def test_deserialize_malformed_yaml(self):
+        self.assertRaises(ValueError, self._deserialize, content_types.YAML,
+                          '---\na: 1\n---\nname:foo\nschema:\n  a:b\n')
+
+    def test_documents_before_malformed_document_are_yielded(self):
+        stream = io.BytesIO(b'[{"a": 1}, {"b": ]')
+        documents = content_types.deserialize_documents(
+            content_types.JSON, stream)
+        self.assertEqual({'a': 1}, next(documents))
+        self.assertRaises(ValueError, next, documents)
+
+
+class TestBoundedRequestStream(test_base.DeckhandTestCase):
+
+    def test_read_does_not_exceed_content_length(self):
+        stream = api_base.BoundedRequestStream(
+            io.BytesIO(b'abcdefgh'), content_length=4, max_size=10)
+        self.assertEqual(b'abc', stream.read(3))
+        self.assertEqual(b'd', stream.read(3))
+        self.assertEqual(b'', stream.read())
+        self.assertEqual(4, stream.bytes_read)
+
+    def test_read_exceeding_max_size_raises(self):
+        stream = api_base.BoundedRequestStream(
+            io.BytesIO(b'abcdefgh'), content_length=8, max_size=5)
+        self.assertEqual(b'abcd', stream.read(4))
+        self.assertRaises(falcon.HTTPRequestEntityTooLarge, stream.read, 4)
@@ -0,0 +1,157 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import yaml
+
+import mock
+
+from deckhand.db.sqlalchemy import api as db_api
+from deckhand import factories
+from deckhand.tests.unit.control import base as test_base
+
+
+class TestConditionalGet(test_base.BaseControllerTest):
+    """Test suite for validating ETags and conditional GET requests for
+    revision resources.
+    """
+
+    def setUp(self):
+        super(TestConditionalGet, self).setUp()
+        rules = {'deckhand:create_cleartext_documents': '@',
+                 'deckhand:list_cleartext_documents': '@',
+                 'deckhand:list_encrypted_documents': '@',
+                 'deckhand:show_revision': '@',
+                 'deckhand:show_revision_diff': '@',
+                 'deckhand:create_tag': '@'}
+        self.policy.set_rules(rules)
+
+        payload = factories.DocumentFactory(2, [1, 1]).gen_test({})
+        resp = self.app.simulate_put(
+            '/api/v1.0/buckets/mop/documents',
+            headers={'Content-Type': 'application/x-yaml'},
+            body=yaml.safe_dump_all(payload))
+        self.assertEqual(200, resp.status_code)
+        self.revision_id = list(yaml.safe_load_all(resp.text))[0][
+            'status']['revision']
+
+    def _get_urls(self):
+        return [
+            '/api/v1.0/revisions/%s' % self.revision_id,
+            '/api/v1.0/revisions/%s/documents' % self.revision_id,
+            '/api/v1.0/revisions/%s/rendered-documents' % self.revision_id,
+            '/api/v1.0/revisions/%s/diff/0' % self.revision_id,
+        ]
+
+    def _get(self, url, **headers):
+        headers.setdefault('Content-Type', 'application/x-yaml')
+        return self.app.simulate_get(url, headers=headers)
+
+    def test_get_with_matching_etag_returns_not_modified(self):
+        for url in self._get_urls():
+            resp = self._get(url)
+            self.assertEqual(200, resp.status_code)
+            etag = resp.headers['ETag']
+            self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+
+            resp = self._get(url, **{'If-None-Match': etag})
+            self.assertEqual(304, resp.status_code)
+            self.assertEqual('', resp.text)
+            self.assertEqual(etag, resp.headers['ETag'])
+
+            resp = self._get(url, **{'If-None-Match': '"foo", W/%s' % etag})
+            self.assertEqual(304, resp.status_code)
+
+    def test_get_with_stale_etag_returns_full_response(self):
+        for url in self._get_urls():
+            etag = self._get(url).headers['ETag']
+            resp = self._get(url, **{'If-None-Match': '"stale"'})
+            self.assertEqual(200, resp.status_code)
+            self.assertEqual(etag, resp.headers['ETag'])
+
+    def test_not_modified_does_not_load_documents(self):
+        url = '/api/v1.0/revisions/%s/documents' % self.revision_id
+        etag = self._get(url).headers['ETag']
+
+        with mock.patch.object(db_api, 'revision_get_documents',
+                               autospec=True) as m_get_documents:
+            resp = self._get(url, **{'If-None-Match': etag})
+        self.assertEqual(304, resp.status_code)
+        self.assertFalse(m_get_documents.called)
+
+    def test_etag_varies_with_filters_and_media_type(self):
+        url = '/api/v1.0/revisions/%s/documents' % self.revision_id
+        etag = self._get(url).headers['ETag']
+
+        filtered_resp = self.app.simulate_get(
+            url, headers={'Content-Type': 'application/x-yaml'},
+            params={'metadata.layeringDefinition.layer': 'site'})
+        self.assertNotEqual(etag, filtered_resp.headers['ETag'])
+
+        json_resp = self._get(url, Accept='application/json')
+        self.assertNotEqual(etag, json_resp.headers['ETag'])
+        self.assertIn('Accept', json_resp.headers['Vary'].split(','))
+
+    def test_revision_etag_changes_when_tagged(self):
+        url = '/api/v1.0/revisions/%s' % self.revision_id
+        etag = self._get(url).headers['ETag']
+
+        resp = self.app.simulate_post(
+            '/api/v1.0/revisions/%s/tags/foo' % self.revision_id,
+            headers={'Content-Type': 'application/x-yaml'})
+        self.assertEqual(201, resp.status_code)
+
+        resp = self._get(url, **{'If-None-Match': etag})
+        self.assertEqual(200, resp.status_code)
+        self.assertNotEqual(etag, resp.headers['ETag'])
+
+    def test_rendered_documents_etag_changes_when_secret_rotated(self):
+        secret = factories.DocumentSecretFactory().gen_test(
+            'Certificate', 'cleartext')
+        document = factories.DocumentFactory(1, [1]).gen_test(
+            {}, global_abstract=False)[-1]
+        document['metadata']['name'] = 'consumer'
+        document['metadata']['substitutions'] = [{
+            'dest': {'path': '.cert'},
+            'src': {'schema': secret['schema'],
+                    'name': secret['metadata']['name'],
+                    'path': '.'}
+        }]
+        for bucket_name, payload in (('secrets', [secret]),
+                                     ('site', [document])):
+            resp = self.app.simulate_put(
+                '/api/v1.0/buckets/%s/documents' % bucket_name,
+                headers={'Content-Type': 'application/x-yaml'},
+                body=yaml.safe_dump_all(payload))
+            self.assertEqual(200, resp.status_code)
+        revision_id = list(yaml.safe_load_all(resp.text))[0]['status'][
+            'revision']
+
+        url = '/api/v1.0/revisions/%s/rendered-documents' % revision_id
+        resp = self._get(url)
+        self.assertEqual(200, resp.status_code)
+        etag = resp.headers['ETag']
+        self.assertIn(secret['data'], resp.text)
+
+        # Rotate the secret in a later revision.
+        secret['data'] = 'rotated'
+        resp = self.app.simulate_put(
+            '/api/v1.0/buckets/secrets/documents',
+            headers={'Content-Type': 'application/x-yaml'},
+            body=yaml.safe_dump_all([secret]))
+        self.assertEqual(200, resp.status_code)
+
+        resp = self._get(url, **{'If-None-Match': etag})
+        self.assertEqual(200, resp.status_code)
+        self.assertNotEqual(etag, resp.headers['ETag'])
+        self.assertIn('rotated', resp.text)
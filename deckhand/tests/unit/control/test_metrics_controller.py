@@ -0,0 +1,94 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from prometheus_client import parser
+import yaml
+
+from deckhand import factories
+from deckhand.tests.unit.control import base as test_base
+
+
+class TestMetricsController(test_base.BaseControllerTest):
+
+    def setUp(self):
+        super(TestMetricsController, self).setUp()
+        self.policy.set_rules({'deckhand:create_cleartext_documents': '@',
+                               'deckhand:list_cleartext_documents': '@',
+                               'deckhand:list_encrypted_documents': '@'})
+
+    def _get_samples(self):
+        resp = self.app.simulate_get('/metrics')
+        self.assertEqual(200, resp.status_code)
+        self.assertTrue(resp.headers['Content-Type'].startswith('text/plain'))
+        return {(s.name, tuple(sorted(s.labels.items()))): s.value
+                for family in parser.text_string_to_metric_families(resp.text)
+                for s in family.samples}
+
+    def _get_delta(self, before, after, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        return after.get(key, 0) - before.get(key, 0)
+
+    def test_get_metrics(self):
+        before = self._get_samples()
+
+        payload = factories.DocumentFactory(2, [1, 1]).gen_test({})
+        resp = self.app.simulate_put(
+            '/api/v1.0/buckets/mop/documents',
+            headers={'Content-Type': 'application/x-yaml'},
+            body=yaml.safe_dump_all(payload))
+        self.assertEqual(200, resp.status_code)
+        revision_id = list(yaml.safe_load_all(resp.text))[0]['status'][
+            'revision']
+
+        url = '/api/v1.0/revisions/%s/rendered-documents' % revision_id
+        resp = self.app.simulate_get(
+            url, headers={'Content-Type': 'application/x-yaml'})
+        self.assertEqual(200, resp.status_code)
+        resp = self.app.simulate_get(
+            url, headers={'Content-Type': 'application/x-yaml',
+                          'If-None-Match': resp.headers['ETag']})
+        self.assertEqual(304, resp.status_code)
+
+        after = self._get_samples()
+
+        self.assertEqual(1, self._get_delta(
+            before, after, 'deckhand_request_duration_seconds_count',
+            route='/api/v1.0/buckets/{bucket_name}/documents',
+            method='PUT', status='200'))
+        self.assertEqual(1, self._get_delta(
+            before, after, 'deckhand_request_duration_seconds_count',
+            route='/api/v1.0/revisions/{revision_id}/rendered-documents',
+            method='GET', status='304'))
+        self.assertEqual(1, self._get_delta(
+            before, after, 'deckhand_bucket_documents_count'))
+        self.assertEqual(len(payload), self._get_delta(
+            before, after, 'deckhand_bucket_documents_sum'))
+        self.assertEqual(1, self._get_delta(
+            before, after, 'deckhand_cache_requests_total',
+            cache='rendered_documents', result='hit'))
+        self.assertEqual(1, self._get_delta(
+            before, after, 'deckhand_cache_requests_total',
+            cache='rendered_documents', result='miss'))
+        self.assertGreater(self._get_delta(
+            before, after, 'deckhand_db_query_duration_seconds_count',
+            statement='INSERT'), 0)
+        self.assertEqual(3, self._get_delta(
+            before, after, 'deckhand_db_pool_checkout_duration_seconds_count',
+            engine='primary'))
+        # The /metrics request itself is in flight.
+        self.assertEqual(
+            1, after[('deckhand_requests_in_flight', ())])
+        self.assertEqual(0, after[(
+            'deckhand_db_pool_checked_out_connections',
+            (('engine', 'primary'),))])
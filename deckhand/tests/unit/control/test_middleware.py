@@ -12,10 +12,28 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
+import json
+import os
+import pstats
 import yaml
+import zlib
 
+import falcon
+from falcon import testing as falcon_testing
+import fixtures
 import mock
 
+import sqlalchemy
+import testtools
+
+from deckhand.control import content_types
+from deckhand.control import middleware
+from deckhand.db.sqlalchemy import api as db_api
+from deckhand.db.sqlalchemy import profiler
+from deckhand import factories
+from deckhand import profiling
+from deckhand.tests.unit import base as unit_test_base
 from deckhand.tests.unit.control import base as test_base
 
 
@@ -32,6 +50,105 @@ class TestYAMLTranslator(test_base.BaseControllerTest):
             headers={'Content-Type': 'application/x-yaml;encoding=utf-8'})
         self.assertEqual(200, resp.status_code)
 
+    def test_request_with_json_content_type(self):
+        resp = self.app.simulate_get(
+            '/versions', headers={'Content-Type': 'application/json'})
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual('application/x-yaml', resp.headers['Content-Type'])
+        self.assertIn('v1.0', yaml.safe_load(resp.text))
+
+    def test_response_defaults_to_yaml_for_wildcard_accept(self):
+        resp = self.app.simulate_get(
+            '/versions', headers={'Content-Type': 'application/x-yaml',
+                                  'Accept': '*/*'})
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual('application/x-yaml', resp.headers['Content-Type'])
+
+    def test_response_with_json_accept(self):
+        resp = self.app.simulate_get(
+            '/versions', headers={'Content-Type': 'application/x-yaml',
+                                  'Accept': 'application/json'})
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual('application/json', resp.headers['Content-Type'])
+        self.assertEqual({'v1.0': {'path': '/api/v1.0', 'status': 'stable'}},
+                         json.loads(resp.text))
+
+    def test_put_and_list_documents_as_json(self):
+        rules = {'deckhand:create_cleartext_documents': '@',
+                 'deckhand:list_cleartext_documents': '@',
+                 'deckhand:list_encrypted_documents': '@'}
+        self.policy.set_rules(rules)
+
+        documents_factory = factories.DocumentFactory(2, [1, 1])
+        payload = documents_factory.gen_test({
+            "_GLOBAL_DATA_1_": {"data": {"a": {"x": 1, "y": 2}}},
+            "_SITE_DATA_1_": {"data": {"a": {"x": 7, "z": 3}, "b": 4}},
+            "_SITE_ACTIONS_1_": {
+                "actions": [{"method": "merge", "path": "."}]}
+        })
+        headers = {'Content-Type': 'application/json',
+                   'Accept': 'application/json'}
+
+        resp = self.app.simulate_put(
+            '/api/v1.0/buckets/mop/documents', headers=headers,
+            body=json.dumps(payload))
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual('application/json', resp.headers['Content-Type'])
+        created_documents = json.loads(resp.text)
+        self.assertIsInstance(created_documents, list)
+        self.assertEqual(3, len(created_documents))
+        revision_id = created_documents[0]['status']['revision']
+
+        resp = self.app.simulate_get(
+            '/api/v1.0/revisions/%s/documents' % revision_id,
+            headers=headers)
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual(
+            sorted([d['metadata']['name'] for d in payload]),
+            sorted([d['metadata']['name'] for d in json.loads(resp.text)]))
+
+
+class TestSerializeResponse(unit_test_base.DeckhandTestCase):
+
+    def _get_req_resp(self, accept, body):
+        req = mock.Mock(**{'get_header.return_value': accept,
+                           'client_prefers.return_value': accept})
+        resp = mock.Mock(body=body)
+        return req, resp
+
+    def test_structured_body_serialized_once_as_yaml(self):
+        req, resp = self._get_req_resp(None, [{'a': 1}, {'b': 2}])
+        mock_dump_all = self.patchobject(
+            content_types.yaml_codec, 'safe_dump_all')
+        mock_dump_all.return_value = '---\na: 1\n---\nb: 2\n'
+
+        content_types.serialize_response(req, resp)
+        content_types.serialize_response(req, resp)
+
+        self.assertEqual(1, mock_dump_all.call_count)
+        self.assertEqual([{'a': 1}, {'b': 2}],
+                         list(yaml.safe_load_all(resp.body)))
+        resp.set_header.assert_called_with('Content-Type',
+                                           'application/x-yaml')
+
+    def test_structured_body_serialized_as_json(self):
+        req, resp = self._get_req_resp('application/json', {'a': 1})
+
+        content_types.serialize_response(req, resp)
+
+        self.assertEqual({'a': 1}, json.loads(resp.body))
+        resp.set_header.assert_called_with('Content-Type', 'application/json')
+
+    def test_string_body_is_not_parsed(self):
+        body = '{"a": 1}'
+        req, resp = self._get_req_resp('application/x-yaml', body)
+        mock_loads = self.patchobject(content_types.jsonutils, 'loads')
+
+        content_types.serialize_response(req, resp)
+
+        self.assertFalse(mock_loads.called)
+        self.assertIs(body, resp.body)
+
 
 class TestYAMLTranslatorNegative(test_base.BaseControllerTest):
 
@@ -61,7 +178,7 @@ class TestYAMLTranslatorNegative(test_base.BaseControllerTest):
 
     def test_request_with_invalid_content_type_raises_exception(self):
         resp = self.app.simulate_get(
-            '/versions', headers={'Content-Type': 'application/json'})
+            '/versions', headers={'Content-Type': 'text/plain'})
         self.assertEqual(415, resp.status_code)
 
         expected = {
@@ -73,13 +190,15 @@ class TestYAMLTranslatorNegative(test_base.BaseControllerTest):
                 'messageList': [{
                     'error': True,
                     'message': (
-                        "Unexpected content type: application/json. Expected "
-                        "content types are: ['application/x-yaml'].")
+                        "Unexpected content type: text/plain. Expected "
+                        "content types are: ['application/x-yaml', "
+                        "'application/json'].")
                 }]
             },
             'kind': 'status',
-            'message': ("Unexpected content type: application/json. Expected "
-                        "content types are: ['application/x-yaml']."),
+            'message': ("Unexpected content type: text/plain. Expected "
+                        "content types are: ['application/x-yaml', "
+                        "'application/json']."),
             'metadata': {},
             'reason': 'Unsupported media type',
             'retry': False,
@@ -105,15 +224,414 @@ class TestYAMLTranslatorNegative(test_base.BaseControllerTest):
                     'error': True,
                     'message': (
                         "Unexpected content type: application/yaml. Expected "
-                        "content types are: ['application/x-yaml'].")
+                        "content types are: ['application/x-yaml', "
+                        "'application/json'].")
                 }]
             },
             'kind': 'status',
             'message': ("Unexpected content type: application/yaml. Expected "
-                        "content types are: ['application/x-yaml']."),
+                        "content types are: ['application/x-yaml', "
+                        "'application/json']."),
             'metadata': {},
             'reason': 'Unsupported media type',
             'retry': False,
             'status': 'Failure'
         }
         self.assertEqual(expected, yaml.safe_load(resp.content))
+
+    def test_error_response_with_json_accept(self):
+        resp = self.app.simulate_get(
+            '/versions', headers={'Content-Type': 'text/plain',
+                                  'Accept': 'application/json'})
+        self.assertEqual(415, resp.status_code)
+        self.assertEqual('application/json', resp.headers['Content-Type'])
+
+        error = json.loads(resp.text)
+        self.assertEqual('415 Unsupported Media Type', error['code'])
+        self.assertEqual('HTTPUnsupportedMediaType',
+                         error['details']['errorType'])
+
+    def test_request_with_malformed_json_body_raises_exception(self):
+        self.policy.set_rules({'deckhand:create_cleartext_documents': '@'})
+
+        resp = self.app.simulate_put(
+            '/api/v1.0/buckets/mop/documents',
+            headers={'Content-Type': 'application/json'},
+            body='[{"schema": ')
+        self.assertEqual(400, resp.status_code)
+
+
+class TestTimingMiddleware(test_base.BaseControllerTest):
+
+    def setUp(self):
+        super(TestTimingMiddleware, self).setUp()
+        self.policy.set_rules({'deckhand:create_cleartext_documents': '@',
+                               'deckhand:list_cleartext_documents': '@'})
+        self.payload = yaml.safe_dump_all(
+            factories.DocumentFactory(2, [1, 1]).gen_test({}))
+
+    def _put(self):
+        return self.app.simulate_put(
+            '/api/v1.0/buckets/mop/documents',
+            headers={'Content-Type': 'application/x-yaml'},
+            body=self.payload)
+
+    def _get_server_timing(self, resp):
+        metrics = {}
+        for metric in resp.headers['Server-Timing'].split(','):
+            name, duration = metric.strip().split(';dur=')
+            metrics[name] = float(duration)
+        return metrics
+
+    def test_server_timing_header(self):
+        resp = self._put()
+        self.assertEqual(200, resp.status_code)
+
+        metrics = self._get_server_timing(resp)
+        self.assertEqual(
+            set(['parse', 'validation', 'db', 'serialization', 'total']),
+            set(metrics))
+        self.assertLessEqual(
+            sum(v for k, v in metrics.items() if k != 'total'),
+            # Allow for each phase being rounded up.
+            metrics['total'] + 0.05 * (len(metrics) - 1))
+
+    def test_server_timing_header_for_rendered_documents(self):
+        revision_id = list(yaml.safe_load_all(self._put().text))[0][
+            'status']['revision']
+        resp = self.app.simulate_get(
+            '/api/v1.0/revisions/%s/rendered-documents' % revision_id,
+            headers={'Content-Type': 'application/x-yaml'})
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual(set(['db', 'substitution', 'serialization', 'total']),
+                         set(self._get_server_timing(resp)))
+
+    def test_server_timing_header_disabled(self):
+        self.override_config('server_timing', False)
+        resp = self._put()
+        self.assertEqual(200, resp.status_code)
+        self.assertNotIn('Server-Timing', resp.headers)
+
+    @mock.patch.object(middleware, 'LOG', autospec=True)
+    def test_slow_request_logged(self, mock_log):
+        self.override_config('slow_request_threshold', 1e-9)
+        resp = self._put()
+        self.assertEqual(200, resp.status_code)
+
+        mock_log.warning.assert_called_once_with('Slow request: %s', mock.ANY)
+        record = json.loads(mock_log.warning.call_args[0][1])
+        self.assertEqual('PUT', record['method'])
+        self.assertEqual('/api/v1.0/buckets/mop/documents', record['path'])
+        self.assertEqual('200 OK', record['status'])
+        self.assertIn('validation', record['phases_ms'])
+
+    @mock.patch.object(middleware, 'LOG', autospec=True)
+    def test_fast_request_not_logged(self, mock_log):
+        resp = self._put()
+        self.assertEqual(200, resp.status_code)
+        mock_log.warning.assert_not_called()
+
+
+class TestDBRequestScopeMiddleware(test_base.BaseControllerTest):
+
+    def setUp(self):
+        super(TestDBRequestScopeMiddleware, self).setUp()
+        rules = {'deckhand:create_cleartext_documents': '@',
+                 'deckhand:list_cleartext_documents': '@'}
+        self.policy.set_rules(rules)
+
+        documents_factory = factories.DocumentFactory(2, [1, 1])
+        self.payload = documents_factory.gen_test({})
+        resp = self.app.simulate_put(
+            '/api/v1.0/buckets/mop/documents',
+            headers={'Content-Type': 'application/x-yaml'},
+            body=yaml.safe_dump_all(self.payload))
+        self.assertEqual(200, resp.status_code)
+        self.revision_id = list(yaml.safe_load_all(resp.text))[0]['status'][
+            'revision']
+
+        self.checkouts = []
+        engine = db_api.get_engine()
+        sqlalchemy.event.listen(engine, 'checkout', self._on_checkout)
+        self.addCleanup(sqlalchemy.event.remove, engine, 'checkout',
+                        self._on_checkout)
+
+    def _on_checkout(self, *args):
+        self.checkouts.append(args)
+
+    def test_request_uses_one_connection(self):
+        resp = self.app.simulate_get(
+            '/api/v1.0/revisions/%s/rendered-documents' % self.revision_id,
+            headers={'Content-Type': 'application/x-yaml'})
+        self.assertEqual(200, resp.status_code)
+
+        self.assertEqual(1, len(self.checkouts))
+        self.assertFalse(db_api._REQUEST_SCOPE.active)
+        self.assertEqual({}, db_api._REQUEST_SCOPE.connections)
+
+    @mock.patch.object(db_api, 'begin_request', autospec=True)
+    def test_read_only_requests(self, mock_begin_request):
+        for method, headers, read_only in (
+                ('GET', {}, True),
+                ('HEAD', {}, True),
+                ('GET', {'Cache-Control': 'no-cache'}, False),
+                ('GET', {'Cookie': 'deckhand_read_after_write=1'}, False),
+                ('PUT', {}, False)):
+            headers['Content-Type'] = 'application/x-yaml'
+            self.app.simulate_request(method, '/versions', headers=headers)
+            mock_begin_request.assert_called_once_with(read_only=read_only)
+            mock_begin_request.reset_mock()
+
+    def test_write_sets_read_after_write_cookie(self):
+        self.patchobject(db_api, 'has_slave').return_value = True
+        resp = self.app.simulate_put(
+            '/api/v1.0/buckets/mop/documents',
+            headers={'Content-Type': 'application/x-yaml'},
+            body=yaml.safe_dump_all(self.payload))
+        self.assertEqual(200, resp.status_code)
+        self.assertIn('deckhand_read_after_write=1',
+                      resp.headers['Set-Cookie'])
+        self.assertIn('Max-Age=30', resp.headers['Set-Cookie'])
+
+        # Reads don't set it.
+        resp = self.app.simulate_get(
+            '/api/v1.0/revisions/%s/documents' % self.revision_id,
+            headers={'Content-Type': 'application/x-yaml'})
+        self.assertEqual(200, resp.status_code)
+        self.assertNotIn('Set-Cookie', resp.headers)
+
+    def test_read_after_write_cookie_not_set_without_slave(self):
+        mock_has_slave = self.patchobject(db_api, 'has_slave')
+        for window, has_slave in ((30, False), (0, True)):
+            self.override_config('read_after_write_window', window)
+            mock_has_slave.return_value = has_slave
+            resp = self.app.simulate_put(
+                '/api/v1.0/buckets/mop/documents',
+                headers={'Content-Type': 'application/x-yaml'},
+                body=yaml.safe_dump_all(self.payload))
+            self.assertEqual(200, resp.status_code)
+            self.assertNotIn('Set-Cookie', resp.headers)
+
+    def test_request_scope_ended_after_error(self):
+        resp = self.app.simulate_get(
+            '/api/v1.0/revisions/%s/documents' % (self.revision_id + 1),
+            headers={'Content-Type': 'application/x-yaml'})
+        self.assertEqual(404, resp.status_code)
+
+        self.assertFalse(db_api._REQUEST_SCOPE.active)
+        self.assertEqual({}, db_api._REQUEST_SCOPE.connections)
+
+    @mock.patch.object(middleware, 'LOG', autospec=True)
+    def test_sql_profile_logged(self, mock_log):
+        self.override_config('sql', True, group='profiler')
+        self.override_config('sql_explain', True, group='profiler')
+        resp = self.app.simulate_get(
+            '/api/v1.0/revisions/%s/documents' % self.revision_id,
+            headers={'Content-Type': 'application/x-yaml'})
+        self.assertEqual(200, resp.status_code)
+
+        mock_log.info.assert_called_once_with(
+            'SQL profile of %s %s: %s', 'GET',
+            '/api/v1.0/revisions/%s/documents' % self.revision_id, mock.ANY)
+        report = mock_log.info.call_args[0][3]
+        self.assertIn('revision_get_documents: ', report)
+        self.assertIn('Slowest statements:', report)
+        self.assertIn('    | ', report)
+        self.assertFalse(profiler.is_active())
+
+    @mock.patch.object(middleware, 'LOG', autospec=True)
+    def test_sql_profile_not_logged_by_default(self, mock_log):
+        resp = self.app.simulate_get(
+            '/api/v1.0/revisions/%s/documents' % self.revision_id,
+            headers={'Content-Type': 'application/x-yaml'})
+        self.assertEqual(200, resp.status_code)
+        mock_log.info.assert_not_called()
+
+
+class TestProfilingMiddleware(test_base.BaseControllerTest):
+
+    def setUp(self):
+        super(TestProfilingMiddleware, self).setUp()
+        rules = {'deckhand:create_cleartext_documents': '@',
+                 'deckhand:list_cleartext_documents': '@',
+                 'deckhand:list_encrypted_documents': '@',
+                 'deckhand:profile_request': '@'}
+        self.policy.set_rules(rules)
+
+        documents_factory = factories.DocumentFactory(2, [1, 1])
+        payload = documents_factory.gen_test({})
+        resp = self.app.simulate_put(
+            '/api/v1.0/buckets/mop/documents',
+            headers={'Content-Type': 'application/x-yaml'},
+            body=yaml.safe_dump_all(payload))
+        self.assertEqual(200, resp.status_code)
+        self.revision_id = list(yaml.safe_load_all(resp.text))[0]['status'][
+            'revision']
+
+    def _get_rendered_documents(self, profile=None):
+        headers = {'Content-Type': 'application/x-yaml'}
+        if profile is not None:
+            headers['X-Deckhand-Profile'] = profile
+        return self.app.simulate_get(
+            '/api/v1.0/revisions/%s/rendered-documents' % self.revision_id,
+            headers=headers)
+
+    def test_cpu_profile_returned_as_attachment(self):
+        resp = self._get_rendered_documents('cpu')
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual('text/plain', resp.headers['Content-Type'])
+        self.assertRegex(resp.headers['Content-Disposition'],
+                         r'^attachment; filename="deckhand-profile-.*\.txt"$')
+        self.assertNotIn('ETag', resp.headers)
+
+        self.assertTrue(resp.text.startswith(
+            'Profile of GET /api/v1.0/revisions/%s/rendered-documents '
+            '(200 OK)' % self.revision_id))
+        self.assertIn('CPU profile, by cumulative time:', resp.text)
+        self.assertIn('revision_documents.py', resp.text)
+        self.assertNotIn('Memory', resp.text)
+
+    @testtools.skipIf(not profiling.is_supported(profiling.MEMORY),
+                      'tracemalloc is not available')
+    def test_cpu_and_memory_profile(self):
+        self.override_config('request_top_entries', 3, group='profiler')
+        resp = self._get_rendered_documents('cpu, Memory')
+        self.assertEqual(200, resp.status_code)
+        self.assertIn('CPU profile, by cumulative time:', resp.text)
+        self.assertIn('Peak of traced memory: ', resp.text)
+        self.assertIn('Top 3 allocations, by source line:', resp.text)
+        self.assertFalse(profiling.tracemalloc.is_tracing())
+
+    def test_profile_written_to_output_dir(self):
+        output_dir = self.useFixture(fixtures.TempDir()).path
+        self.override_config('request_output_dir', output_dir,
+                             group='profiler')
+
+        resp = self._get_rendered_documents('cpu')
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual('application/x-yaml', resp.headers['Content-Type'])
+
+        paths = resp.headers['X-Deckhand-Profile-Output'].split(', ')
+        self.assertEqual(['.txt', '.pstats'],
+                         [os.path.splitext(p)[1] for p in paths])
+        self.assertEqual(sorted(os.path.basename(p) for p in paths),
+                         sorted(os.listdir(output_dir)))
+        with open(paths[0]) as f:
+            self.assertIn('CPU profile, by cumulative time:', f.read())
+        self.assertTrue(pstats.Stats(paths[1]).total_calls)
+
+    def test_profile_error_response(self):
+        resp = self.app.simulate_get(
+            '/api/v1.0/revisions/%s/documents' % (self.revision_id + 1),
+            headers={'Content-Type': 'application/x-yaml',
+                     'X-Deckhand-Profile': 'cpu'})
+        self.assertEqual(200, resp.status_code)
+        self.assertIn('(404 Not Found)', resp.text.splitlines()[0])
+
+    def test_profile_request_forbidden(self):
+        self.policy.set_rules({'deckhand:profile_request': '!'})
+        resp = self._get_rendered_documents('cpu')
+        self.assertEqual(403, resp.status_code)
+        self.assertFalse(profiling._LOCK.locked())
+
+    def test_invalid_profiling_mode(self):
+        for profile in (',', 'disk', 'cpu,disk'):
+            resp = self._get_rendered_documents(profile)
+            self.assertEqual(400, resp.status_code, profile)
+
+    def test_request_profiled_concurrently(self):
+        with profiling._LOCK:
+            resp = self._get_rendered_documents('cpu')
+        self.assertEqual(409, resp.status_code)
+
+    @mock.patch.object(profiling, 'RequestProfile', autospec=True)
+    def test_request_without_header_not_profiled(self, mock_profile):
+        resp = self._get_rendered_documents()
+        self.assertEqual(200, resp.status_code)
+        self.assertNotIn('X-Deckhand-Profile-Output', resp.headers)
+        mock_profile.assert_not_called()
+
+
+class TestCompressionMiddleware(test_base.BaseControllerTest):
+
+    def setUp(self):
+        super(TestCompressionMiddleware, self).setUp()
+        self.policy.set_rules({'deckhand:create_cleartext_documents': '@',
+                               'deckhand:list_cleartext_documents': '@',
+                               'deckhand:list_encrypted_documents': '@'})
+        payload = factories.DocumentFactory(2, [1, 1]).gen_test({})
+        resp = self.app.simulate_put(
+            '/api/v1.0/buckets/mop/documents',
+            headers={'Content-Type': 'application/x-yaml'},
+            body=yaml.safe_dump_all(payload))
+        self.assertEqual(200, resp.status_code)
+        self.url = '/api/v1.0/revisions/%s/documents' % (
+            list(yaml.safe_load_all(resp.text))[0]['status']['revision'])
+        self.override_config('min_size', 0, group='compression')
+
+    def _get(self, **headers):
+        headers.setdefault('Content-Type', 'application/x-yaml')
+        return self.app.simulate_get(self.url, headers=headers)
+
+    def test_gzip_response(self):
+        expected = self._get().content
+
+        resp = self._get(**{'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual('gzip', resp.headers['Content-Encoding'])
+        self.assertIn('Accept-Encoding', resp.headers['Vary'].split(','))
+        self.assertEqual(
+            expected, zlib.decompress(resp.content, 16 + zlib.MAX_WBITS))
+
+    def test_deflate_response(self):
+        self.override_config('encodings', ['gzip', 'deflate'],
+                             group='compression')
+        expected = self._get().content
+
+        resp = self._get(**{'Accept-Encoding': 'gzip;q=0.5, deflate'})
+        self.assertEqual('deflate', resp.headers['Content-Encoding'])
+        self.assertEqual(expected, zlib.decompress(resp.content))
+
+    def test_no_compression_when_not_accepted(self):
+        for accept_encoding in (None, 'identity', 'gzip;q=0', 'br',
+                                'deflate'):
+            headers = {}
+            if accept_encoding:
+                headers['Accept-Encoding'] = accept_encoding
+            resp = self._get(**headers)
+            self.assertNotIn('Content-Encoding', resp.headers)
+
+    def test_no_compression_below_min_size(self):
+        self.override_config('min_size', 1024 * 1024, group='compression')
+        resp = self._get(**{'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', resp.headers)
+
+    def test_no_compression_when_disabled(self):
+        self.override_config('enabled', False, group='compression')
+        resp = self._get(**{'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', resp.headers)
+
+    def test_compressed_response_has_weak_etag(self):
+        etag = self._get().headers['ETag']
+
+        resp = self._get(**{'Accept-Encoding': 'gzip'})
+        self.assertEqual('W/' + etag, resp.headers['ETag'])
+
+        resp = self._get(**{'Accept-Encoding': 'gzip',
+                            'If-None-Match': resp.headers['ETag']})
+        self.assertEqual(304, resp.status_code)
+        self.assertEqual(b'', resp.content)
+
+    def test_compress_streamed_response(self):
+        req = falcon.Request(falcon_testing.create_environ(
+            headers={'Accept-Encoding': 'gzip'}))
+        resp = falcon.Response()
+        resp.set_stream(io.BytesIO(b'foo: bar\n' * 10000), 90000)
+
+        middleware.CompressionMiddleware().process_response(req, resp, None)
+
+        self.assertEqual('gzip', resp.get_header('Content-Encoding'))
+        self.assertIsNone(resp.stream_len)
+        self.assertEqual(
+            b'foo: bar\n' * 10000,
+            zlib.decompress(b''.join(resp.stream), 16 + zlib.MAX_WBITS))
@@ -0,0 +1,136 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+
+import yaml
+
+from deckhand import factories
+from deckhand.tests.unit.control import base as test_base
+
+
+class TestQueryCounts(test_base.BaseControllerTest):
+    """Guard the key API operations against N+1 query patterns.
+
+    Each read operation must execute at most a fixed number of SQL
+    statements, whatever the number of buckets, documents and revisions, so
+    the limits are asserted against a site that is much larger than the one
+    they were measured with.
+    """
+
+    # Number of documents added to each extra bucket.
+    NUM_DOCUMENTS = 20
+    # Number of extra buckets, each of which creates a revision.
+    NUM_BUCKETS = 3
+
+    def setUp(self):
+        super(TestQueryCounts, self).setUp()
+        rules = {'deckhand:create_cleartext_documents': '@',
+                 'deckhand:list_cleartext_documents': '@',
+                 'deckhand:list_encrypted_documents': '@',
+                 'deckhand:list_revisions': '@',
+                 'deckhand:show_revision': '@',
+                 'deckhand:show_revision_diff': '@',
+                 'deckhand:list_tags': '@',
+                 'deckhand:list_validations': '@',
+                 'deckhand:create_encrypted_documents': '@'}
+        self.policy.set_rules(rules)
+
+        documents_factory = factories.DocumentFactory(2, [1, 1])
+        self.payload = documents_factory.gen_test({})
+        self.revision_id = self._put('site', self.payload)
+        for idx in range(self.NUM_BUCKETS):
+            self.revision_id = self._put(
+                'bucket%d' % idx, self._gen_documents(
+                    'bucket%d' % idx, self.NUM_DOCUMENTS))
+
+    def _gen_documents(self, prefix, num_docs):
+        # Copies of the site document, which are layered onto the same
+        # global document.
+        documents = []
+        for idx in range(num_docs):
+            document = copy.deepcopy(self.payload[-1])
+            document['metadata']['name'] = '%s-%d' % (prefix, idx)
+            documents.append(document)
+        return documents
+
+    def _put(self, bucket_name, documents):
+        resp = self.app.simulate_put(
+            '/api/v1.0/buckets/%s/documents' % bucket_name,
+            headers={'Content-Type': 'application/x-yaml'},
+            body=yaml.safe_dump_all(documents))
+        self.assertEqual(200, resp.status_code)
+        return list(yaml.safe_load_all(resp.text))[0]['status']['revision']
+
+    def _get(self, path):
+        resp = self.app.simulate_get(
+            '/api/v1.0/' + path,
+            headers={'Content-Type': 'application/x-yaml'})
+        self.assertEqual(200, resp.status_code)
+        return resp
+
+    def test_put_documents(self):
+        # Only the documents and their validation entries are inserted one
+        # by one, so each document costs 2 statements on top of a fixed number.
+        documents = self._gen_documents('new', self.NUM_DOCUMENTS)
+        with self.assertMaxQueries(36 + 2 * len(documents)):
+            self._put('new', documents)
+
+    def test_update_documents(self):
+        documents = self._gen_documents('bucket0', self.NUM_DOCUMENTS)
+        documents[0]['data'] = {'updated': True}
+        with self.assertMaxQueries(36 + 2 * len(documents)):
+            self._put('bucket0', documents[:-1])
+
+    def test_list_revision_documents(self):
+        with self.assertMaxQueries(10):
+            self._get('revisions/%s/documents' % self.revision_id)
+
+    def test_list_rendered_documents(self):
+        with self.assertMaxQueries(11):
+            self._get('revisions/%s/rendered-documents' % self.revision_id)
+
+    def test_list_revisions(self):
+        with self.assertMaxQueries(2):
+            self._get('revisions')
+
+    def test_show_revision(self):
+        with self.assertMaxQueries(5):
+            self._get('revisions/%s' % self.revision_id)
+
+    def test_diff_revisions(self):
+        with self.assertMaxQueries(4):
+            self._get('revisions/0/diff/%s' % self.revision_id)
+        with self.assertMaxQueries(7):
+            self._get('revisions/1/diff/%s' % self.revision_id)
+
+    def test_list_revision_tags(self):
+        with self.assertMaxQueries(3):
+            self._get('revisions/%s/tags' % self.revision_id)
+
+    def test_list_revision_validations(self):
+        with self.assertMaxQueries(3):
+            self._get('revisions/%s/validations' % self.revision_id)
+
+    def test_rollback_revision(self):
+        # The documents are copied by the database, so the number of queries
+        # doesn't depend on the number of documents.
+        documents = self._gen_documents('bucket0', self.NUM_DOCUMENTS)
+        documents[0]['data'] = {'updated': True}
+        self._put('bucket0', documents)
+        with self.assertMaxQueries(18):
+            resp = self.app.simulate_post(
+                '/api/v1.0/rollback/%s' % self.revision_id,
+                headers={'Content-Type': 'application/x-yaml'})
+        self.assertEqual(201, resp.status_code)
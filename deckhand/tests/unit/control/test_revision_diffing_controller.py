@@ -0,0 +1,94 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import yaml
+
+from deckhand import factories
+from deckhand.tests.unit.control import base as test_base
+
+
+class TestRevisionDiffingController(test_base.BaseControllerTest):
+
+    def setUp(self):
+        super(TestRevisionDiffingController, self).setUp()
+        rules = {'deckhand:create_cleartext_documents': '@',
+                 'deckhand:show_revision_diff': '@'}
+        self.policy.set_rules(rules)
+
+        documents_factory = factories.DocumentFactory(2, [1, 1])
+        self.payload = documents_factory.gen_test({
+            '_GLOBAL_DATA_1_': {'data': {'a': {'x': 1, 'y': 2}}},
+            '_SITE_DATA_1_': {'data': {'a': {'x': 7, 'z': 3}, 'b': 4}},
+            '_SITE_ACTIONS_1_': {
+                'actions': [{'method': 'merge', 'path': '.'}]}
+        })
+        self.revision_id = self._put(self.payload)
+
+    def _put(self, payload):
+        resp = self.app.simulate_put(
+            '/api/v1.0/buckets/mop/documents',
+            headers={'Content-Type': 'application/x-yaml'},
+            body=yaml.safe_dump_all(payload))
+        self.assertEqual(200, resp.status_code)
+        return list(yaml.safe_load_all(resp.text))[0]['status']['revision']
+
+    def _diff(self, revision_id, comparison_revision_id, **params):
+        return self.app.simulate_get(
+            '/api/v1.0/revisions/%s/diff/%s' % (revision_id,
+                                                comparison_revision_id),
+            headers={'Content-Type': 'application/x-yaml'}, params=params)
+
+    def test_diff_without_detail(self):
+        resp = self._diff(0, self.revision_id)
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual({'mop': 'created'}, yaml.safe_load(resp.text))
+
+    def test_diff_with_detail(self):
+        self.payload[-1]['data'] = {'a': {'x': 8, 'z': 3}, 'c': 5}
+        comparison_revision_id = self._put(self.payload)
+
+        resp = self._diff(self.revision_id, comparison_revision_id,
+                          detail='true')
+        self.assertEqual(200, resp.status_code)
+
+        expected = {
+            'buckets': {'mop': 'modified'},
+            'count': 1,
+            'results': [{
+                'bucket': 'mop',
+                'schema': self.payload[-1]['schema'],
+                'name': self.payload[-1]['metadata']['name'],
+                'status': 'changed',
+                'patch': [
+                    {'op': 'replace', 'path': '/data/a/x', 'value': 8},
+                    {'op': 'remove', 'path': '/data/b'},
+                    {'op': 'add', 'path': '/data/c', 'value': 5},
+                ]
+            }]
+        }
+        self.assertEqual(expected, yaml.safe_load(resp.text))
+
+    def test_diff_with_detail_paging(self):
+        resp = self._diff(0, self.revision_id, detail='true', limit='1',
+                          offset='1')
+        self.assertEqual(200, resp.status_code)
+        body = yaml.safe_load(resp.text)
+        self.assertEqual(3, body['count'])
+        self.assertEqual(1, len(body['results']))
+        self.assertEqual('added', body['results'][0]['status'])
+
+    def test_diff_with_invalid_paging_params(self):
+        for params in ({'limit': '-1'}, {'offset': 'foo'}):
+            resp = self._diff(0, self.revision_id, detail='true', **params)
+            self.assertEqual(400, resp.status_code)
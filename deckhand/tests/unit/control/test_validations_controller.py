@@ -17,9 +17,11 @@ import yaml
 
 from oslo_config import cfg
 
+from deckhand.engine import validation_worker
 from deckhand import factories
 from deckhand.tests import test_utils
 from deckhand.tests.unit.control import base as test_base
+from deckhand.tests.unit import fixtures
 from deckhand import types
 
 CONF = cfg.CONF
@@ -535,3 +537,188 @@ class TestValidationsController(test_base.BaseControllerTest):
             'results': [{'id': 0, 'status': 'failure'}]
         }
         self.assertEqual(expected_body, body)
+
+    def test_show_missing_validation_entry(self):
+        rules = {'deckhand:create_cleartext_documents': '@',
+                 'deckhand:create_validation': '@',
+                 'deckhand:show_validation': '@'}
+        self.policy.set_rules(rules)
+
+        revision_id = self._create_revision()
+        validation_name = test_utils.rand_name('validation')
+        self._create_validation(revision_id, validation_name,
+                                VALIDATION_RESULT)
+
+        resp = self.app.simulate_get(
+            '/api/v1.0/revisions/%s/validations/%s/1' % (revision_id,
+                                                         validation_name),
+            headers={'Content-Type': 'application/x-yaml'})
+        self.assertEqual(404, resp.status_code)
+
+    def test_list_validations_for_multiple_revisions(self):
+        rules = {'deckhand:create_cleartext_documents': '@',
+                 'deckhand:create_validation': '@',
+                 'deckhand:list_validations': '@'}
+        self.policy.set_rules(rules)
+
+        payload = factories.DocumentFactory(2, [1, 1]).gen_test({})
+        revision_id = self._create_revision(payload)
+        payload[-1]['data'] = {'foo': 'bar'}
+        other_revision_id = self._create_revision(payload)
+
+        validation_name = test_utils.rand_name('validation')
+        self._create_validation(revision_id, validation_name,
+                                VALIDATION_RESULT)
+        self._create_validation(other_revision_id, validation_name,
+                                VALIDATION_RESULT_ALT)
+
+        resp = self.app.simulate_get(
+            '/api/v1.0/validations',
+            headers={'Content-Type': 'application/x-yaml'},
+            params={'revision_id': '%s,%s' % (other_revision_id,
+                                              revision_id)})
+        self.assertEqual(200, resp.status_code)
+
+        body = yaml.safe_load(resp.text)
+        expected_body = {
+            'count': 2,
+            'results': [
+                {
+                    'revision': revision_id,
+                    'validations': [
+                        {'name': types.DECKHAND_SCHEMA_VALIDATION,
+                         'status': 'success'},
+                        {'name': validation_name, 'status': 'failure'}
+                    ]
+                },
+                {
+                    'revision': other_revision_id,
+                    'validations': [
+                        {'name': types.DECKHAND_SCHEMA_VALIDATION,
+                         'status': 'success'},
+                        {'name': validation_name, 'status': 'success'}
+                    ]
+                }
+            ]
+        }
+        self.assertEqual(expected_body, body)
+
+        # The validation statuses are cached until a validation is posted.
+        etag = resp.headers['ETag']
+        resp = self.app.simulate_get(
+            '/api/v1.0/validations',
+            headers={'Content-Type': 'application/x-yaml',
+                     'If-None-Match': etag},
+            params={'revision_id': [revision_id, other_revision_id]})
+        self.assertEqual(304, resp.status_code)
+
+        self._create_validation(other_revision_id, validation_name,
+                                VALIDATION_RESULT)
+        resp = self.app.simulate_get(
+            '/api/v1.0/validations',
+            headers={'Content-Type': 'application/x-yaml',
+                     'If-None-Match': etag},
+            params={'revision_id': [revision_id, other_revision_id]})
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual('failure', yaml.safe_load(resp.text)['results'][1][
+            'validations'][1]['status'])
+
+    def test_list_validations_for_multiple_revisions_invalid(self):
+        rules = {'deckhand:create_cleartext_documents': '@',
+                 'deckhand:list_validations': '@'}
+        self.policy.set_rules(rules)
+
+        revision_id = self._create_revision()
+
+        for params, status_code in (({}, 400),
+                                    ({'revision_id': 'foo'}, 400),
+                                    ({'revision_id': [revision_id,
+                                                      revision_id + 1]}, 404)):
+            resp = self.app.simulate_get(
+                '/api/v1.0/validations',
+                headers={'Content-Type': 'application/x-yaml'},
+                params=params)
+            self.assertEqual(status_code, resp.status_code)
+
+
+class TestDeferredValidationsController(test_base.BaseControllerTest):
+    """Test suite for schema validations deferred to background workers."""
+
+    def setUp(self):
+        super(TestDeferredValidationsController, self).setUp()
+        self.useFixture(fixtures.ConfPatcher(
+            schema_validation_mode='deferred', group='validation'))
+        # Queued validations are performed by calling `process_next` instead.
+        self.mock_start = self.patchobject(validation_worker, 'start')
+        rules = {'deckhand:create_cleartext_documents': '@',
+                 'deckhand:list_validations': '@'}
+        self.policy.set_rules(rules)
+
+    def _create_revision(self, bucket_name, payload):
+        resp = self.app.simulate_put(
+            '/api/v1.0/buckets/%s/documents' % bucket_name,
+            headers={'Content-Type': 'application/x-yaml'},
+            body=yaml.safe_dump_all(payload))
+        self.assertEqual(200, resp.status_code)
+        return list(yaml.safe_load_all(resp.text))[0]['status']['revision']
+
+    def _get_validation_statuses(self, revision_id):
+        resp = self.app.simulate_get(
+            '/api/v1.0/revisions/%s/validations' % revision_id,
+            headers={'Content-Type': 'application/x-yaml'})
+        self.assertEqual(200, resp.status_code)
+        return yaml.safe_load(resp.text)['results']
+
+    def test_validation_with_registered_data_schema_deferred(self):
+        data_schema = factories.DataSchemaFactory().gen_test(
+            'example/foo/v1', data={
+                '$schema': 'http://json-schema.org/schema#',
+                'type': 'object',
+                'properties': {'a': {'type': 'integer'}},
+                'required': ['a']
+            })
+        self._create_revision('schemas', [data_schema])
+
+        doc_factory = factories.DocumentFactory(1, [1])
+        pass_doc = doc_factory.gen_test(
+            {'_GLOBAL_DATA_1_': {'data': {'a': 5}}},
+            global_abstract=False)[-1]
+        pass_doc['schema'] = 'example/foo/v1'
+        pass_doc['metadata']['name'] = 'pass_doc'
+        fail_doc = copy.deepcopy(pass_doc)
+        fail_doc['data']['a'] = 'fail'
+        fail_doc['metadata']['name'] = 'fail_doc'
+
+        revision_id = self._create_revision('site', [pass_doc, fail_doc])
+
+        # The documents are only validated once the queued validation is
+        # performed.
+        self.mock_start.assert_called_once_with()
+        self.assertEqual(
+            [{'name': types.DECKHAND_SCHEMA_VALIDATION, 'status': 'pending'}],
+            self._get_validation_statuses(revision_id))
+
+        self.assertTrue(validation_worker.process_next())
+        self.assertFalse(validation_worker.process_next())
+
+        self.assertEqual(
+            [{'name': types.DECKHAND_SCHEMA_VALIDATION, 'status': 'failure'}],
+            self._get_validation_statuses(revision_id))
+        resp = self.app.simulate_get(
+            '/api/v1.0/revisions/%s/validations/%s' % (
+                revision_id, types.DECKHAND_SCHEMA_VALIDATION),
+            headers={'Content-Type': 'application/x-yaml'})
+        self.assertEqual(
+            [{'id': 0, 'status': 'success'}, {'id': 1, 'status': 'failure'}],
+            yaml.safe_load(resp.text)['results'])
+
+    def test_validation_without_registered_data_schema_not_deferred(self):
+        payload = factories.DocumentFactory(2, [1, 1]).gen_test({})
+
+        revision_id = self._create_revision('mop', payload)
+
+        self.assertFalse(self.mock_start.called)
+        self.assertEqual(
+            [{'name': types.DECKHAND_SCHEMA_VALIDATION, 'status': 'success'}],
+            self._get_validation_statuses(revision_id))
+        self.assertFalse(validation_worker.process_next())
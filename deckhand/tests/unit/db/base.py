@@ -103,8 +103,7 @@ class TestDbBase(base.DeckhandWithDBTestCase):
         return db_api.revision_get_all()
 
     def rollback_revision(self, revision_id):
-        latest_revision = db_api.revision_get_latest()
-        return db_api.revision_rollback(revision_id, latest_revision)
+        return db_api.revision_rollback(revision_id)
 
     def create_validation(self, revision_id, val_name, val_data):
         return db_api.validation_create(revision_id, val_name, val_data)
@@ -12,6 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+
+from deckhand.db.sqlalchemy import api as db_api
+from deckhand import errors
 from deckhand import factories
 from deckhand.tests import test_utils
 from deckhand.tests.unit.db import base
@@ -281,3 +285,63 @@ class TestDocuments(base.TestDbBase):
                              payload[idx]['metadata']['name'])
             self.assertEmpty(documents[idx]['metadata'])
             self.assertEmpty(documents[idx]['data'])
+
+    def test_delete_deleted_document_again(self):
+        payload = base.DocumentFixture.get_minimal_fixture()
+        bucket_name = test_utils.rand_name('bucket')
+        self.create_documents(bucket_name, payload)
+        self.create_documents(bucket_name, [])
+
+        # The document is already deleted, so no revision is created.
+        self.assertEmpty(self.create_documents(bucket_name, []))
+        self.assertEqual(2, len(self.list_revisions()))
+
+    def test_create_documents_in_several_buckets(self):
+        payload = self.documents_factory.gen_test(self.document_mapping)
+        documents = db_api.buckets_documents_create(
+            collections.OrderedDict([('mop', payload[:2]),
+                                     ('mip', payload[2:])]))
+
+        self.assertEqual(3, len(documents))
+        self.assertEqual(1, len(set(d['revision_id'] for d in documents)))
+        self.assertEqual(['mop', 'mop', 'mip'],
+                         [d['bucket_name'] for d in documents])
+
+        # Putting the same documents again creates a revision referencing the
+        # original one.
+        revision_id = documents[0]['revision_id']
+        documents = db_api.buckets_documents_create(
+            collections.OrderedDict([('mop', payload[:2]),
+                                     ('mip', payload[2:])]))
+        self.assertEqual([revision_id] * 3,
+                         [d['orig_revision_id'] for d in documents])
+
+    def test_create_documents_in_several_buckets_with_same_document(self):
+        payload = self.documents_factory.gen_test(self.document_mapping)
+        self.assertRaises(
+            errors.DocumentExists, db_api.buckets_documents_create,
+            collections.OrderedDict([('mop', payload),
+                                     ('mip', payload[2:])]))
+        self.assertEmpty(self.list_revisions())
+
+    def test_move_document_between_buckets(self):
+        payload = self.documents_factory.gen_test(self.document_mapping)
+        db_api.buckets_documents_create(
+            collections.OrderedDict([('mop', payload[:2]),
+                                     ('mip', payload[2:])]))
+
+        documents = db_api.buckets_documents_create(
+            collections.OrderedDict([('mop', payload), ('mip', [])]))
+        # The document is created in `mop` rather than deleted from `mip`.
+        self.assertEqual(['mop'] * 3, [d['bucket_name'] for d in documents])
+        self.assertFalse(any(d['deleted'] for d in documents))
+        self.assertIsNone(documents[2].get('orig_revision_id'))
+
+        # The document no longer belongs to `mip`, so isn't deleted by
+        # emptying it.
+        self.assertEmpty(self.create_documents('mip', []))
+        documents = self.list_revision_documents(
+            documents[0]['revision_id'], deleted=False)
+        self.assertEqual(
+            sorted(d['metadata']['name'] for d in payload),
+            sorted(d['name'] for d in documents))
@@ -0,0 +1,61 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from alembic import autogenerate
+from alembic import migration as alembic_migration
+import fixtures
+import sqlalchemy
+
+from deckhand.db.sqlalchemy import migration
+from deckhand.db.sqlalchemy import models
+from deckhand import errors
+from deckhand.tests.unit import base as test_base
+
+
+class TestMigrations(test_base.DeckhandTestCase):
+
+    def setUp(self):
+        super(TestMigrations, self).setUp()
+        tempdir = self.useFixture(fixtures.TempDir()).path
+        self.engine = sqlalchemy.create_engine(
+            'sqlite:///%s' % os.path.join(tempdir, 'deckhand.db'))
+        self.addCleanup(self.engine.dispose)
+
+    def test_check_db_version_before_sync_raises(self):
+        self.assertEqual(set(), migration.db_version(self.engine))
+        self.assertRaises(errors.DatabaseNotCurrent,
+                          migration.check_db_version, self.engine)
+
+    def test_db_sync(self):
+        migration.db_sync(engine=self.engine)
+
+        self.assertEqual(migration._get_script_heads(),
+                         migration.db_version(self.engine))
+        migration.check_db_version(self.engine)
+
+        # Syncing a current schema is a no-op.
+        migration.db_sync(engine=self.engine)
+        migration.check_db_version(self.engine)
+
+    def test_migrations_match_models(self):
+        migration.db_sync(engine=self.engine)
+
+        with self.engine.connect() as connection:
+            context = alembic_migration.MigrationContext.configure(
+                connection, opts={'compare_type': True})
+            diff = autogenerate.compare_metadata(
+                context, models.BASE.metadata)
+        self.assertEqual([], diff)
@@ -0,0 +1,85 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from deckhand.db.sqlalchemy import api as db_api
+from deckhand.db.sqlalchemy import profiler
+from deckhand.tests.unit.db import base
+
+
+class TestProfiler(base.TestDbBase):
+
+    def test_statements_charged_to_outermost_call(self):
+        documents = base.DocumentFixture.get_minimal_multi_fixture(count=3)
+        with profiler.profile() as query_profile:
+            self.create_documents('mop', documents)
+
+        # `documents_create` calls other DB API functions, such as
+        # `revision_get_documents`, whose statements are charged to it.
+        self.assertEqual(['documents_create'], list(query_profile.by_call()))
+        count, duration = query_profile.by_call()['documents_create']
+        self.assertEqual(query_profile.count, count)
+        self.assertGreater(count, 0)
+        self.assertAlmostEqual(query_profile.duration, duration)
+
+    def test_nested_profiles(self):
+        with profiler.profile() as outer_profile:
+            db_api.revision_get_all_summaries()
+            with profiler.profile() as inner_profile:
+                db_api.revision_get_all()
+
+        self.assertEqual(['revision_get_all'],
+                         list(inner_profile.by_call()))
+        self.assertEqual(['revision_get_all_summaries', 'revision_get_all'],
+                         list(outer_profile.by_call()))
+        self.assertEqual(
+            inner_profile.statements,
+            outer_profile.statements[-inner_profile.count:])
+        self.assertFalse(profiler.is_active())
+
+    def test_statements_not_recorded_without_profile(self):
+        with profiler.profile() as query_profile:
+            pass
+        db_api.revision_get_all()
+        self.assertEqual(0, query_profile.count)
+
+    def test_format_report(self):
+        with profiler.profile() as query_profile:
+            db_api.revision_get_all()
+
+        report = query_profile.format_report(slowest=1).splitlines()
+        self.assertEqual(4, len(report))
+        self.assertTrue(report[0].startswith(
+            '%d statements in ' % query_profile.count))
+        self.assertTrue(report[1].startswith('  revision_get_all: '))
+        self.assertEqual('Slowest statements:', report[2])
+        self.assertIn(' in revision_get_all: SELECT ', report[3])
+
+    def test_explain_select_statement(self):
+        with profiler.profile() as query_profile:
+            db_api.revision_get_all()
+
+        statement = next(s for s in query_profile.statements
+                         if 'FROM revisions' in s.statement)
+        query_plan = profiler.explain_statement(statement)
+        self.assertTrue(query_plan)
+        self.assertIn('revisions', ' '.join(query_plan))
+
+    def test_explain_skips_other_statements(self):
+        documents = base.DocumentFixture.get_minimal_multi_fixture(count=1)
+        with profiler.profile() as query_profile:
+            self.create_documents('mop', documents)
+
+        statement = next(s for s in query_profile.statements
+                         if s.statement.startswith('INSERT'))
+        self.assertEqual([], profiler.explain_statement(statement))
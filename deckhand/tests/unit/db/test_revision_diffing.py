@@ -14,7 +14,11 @@
 
 import copy
 
+import mock
+from sqlalchemy import orm as sa_orm
+
 from deckhand.db.sqlalchemy import api as db_api
+from deckhand.db.sqlalchemy import models
 from deckhand.tests import test_utils
 from deckhand.tests.unit.db import base
 
@@ -307,3 +311,184 @@ class TestRevisionDiffing(base.TestDbBase):
         self._verify_buckets_status(
             revision_id_1, revision_id_4,
             {bucket_name: 'unmodified', alt_bucket_name_2: 'created'})
+
+    def test_revision_diff_does_not_load_documents(self):
+        payload = base.DocumentFixture.get_minimal_multi_fixture(count=3)
+        bucket_name = test_utils.rand_name('bucket')
+        documents = self.create_documents(bucket_name, payload)
+        revision_id = documents[0]['revision_id']
+
+        payload[0]['data'] = {'modified': 'modified'}
+        comparison_documents = self.create_documents(bucket_name, payload)
+        comparison_revision_id = comparison_documents[0]['revision_id']
+
+        with mock.patch.object(db_api, 'revision_get_documents',
+                               autospec=True) as m_get_documents:
+            self._verify_buckets_status(
+                revision_id, comparison_revision_id,
+                {bucket_name: 'modified'})
+        self.assertFalse(m_get_documents.called)
+
+    def test_revision_diff_backfills_missing_digests(self):
+        payload = base.DocumentFixture.get_minimal_multi_fixture(count=3)
+        bucket_name = test_utils.rand_name('bucket')
+        alt_bucket_name = test_utils.rand_name('bucket')
+        revision_id = self.create_documents(
+            bucket_name, payload)[0]['revision_id']
+        comparison_revision_id = self.create_documents(
+            alt_bucket_name,
+            base.DocumentFixture.get_minimal_fixture())[0]['revision_id']
+
+        expected = db_api.revision_diff(revision_id, comparison_revision_id)
+        digests = [self.show_revision(r)['bucket_digests']
+                   for r in (revision_id, comparison_revision_id)]
+
+        # Simulate revisions created before digests were recorded.
+        session = db_api.get_session()
+        session.query(models.Revision).update(
+            {'bucket_digests': None, 'digest': None})
+
+        self._verify_buckets_status(
+            revision_id, comparison_revision_id, expected)
+        self.assertEqual(digests, [
+            self.show_revision(r)['bucket_digests']
+            for r in (revision_id, comparison_revision_id)])
+
+    def test_interleaved_documents_create_carries_over_digests(self):
+        bucket_names = [test_utils.rand_name('bucket') for _ in range(3)]
+        self.create_documents(
+            bucket_names[0], base.DocumentFixture.get_minimal_fixture())
+
+        first = sa_orm.Query.first
+        interleaved = []
+
+        def _first(query):
+            result = first(query)
+            # Simulate a PUT committed while waiting for the latest revision
+            # to be locked.
+            if query._for_update_arg is not None and not interleaved:
+                interleaved.append(True)
+                self.create_documents(
+                    bucket_names[1],
+                    base.DocumentFixture.get_minimal_fixture())
+            return result
+
+        with mock.patch.object(sa_orm.Query, 'first', autospec=True,
+                               side_effect=_first):
+            revision_id = self.create_documents(
+                bucket_names[2],
+                base.DocumentFixture.get_minimal_fixture())[0]['revision_id']
+
+        self.assertTrue(interleaved)
+        revision = self.show_revision(revision_id)
+        self.assertEqual(sorted(bucket_names),
+                         sorted(revision['bucket_digests']))
+        self.assertEqual(
+            db_api._revision_compute_bucket_digests(
+                revision['created_at'], db_api.get_session()),
+            revision['bucket_digests'])
+
+
+class TestRevisionDiffingDocuments(base.TestDbBase):
+
+    def _diff_documents(self, revision_id, comparison_revision_id, **kwargs):
+        # Verify that the result doesn't depend on the order of the revisions.
+        result = db_api.revision_diff_documents(
+            revision_id, comparison_revision_id, **kwargs)
+        self.assertEqual(result, db_api.revision_diff_documents(
+            comparison_revision_id, revision_id, **kwargs))
+        return result
+
+    def _get_key(self, document):
+        return (document['schema'], document['metadata']['name'])
+
+    def test_diff_documents_added_removed_changed(self):
+        payload = base.DocumentFixture.get_minimal_multi_fixture(count=3)
+        bucket_name = test_utils.rand_name('bucket')
+        revision_id = self.create_documents(
+            bucket_name, payload)[0]['revision_id']
+
+        # Change the 1st document, remove the 2nd and add a 4th.
+        removed = payload.pop(1)
+        payload[0]['data'] = {'modified': 'modified'}
+        added = base.DocumentFixture.get_minimal_fixture()
+        payload.append(added)
+        comparison_revision_id = self.create_documents(
+            bucket_name, payload)[0]['revision_id']
+
+        result = self._diff_documents(revision_id, comparison_revision_id)
+
+        self.assertEqual(3, result['count'])
+        statuses = {(r['schema'], r['name']): r['status']
+                    for r in result['results']}
+        self.assertEqual({self._get_key(payload[0]): 'changed',
+                          self._get_key(removed): 'removed',
+                          self._get_key(added): 'added'}, statuses)
+
+        changed = [r for r in result['results'] if r['status'] == 'changed']
+        self.assertEqual({'modified': 'modified'}, changed[0]['new']['data'])
+        self.assertNotEqual(changed[0]['old']['data'],
+                            changed[0]['new']['data'])
+        self.assertEqual(changed[0]['old']['metadata_hash'],
+                         changed[0]['new']['metadata_hash'])
+        for status in ('added', 'removed'):
+            result_ = [r for r in result['results'] if r['status'] == status]
+            self.assertNotIn('old', result_[0])
+            self.assertNotIn('new', result_[0])
+
+    def test_diff_documents_against_revision_zero(self):
+        payload = base.DocumentFixture.get_minimal_multi_fixture(count=2)
+        bucket_name = test_utils.rand_name('bucket')
+        revision_id = self.create_documents(
+            bucket_name, payload)[0]['revision_id']
+
+        result = self._diff_documents(0, revision_id)
+        self.assertEqual(2, result['count'])
+        self.assertEqual(['added', 'added'],
+                         [r['status'] for r in result['results']])
+
+        self.assertEqual({'count': 0, 'results': []},
+                         self._diff_documents(revision_id, revision_id))
+
+    def test_diff_documents_skips_unmodified_buckets(self):
+        payload = base.DocumentFixture.get_minimal_multi_fixture(count=2)
+        alt_payload = base.DocumentFixture.get_minimal_multi_fixture(count=2)
+        bucket_name = test_utils.rand_name('bucket')
+        alt_bucket_name = test_utils.rand_name('bucket')
+        self.create_documents(alt_bucket_name, alt_payload)
+        revision_id = self.create_documents(
+            bucket_name, payload)[0]['revision_id']
+
+        payload[0]['data'] = {'modified': 'modified'}
+        comparison_revision_id = self.create_documents(
+            bucket_name, payload)[0]['revision_id']
+
+        with mock.patch.object(
+                db_api, '_revision_get_document_hashes', autospec=True,
+                side_effect=db_api._revision_get_document_hashes) as m_hashes:
+            result = db_api.revision_diff_documents(
+                revision_id, comparison_revision_id)
+
+        self.assertEqual(1, result['count'])
+        self.assertEqual(bucket_name, result['results'][0]['bucket_name'])
+        for call in m_hashes.call_args_list:
+            self.assertEqual([bucket_name], call[1]['bucket_names'])
+
+    def test_diff_documents_paging(self):
+        payload = base.DocumentFixture.get_minimal_multi_fixture(count=5)
+        bucket_name = test_utils.rand_name('bucket')
+        revision_id = self.create_documents(
+            bucket_name, payload)[0]['revision_id']
+
+        full = self._diff_documents(0, revision_id)
+        self.assertEqual(5, full['count'])
+        keys = [(r['schema'], r['name']) for r in full['results']]
+        self.assertEqual(sorted(keys), keys)
+
+        pages = [self._diff_documents(0, revision_id, limit=2, offset=offset)
+                 for offset in (0, 2, 4)]
+        for page in pages:
+            self.assertEqual(5, page['count'])
+        self.assertEqual(full['results'],
+                         sum([p['results'] for p in pages], []))
+        self.assertEqual([2, 2, 1], [len(p['results']) for p in pages])
@@ -12,7 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
+import datetime
+import random
+import time
+
+from deckhand.db.sqlalchemy import api as db_api
 from deckhand.tests import test_utils
+from deckhand.tests.unit import base as test_base
 from deckhand.tests.unit.db import base
 
 
@@ -113,3 +120,74 @@ class TestRevisionDocumentsFiltering(base.TestDbBase):
                 **{'metadata.storagePolicy': ['wrong_val', 'encrypted']})
 
             self.assertEmpty(retrieved_documents)
+
+
+class TestExcludeDeletedDocuments(test_base.DeckhandTestCase):
+
+    @staticmethod
+    def _reference_exclude_deleted_documents(documents):
+        # The original, quadratic implementation.
+        for doc in copy.copy(documents):
+            if doc['deleted']:
+                docs_to_delete = [
+                    d for d in documents if
+                        (d['schema'], d['name']) == (doc['schema'],
+                                                     doc['name'])
+                        and d['created_at'] <= doc['deleted_at']
+                ]
+                for d in list(docs_to_delete):
+                    documents.remove(d)
+        return documents
+
+    def _gen_history(self, num_documents, num_names, seed):
+        """Generate documents that are repeatedly created, updated and
+        deleted across revisions, in revision order.
+        """
+        rand = random.Random(seed)
+        start = datetime.datetime(2017, 1, 1)
+        documents = []
+        for idx in range(num_documents):
+            created_at = start + datetime.timedelta(seconds=idx)
+            deleted = rand.random() < 0.2
+            documents.append({
+                'id': idx,
+                'schema': 'example/Kind/v1',
+                'name': 'doc-%d' % rand.randrange(num_names),
+                'created_at': created_at.isoformat(),
+                'deleted': deleted,
+                'deleted_at': (
+                    (created_at + datetime.timedelta(microseconds=10))
+                    .isoformat() if deleted else None)
+            })
+        return documents
+
+    def test_exclude_deleted_documents_matches_reference(self):
+        for num_documents, num_names in ((0, 1), (10, 2), (500, 20),
+                                         (3000, 300)):
+            documents = self._gen_history(num_documents, num_names,
+                                          seed=num_documents)
+            expected = self._reference_exclude_deleted_documents(
+                copy.deepcopy(documents))
+            self.assertEqual(
+                [d['id'] for d in expected],
+                [d['id'] for d in db_api._exclude_deleted_documents(
+                    documents)])
+
+    def test_exclude_deleted_documents_at_scale(self):
+        documents = self._gen_history(200000, 20000, seed=1)
+
+        start = time.time()
+        result = db_api._exclude_deleted_documents(documents)
+        # Processing 200k documents in linear time takes a fraction of a
+        # second, far below what a quadratic implementation needs.
+        self.assertLess(time.time() - start, 10)
+
+        latest = {}
+        for doc in documents:
+            latest[doc['name']] = doc
+        # Every document whose latest version is a deletion is excluded
+        # entirely.
+        self.assertFalse(
+            set(d['name'] for d in result) &
+            set(n for n, d in latest.items() if d['deleted']))
+        self.assertFalse(any(d['deleted'] for d in result))
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from deckhand.db.sqlalchemy import api as db_api
 from deckhand.tests import test_utils
 from deckhand.tests.unit.db import base
 
@@ -33,12 +34,14 @@ class TestRevisionRollback(base.TestDbBase):
         rollback_revision = self.rollback_revision(orig_revision_id)
 
         self.assertEqual(3, rollback_revision['id'])
+        rollback_revision_documents = self.show_revision(
+            rollback_revision['id'])['documents']
         self.assertEqual(
             [1, 1, 1, 3],
-            [d['revision_id'] for d in rollback_revision['documents']])
+            [d['revision_id'] for d in rollback_revision_documents])
         self.assertEqual(
             [1, 1, 1, 3],
-            [d['orig_revision_id'] for d in rollback_revision['documents']])
+            [d['orig_revision_id'] for d in rollback_revision_documents])
 
         rollback_documents = self.list_revision_documents(
             rollback_revision['id'])
@@ -47,6 +50,56 @@ class TestRevisionRollback(base.TestDbBase):
         self.assertEqual([1, 1, 1, 3],
                          [d['orig_revision_id'] for d in rollback_documents])
 
+    def test_rollback_revision_digests(self):
+        payload = base.DocumentFixture.get_minimal_multi_fixture(count=4)
+        bucket_name = test_utils.rand_name('bucket')
+        created_documents = self.create_documents(bucket_name, payload)
+        orig_revision_id = created_documents[0]['revision_id']
+
+        payload[-1]['data'] = {'foo': 'bar'}
+        self.create_documents(bucket_name, payload)
+
+        rollback_revision = self.rollback_revision(orig_revision_id)
+
+        # The rollback revision has the same contents as the original one.
+        orig_revision = self.show_revision(orig_revision_id)
+        rollback_revision = self.show_revision(rollback_revision['id'])
+        self.assertIsNotNone(rollback_revision['digest'])
+        self.assertEqual(orig_revision['digest'], rollback_revision['digest'])
+        self.assertEqual(
+            {bucket_name: 'unmodified'},
+            db_api.revision_diff(orig_revision_id, rollback_revision['id']))
+
+    def test_rollback_copies_documents(self):
+        # Revision 1: Create 20 documents, one of which is a secret.
+        payload = base.DocumentFixture.get_minimal_multi_fixture(count=20)
+        payload[0]['data'] = {'secret': 'password'}
+        bucket_name = test_utils.rand_name('bucket')
+        created_documents = self.create_documents(bucket_name, payload)
+        orig_revision_id = created_documents[0]['revision_id']
+
+        # Revision 2: Update every other document.
+        for document in payload[1::2]:
+            document['data'] = {'foo': 'bar'}
+        self.create_documents(bucket_name, payload)
+
+        # Revision 3: rollback to revision 1.
+        rollback_revision = self.rollback_revision(orig_revision_id)
+        rollback_documents = self.show_revision(
+            rollback_revision['id'])['documents']
+
+        self.assertEqual(3, rollback_revision['id'])
+        self.assertEqual([1, 3] * 10,
+                         [d['orig_revision_id'] for d in rollback_documents])
+        for orig_document, document in zip(created_documents,
+                                           rollback_documents):
+            for attr in ('schema', 'name', 'metadata', 'data', 'data_hash',
+                         'metadata_hash', 'is_secret', 'bucket_name'):
+                self.assertEqual(orig_document[attr], document[attr])
+            self.assertFalse(document['deleted'])
+            self.assertIsNotNone(document['created_at'])
+        self.assertTrue(rollback_documents[0]['is_secret'])
+
     def test_create_update_delete_rollback(self):
         # Revision 1: Create 4 documents.
         payload = base.DocumentFixture.get_minimal_multi_fixture(count=4)
@@ -66,12 +119,14 @@ class TestRevisionRollback(base.TestDbBase):
         rollback_revision = self.rollback_revision(orig_revision_id)
 
         self.assertEqual(4, rollback_revision['id'])
+        rollback_revision_documents = self.show_revision(
+            rollback_revision['id'])['documents']
         self.assertEqual(
             [1, 1, 4, 4],
-            [d['revision_id'] for d in rollback_revision['documents']])
+            [d['revision_id'] for d in rollback_revision_documents])
         self.assertEqual(
             [1, 1, 4, 4],
-            [d['orig_revision_id'] for d in rollback_revision['documents']])
+            [d['orig_revision_id'] for d in rollback_revision_documents])
 
         rollback_documents = self.list_revision_documents(
             rollback_revision['id'])
@@ -79,3 +134,31 @@ class TestRevisionRollback(base.TestDbBase):
                          [d['revision_id'] for d in rollback_documents])
         self.assertEqual([1, 1, 4, 4],
                          [d['orig_revision_id'] for d in rollback_documents])
+
+    def test_rollback_returns_summary_without_loading_documents(self):
+        payload = base.DocumentFixture.get_minimal_multi_fixture(count=4)
+        bucket_name = test_utils.rand_name('bucket')
+        orig_revision_id = self.create_documents(
+            bucket_name, payload)[0]['revision_id']
+        payload[-1]['data'] = {'foo': 'bar'}
+        self.create_documents(bucket_name, payload)
+
+        mock_update_history = self.patchobject(
+            db_api, '_update_revision_history')
+        rollback_revision = self.rollback_revision(orig_revision_id)
+
+        mock_update_history.assert_not_called()
+        self.assertEqual(
+            db_api.revision_get_summary(rollback_revision['id']),
+            rollback_revision)
+        self.assertIn(bucket_name, rollback_revision['summary']['buckets'])
+
+    def test_latest_has_encrypted_documents(self):
+        payload = base.DocumentFixture.get_minimal_multi_fixture(count=2)
+        bucket_name = test_utils.rand_name('bucket')
+        self.create_documents(bucket_name, payload)
+        self.assertFalse(db_api.revision_latest_has_encrypted_documents())
+
+        payload[-1]['metadata']['storagePolicy'] = 'encrypted'
+        self.create_documents(bucket_name, payload)
+        self.assertTrue(db_api.revision_latest_has_encrypted_documents())
@@ -12,6 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import mock
+from sqlalchemy import orm as sa_orm
+
 from deckhand import errors
 from deckhand.tests import test_utils
 from deckhand.tests.unit.db import base
@@ -45,3 +48,42 @@ class TestRevisionRollbackNegative(base.TestDbBase):
         # error, as it is identical to the latest revision.
         self.assertRaises(
             errors.InvalidRollback, self.rollback_revision, orig_revision_id)
+
+    def test_rollback_missing_revision_raises_error(self):
+        payload = base.DocumentFixture.get_minimal_multi_fixture(count=2)
+        bucket_name = test_utils.rand_name('bucket')
+        self.create_documents(bucket_name, payload)
+
+        self.assertRaises(
+            errors.RevisionNotFound, self.rollback_revision,
+            test_utils.rand_int(100, 200))
+        self.assertEqual(1, len(self.list_revisions()))
+
+    def test_rollback_compared_with_locked_revision(self):
+        payload = base.DocumentFixture.get_minimal_multi_fixture(count=2)
+        bucket_name = test_utils.rand_name('bucket')
+        orig_revision_id = self.create_documents(
+            bucket_name, payload)[0]['revision_id']
+        orig_data = payload[-1]['data']
+        payload[-1]['data'] = {'foo': 'bar'}
+        self.create_documents(bucket_name, payload)
+
+        first = sa_orm.Query.first
+        interleaved = []
+
+        def _first(query):
+            result = first(query)
+            # Simulate a write reverting the change, committed while waiting
+            # for the latest revision to be locked.
+            if query._for_update_arg is not None and not interleaved:
+                interleaved.append(True)
+                payload[-1]['data'] = orig_data
+                self.create_documents(bucket_name, payload)
+            return result
+
+        with mock.patch.object(sa_orm.Query, 'first', autospec=True,
+                               side_effect=_first):
+            self.assertRaises(errors.InvalidRollback, self.rollback_revision,
+                              orig_revision_id)
+        self.assertTrue(interleaved)
+        self.assertEqual(3, len(self.list_revisions()))
@@ -12,6 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import mock
+from oslo_serialization import jsonutils as json
+import sqlalchemy
+
+from deckhand.db.sqlalchemy import api as db_api
+from deckhand.db.sqlalchemy import models
 from deckhand import errors
 from deckhand import factories
 from deckhand.tests import test_utils
@@ -174,3 +180,232 @@ class TestRevisions(base.TestDbBase):
                             alt_created_documents[0]['id']]
         self.assertEqual(
             expected_doc_ids, [d['id'] for d in alt_revision_docs])
+
+    def test_revision_digest(self):
+        documents = base.DocumentFixture.get_minimal_fixture()
+        bucket_name = test_utils.rand_name('bucket')
+        created_documents = self.create_documents(bucket_name, documents)
+        revision_id = created_documents[0]['revision_id']
+
+        digest = db_api.revision_get_digest(revision_id)
+        self.assertEqual(digest, db_api.revision_get_digest(revision_id))
+
+        # Creating a revision in another bucket must not change the digest of
+        # the older revision, but the newer revision includes its history.
+        alt_documents = base.DocumentFixture.get_minimal_fixture()
+        alt_created_documents = self.create_documents(
+            test_utils.rand_name('bucket'), alt_documents)
+        alt_revision_id = alt_created_documents[0]['revision_id']
+
+        self.assertEqual(digest, db_api.revision_get_digest(revision_id))
+        self.assertNotEqual(digest,
+                            db_api.revision_get_digest(alt_revision_id))
+        self.assertNotEqual(
+            db_api.revision_get_digest(alt_revision_id),
+            db_api.revision_get_digest(alt_revision_id,
+                                       include_history=False))
+
+    def test_revision_digest_with_tags(self):
+        documents = base.DocumentFixture.get_minimal_fixture()
+        bucket_name = test_utils.rand_name('bucket')
+        created_documents = self.create_documents(bucket_name, documents)
+        revision_id = created_documents[0]['revision_id']
+
+        digest = db_api.revision_get_digest(revision_id, include_tags=True)
+        db_api.revision_tag_create(revision_id, 'foo')
+
+        self.assertNotEqual(
+            digest, db_api.revision_get_digest(revision_id,
+                                               include_tags=True))
+        self.assertEqual(
+            db_api.revision_get_digest(revision_id),
+            db_api.revision_get_digest(revision_id, include_tags=False))
+
+    def test_revision_digest_not_found(self):
+        self.assertRaises(errors.RevisionNotFound,
+                          db_api.revision_get_digest,
+                          test_utils.rand_int(1, 1000))
+
+    def _create_revision_with_validation_policy(self, bucket_name):
+        documents = [base.DocumentFixture.get_minimal_fixture()
+                     for _ in range(3)]
+        vp_factory = factories.ValidationPolicyFactory()
+        documents.append(vp_factory.gen(types.DECKHAND_SCHEMA_VALIDATION,
+                                        'success'))
+        created_documents = self.create_documents(bucket_name, documents)
+        return created_documents, created_documents[0]['revision_id']
+
+    def test_revision_summary(self):
+        bucket_name = test_utils.rand_name('bucket')
+        created_documents, revision_id = (
+            self._create_revision_with_validation_policy(bucket_name))
+        db_api.revision_tag_create(revision_id, 'foo')
+        db_api.revision_tag_create(revision_id, 'bar')
+
+        revision = db_api.revision_get_summary(revision_id)
+        self.assertEqual(revision_id, revision['id'])
+        self.assertEqual(
+            {'buckets': {bucket_name: 4},
+             'validation_policies': [
+                 {'id': created_documents[-1]['id'],
+                  'name': created_documents[-1]['name'],
+                  'status': 'success'}],
+             'tags': ['bar', 'foo']},
+            revision['summary'])
+        self.assertEqual(revision['summary'],
+                         self.show_revision(revision_id)['summary'])
+
+        db_api.revision_tag_delete(revision_id, 'foo')
+        self.assertEqual(
+            ['bar'], db_api.revision_get_summary(revision_id)['summary'][
+                'tags'])
+        db_api.revision_tag_delete_all(revision_id)
+        self.assertEqual(
+            [], db_api.revision_get_summary(revision_id)['summary']['tags'])
+
+    def test_revision_summary_with_deleted_documents(self):
+        bucket_name = test_utils.rand_name('bucket')
+        self._create_revision_with_validation_policy(bucket_name)
+        revision_id = self.create_documents(
+            bucket_name, [base.DocumentFixture.get_minimal_fixture()])[0][
+                'revision_id']
+
+        summary = db_api.revision_get_summary(revision_id)['summary']
+        self.assertEqual({bucket_name: 1}, summary['buckets'])
+        self.assertEqual([], summary['validation_policies'])
+
+    def test_revision_summary_does_not_load_documents(self):
+        bucket_name = test_utils.rand_name('bucket')
+        _, revision_id = self._create_revision_with_validation_policy(
+            bucket_name)
+
+        with mock.patch.object(models.Document, 'to_dict',
+                               autospec=True) as m_to_dict:
+            db_api.revision_get_summary(revision_id)
+            revisions = db_api.revision_get_all_summaries()
+        self.assertFalse(m_to_dict.called)
+        self.assertEqual([revision_id], [r['id'] for r in revisions])
+
+    def test_revision_get_all_summaries_with_tag_filter(self):
+        revision_ids = [
+            self._create_revision_with_validation_policy(
+                test_utils.rand_name('bucket'))[1]
+            for _ in range(2)]
+        db_api.revision_tag_create(revision_ids[1], 'foo')
+
+        revisions = db_api.revision_get_all_summaries(
+            **{'tags.[*].tag': 'foo'})
+        self.assertEqual([revision_ids[1]], [r['id'] for r in revisions])
+
+    def test_revision_summary_computed_for_older_revisions(self):
+        bucket_name = test_utils.rand_name('bucket')
+        _, revision_id = self._create_revision_with_validation_policy(
+            bucket_name)
+        summary = db_api.revision_get_summary(revision_id)['summary']
+
+        # Simulate a revision created before summaries were maintained.
+        db_api.raw_query('UPDATE revisions SET summary = NULL')
+
+        self.assertEqual(summary,
+                         db_api.revision_get_summary(revision_id)['summary'])
+        stored_summary = db_api.raw_query(
+            'SELECT summary FROM revisions WHERE id = :revision_id',
+            revision_id=revision_id).scalar()
+        self.assertEqual(summary, json.loads(stored_summary))
+
+
+class TestRequestScope(base.TestDbBase):
+
+    def setUp(self):
+        super(TestRequestScope, self).setUp()
+        self.addCleanup(db_api.end_request)
+        documents = base.DocumentFixture.get_minimal_fixture()
+        self.revision_id = self.create_documents(
+            test_utils.rand_name('bucket'), documents)[0]['revision_id']
+
+    def test_sessions_share_connection(self):
+        db_api.begin_request()
+        connection = db_api.get_session().bind
+
+        self.assertIsInstance(connection, sqlalchemy.engine.Connection)
+        self.assertIs(connection, db_api.get_session().bind)
+        self.assertEqual(1, len(db_api.revision_get_all()))
+
+        db_api.end_request()
+        self.assertTrue(connection.closed)
+        self.assertIs(db_api.get_engine(), db_api.get_session().bind)
+
+    def test_revision_existence_checked_once(self):
+        db_api.begin_request()
+        db_api.revision_tag_get_all(self.revision_id)
+
+        with mock.patch.object(db_api, 'get_session',
+                               autospec=True) as mock_get_session:
+            db_api._revision_check_exists(self.revision_id)
+        self.assertFalse(mock_get_session.called)
+
+    def test_revision_existence_not_remembered_outside_request(self):
+        db_api.revision_get(self.revision_id)
+        self.assertEqual(set(), db_api._REQUEST_SCOPE.revision_ids)
+
+    def test_revision_existence_forgotten_after_delete_all(self):
+        db_api.begin_request()
+        db_api.revision_get(self.revision_id)
+        self.delete_revisions()
+
+        self.assertRaises(errors.RevisionNotFound,
+                          db_api.revision_tag_get_all, self.revision_id)
+
+
+class TestReadReplica(base.TestDbBase):
+
+    def setUp(self):
+        super(TestReadReplica, self).setUp()
+        # Each in-memory SQLite engine is a separate database, which stands in
+        # for a replica that has not caught up with the primary.
+        self.override_config('slave_connection', 'sqlite://',
+                             group='database')
+        db_api.clear_db_env()
+        self.addCleanup(db_api.clear_db_env)
+        db_api.setup_db()
+        models.register_models(db_api.get_engine(use_slave=True))
+        self.addCleanup(db_api.end_request)
+
+        documents = base.DocumentFixture.get_minimal_fixture()
+        self.revision_id = self.create_documents(
+            test_utils.rand_name('bucket'), documents)[0]['revision_id']
+
+    def test_read_only_request_uses_slave(self):
+        self.assertTrue(db_api.has_slave())
+        db_api.begin_request(read_only=True)
+        self.assertEqual([], db_api.revision_get_all())
+
+    def test_write_request_uses_primary(self):
+        db_api.begin_request(read_only=False)
+        self.assertEqual(1, len(db_api.revision_get_all()))
+
+    def test_read_after_write_falls_back_to_primary(self):
+        db_api.begin_request(read_only=True)
+        revision = db_api.revision_get(self.revision_id)
+        self.assertEqual(self.revision_id, revision['id'])
+
+        # The rest of the request reads from the primary.
+        self.assertEqual(1, len(db_api.revision_get_all()))
+
+    def test_not_found_on_primary_raises(self):
+        db_api.begin_request(read_only=True)
+        self.assertRaises(errors.RevisionNotFound, db_api.revision_get,
+                          self.revision_id + 1)
+
+    def test_summary_backfill_not_written_to_slave(self):
+        slave_session = db_api.get_session(use_slave=True)
+        revision_id = db_api.revision_create(session=slave_session)['id']
+
+        db_api.begin_request(read_only=True)
+        revision = db_api.revision_get(revision_id)
+        self.assertEqual([], revision['summary']['tags'])
+
+        summary = slave_session.query(models.Revision.summary)\
+            .filter_by(id=revision_id)\
+            .scalar()
+        self.assertFalse(summary)
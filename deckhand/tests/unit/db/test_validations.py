@@ -14,6 +14,8 @@
 
 import yaml
 
+from deckhand.db.sqlalchemy import api as db_api
+from deckhand import errors
 from deckhand import factories
 from deckhand.tests import test_utils
 from deckhand.tests.unit.db import base
@@ -84,3 +86,163 @@ class TestValidations(base.TestDbBase):
             self.assertEqual(payload['status'], created_validation['status'])
             self.assertEqual(payload['validator'],
                              created_validation['validator'])
+
+    def test_create_validation_entries_assigns_ordinals(self):
+        revision_id = self._create_revision_with_validation_policy()
+        validation_name = test_utils.rand_name('validation')
+
+        for val_policy in (ARMADA_VALIDATION_POLICY,
+                           PROMENADE_VALIDATION_POLICY,
+                           ARMADA_VALIDATION_POLICY):
+            self.create_validation(revision_id, validation_name,
+                                   yaml.safe_load(val_policy))
+
+        entries = db_api.validation_get_all_entries(revision_id,
+                                                    validation_name)
+        self.assertEqual([0, 1, 2], [e['ordinal'] for e in entries])
+        self.assertEqual(['success', 'failure', 'success'],
+                         [e['status'] for e in entries])
+
+        entry = db_api.validation_get_entry(revision_id, validation_name, 1)
+        self.assertEqual(entries[1], entry)
+
+    def test_validation_summary_status(self):
+        revision_id = self._create_revision_with_validation_policy()
+        names = sorted(test_utils.rand_name('validation') for _ in range(2))
+
+        # The 1st validation only succeeds; the 2nd fails once.
+        self.create_validation(revision_id, names[0],
+                               yaml.safe_load(ARMADA_VALIDATION_POLICY))
+        for val_policy in (ARMADA_VALIDATION_POLICY,
+                           PROMENADE_VALIDATION_POLICY,
+                           ARMADA_VALIDATION_POLICY):
+            self.create_validation(revision_id, names[1],
+                                   yaml.safe_load(val_policy))
+
+        self.assertEqual(
+            [(names[0], 'success'), (names[1], 'failure')],
+            [tuple(v) for v in db_api.validation_get_all(revision_id)])
+
+    def test_validation_summary_is_per_revision(self):
+        revision_id = self._create_revision_with_validation_policy()
+        other_revision_id = self._create_revision_with_validation_policy()
+        validation_name = test_utils.rand_name('validation')
+
+        self.create_validation(revision_id, validation_name,
+                               yaml.safe_load(PROMENADE_VALIDATION_POLICY))
+        self.create_validation(other_revision_id, validation_name,
+                               yaml.safe_load(ARMADA_VALIDATION_POLICY))
+
+        self.assertEqual(
+            {revision_id: [(validation_name, 'failure')],
+             other_revision_id: [(validation_name, 'success')]},
+            db_api.validation_get_all_by_revisions(
+                [revision_id, other_revision_id]))
+
+    def test_validation_get_all_by_revisions_in_batches(self):
+        self.patchobject(db_api, '_MAX_IN_CLAUSE_SIZE', 2, autospec=False)
+        revision_ids = [self._create_revision_with_validation_policy()
+                        for _ in range(3)]
+        validation_name = test_utils.rand_name('validation')
+        for revision_id in revision_ids:
+            self.create_validation(revision_id, validation_name,
+                                   yaml.safe_load(ARMADA_VALIDATION_POLICY))
+
+        self.assertEqual(
+            {revision_id: [(validation_name, 'success')]
+             for revision_id in revision_ids},
+            db_api.validation_get_all_by_revisions(revision_ids))
+        self.assertRaises(errors.RevisionNotFound,
+                          db_api.validation_get_all_by_revisions,
+                          revision_ids + [revision_ids[-1] + 1])
+
+    def test_validation_get_all_by_revisions_missing_revision(self):
+        revision_id = self._create_revision_with_validation_policy()
+        self.assertRaises(errors.RevisionNotFound,
+                          db_api.validation_get_all_by_revisions,
+                          [revision_id, revision_id + 1])
+
+    def test_validation_get_entry_not_found(self):
+        revision_id = self._create_revision_with_validation_policy()
+        validation_name = test_utils.rand_name('validation')
+        self.create_validation(revision_id, validation_name,
+                               yaml.safe_load(ARMADA_VALIDATION_POLICY))
+
+        self.assertRaises(errors.ValidationNotFound,
+                          db_api.validation_get_entry, revision_id,
+                          validation_name, 1)
+
+
+class TestValidationTasks(base.TestDbBase):
+
+    def _create_revision_with_deferred_validation(self):
+        documents = base.DocumentFixture.get_minimal_multi_fixture(count=2)
+        keys = [(d['schema'], d['metadata']['name']) for d in documents]
+        created_documents = db_api.documents_create(
+            test_utils.rand_name('bucket'), documents,
+            deferred_validations=keys)
+        return created_documents[0]['revision_id'], keys
+
+    def test_deferred_validation_is_pending(self):
+        revision_id, keys = self._create_revision_with_deferred_validation()
+
+        self.assertEqual([(types.DECKHAND_SCHEMA_VALIDATION, 'pending')],
+                         db_api.validation_get_all(revision_id))
+        task = db_api.validation_task_claim(60)
+        self.assertEqual(revision_id, task['revision_id'])
+        self.assertEqual([list(k) for k in keys], task['documents'])
+        self.assertEqual(1, task['attempts'])
+
+    def test_task_created_with_documents(self):
+        # The task is only visible to workers along with the documents.
+        self.patchobject(db_api, '_revision_set_digests').side_effect = (
+            ValueError)
+        self.assertRaises(ValueError,
+                          self._create_revision_with_deferred_validation)
+        self.assertIsNone(db_api.validation_task_claim(60))
+        self.assertEmpty(db_api.revision_get_all())
+
+    def test_claimed_task_not_claimed_again_until_timeout(self):
+        self._create_revision_with_deferred_validation()
+
+        task = db_api.validation_task_claim(60)
+        self.assertIsNone(db_api.validation_task_claim(60))
+
+        # A timeout of 0 makes any started task claimable again.
+        reclaimed_task = db_api.validation_task_claim(0)
+        self.assertEqual(task['id'], reclaimed_task['id'])
+        self.assertEqual(2, reclaimed_task['attempts'])
+
+    def test_complete_task(self):
+        revision_id, _ = self._create_revision_with_deferred_validation()
+        task = db_api.validation_task_claim(60)
+        vals_data = [yaml.safe_load(ARMADA_VALIDATION_POLICY),
+                     yaml.safe_load(PROMENADE_VALIDATION_POLICY)]
+
+        self.assertTrue(db_api.validation_task_complete(
+            task['id'], revision_id, vals_data))
+
+        self.assertEqual([(types.DECKHAND_SCHEMA_VALIDATION, 'failure')],
+                         db_api.validation_get_all(revision_id))
+        entries = db_api.validation_get_all_entries(
+            revision_id, types.DECKHAND_SCHEMA_VALIDATION)
+        self.assertEqual(['success', 'failure'],
+                         [e['status'] for e in entries])
+        self.assertIsNone(db_api.validation_task_claim(0))
+
+        # Results of a task that was already completed are discarded.
+        self.assertFalse(db_api.validation_task_complete(
+            task['id'], revision_id, vals_data))
+        self.assertEqual(2, len(db_api.validation_get_all_entries(
+            revision_id, types.DECKHAND_SCHEMA_VALIDATION)))
+
+    def test_complete_task_with_successful_entries(self):
+        revision_id, _ = self._create_revision_with_deferred_validation()
+        task = db_api.validation_task_claim(60)
+
+        db_api.validation_task_complete(
+            task['id'], revision_id,
+            [yaml.safe_load(ARMADA_VALIDATION_POLICY)])
+
+        self.assertEqual([(types.DECKHAND_SCHEMA_VALIDATION, 'success')],
+                         db_api.validation_get_all(revision_id))
@@ -0,0 +1,73 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+
+import mock
+
+from deckhand.engine import document_diff
+from deckhand.tests.unit import base as test_base
+
+
+class TestDocumentDiff(test_base.DeckhandTestCase):
+
+    def test_diff_identical(self):
+        data = {'a': {'x': [1, 2, {'y': 3}]}, 'b': None}
+        self.assertEqual([], document_diff.diff(data, copy.deepcopy(data)))
+
+    def test_diff_add_remove_replace(self):
+        old = {'a': {'x': 1, 'y': 2}, 'b': 'foo', 'c': [1, 2]}
+        new = {'a': {'x': 7, 'z': 3}, 'b': 'foo', 'c': [1, 2, 3], 'd': {}}
+
+        expected = [
+            {'op': 'replace', 'path': '/data/a/x', 'value': 7},
+            {'op': 'remove', 'path': '/data/a/y'},
+            {'op': 'add', 'path': '/data/a/z', 'value': 3},
+            {'op': 'replace', 'path': '/data/c', 'value': [1, 2, 3]},
+            {'op': 'add', 'path': '/data/d', 'value': {}},
+        ]
+        self.assertEqual(expected, document_diff.diff(old, new, '/data'))
+
+    def test_diff_list_items(self):
+        old = [{'a': 1}, {'b': 2}]
+        new = [{'a': 1}, {'b': 3}]
+        self.assertEqual([{'op': 'replace', 'path': '/1/b', 'value': 3}],
+                         document_diff.diff(old, new))
+
+    def test_diff_type_change(self):
+        self.assertEqual(
+            [{'op': 'replace', 'path': '/a', 'value': True}],
+            document_diff.diff({'a': 1}, {'a': True}))
+        self.assertEqual(
+            [{'op': 'replace', 'path': '/a', 'value': [1]}],
+            document_diff.diff({'a': {'0': 1}}, {'a': [1]}))
+
+    def test_diff_escapes_paths(self):
+        self.assertEqual(
+            [{'op': 'add', 'path': '/a~1b~0c', 'value': 1}],
+            document_diff.diff({}, {'a/b~c': 1}))
+
+    def test_diff_skips_identical_subtrees(self):
+        big = {'k%d' % i: {'v': list(range(10))} for i in range(100)}
+        old = {'same': big, 'changed': {'x': 1}}
+        new = {'same': copy.deepcopy(big), 'changed': {'x': 2}}
+
+        with mock.patch.object(document_diff._Differ, 'diff', autospec=True,
+                               side_effect=document_diff._Differ.diff) as m:
+            operations = document_diff.diff(old, new)
+
+        self.assertEqual(
+            [{'op': 'replace', 'path': '/changed/x', 'value': 2}], operations)
+        # The root, both top-level keys and `changed/x`; nothing under `same`.
+        self.assertEqual(4, m.call_count)
@@ -23,7 +23,8 @@ class TestDocumentValidation(engine_test_base.TestDocumentValidationBase):
     def setUp(self):
         super(TestDocumentValidation, self).setUp()
         # Mock out DB module (i.e. retrieving DataSchema docs from DB).
-        self.patch('deckhand.db.sqlalchemy.api.document_get_all')
+        self.mock_document_get_all = self.patch(
+            'deckhand.db.sqlalchemy.api.document_get_all')
 
     def test_init_document_validation(self):
         self._read_data('sample_document')
@@ -68,3 +69,46 @@ class TestDocumentValidation(engine_test_base.TestDocumentValidationBase):
         self.assertTrue(mock_log.info.called)
         self.assertIn("Skipping schema validation for abstract document",
                       mock_log.info.mock_calls[0][1][0])
+
+    def test_builtin_schema_validators_are_reused(self):
+        document_validation.preload_validators()
+        validators = dict(document_validation._VALIDATORS)
+
+        self._read_data('sample_document')
+        document_validation.DocumentValidation(self.data).validate_all()
+
+        # Validators have no notion of equality, so this checks that the
+        # preloaded validators are the ones which were used.
+        self.assertEqual(validators, document_validation._VALIDATORS)
+
+    def test_validation_against_registered_schema_deferred(self):
+        self._read_data('sample_document')
+        data_schema = {'metadata': {'name': 'promenade/ResourceType/v1.0'},
+                       'data': {'type': 'object', 'required': ['missing']}}
+        self.mock_document_get_all.return_value = [data_schema]
+        abstract_document = self._corrupt_data(
+            'metadata.layeringDefinition.abstract', True, op='replace')
+        secret_document = self._corrupt_data(
+            'metadata.storagePolicy', 'encrypted', op='replace')
+
+        doc_validation = document_validation.DocumentValidation(
+            [self.data, abstract_document, secret_document],
+            defer_data_schemas=True)
+        validations = doc_validation.validate_all()
+
+        # Abstract documents aren't validated and encrypted documents can only
+        # be validated before their data is stored in the secrets backend.
+        deferred_documents = doc_validation.deferred_documents
+        self.assertEqual([self.data],
+                         [d.to_dict() for d in deferred_documents])
+        self.assertEqual(['success', 'failure'],
+                         [v['status'] for v in validations])
+
+        with mock.patch('deckhand.db.sqlalchemy.api.revision_get_documents',
+                        autospec=True) as mock_revision_get_documents:
+            mock_revision_get_documents.return_value = [data_schema]
+            validations = document_validation.DocumentValidation(
+                deferred_documents[0].to_dict()).validate_deferred(1)
+        mock_revision_get_documents.assert_called_once_with(
+            1, schema='deckhand/DataSchema', deleted=False)
+        self.assertEqual(['failure'], [v['status'] for v in validations])
@@ -14,7 +14,12 @@
 
 import copy
 
+from cryptography import fernet
+
+from deckhand.barbican import driver
+from deckhand.engine import secret_backends
 from deckhand.engine import secrets_manager
+from deckhand import errors
 from deckhand import factories
 from deckhand.tests import test_utils
 from deckhand.tests.unit.db import base as test_base
@@ -24,8 +29,10 @@ class TestSecretsManager(test_base.TestDbBase):
 
     def setUp(self):
         super(TestSecretsManager, self).setUp()
+        secret_backends.reset_backend()
+        self.addCleanup(secret_backends.reset_backend)
         self.mock_barbican_driver = self.patchobject(
-            secrets_manager.SecretsManager, 'barbican_driver')
+            driver, 'BarbicanDriver').return_value
         self.secret_ref = 'https://path/to/fake_secret'
         self.mock_barbican_driver.create_secret.return_value = (
             {'secret_href': self.secret_ref})
@@ -74,6 +81,90 @@ class TestSecretsManager(test_base.TestDbBase):
     def test_create_encrypted_passphrase(self):
         self._test_create_secret('encrypted', 'Passphrase')
 
+    def test_get_encrypted_secret(self):
+        self.mock_barbican_driver.get_secret.return_value = 'SECRET DATA'
+        secret_doc = self.factory.gen_test(
+            'Passphrase', 'encrypted', {'secret': self.secret_ref})
+
+        secret = self.secrets_manager.get(secret_doc)
+
+        self.mock_barbican_driver.get_secret.assert_called_once_with(
+            self.secret_ref)
+        self.assertEqual({'secret': 'SECRET DATA'}, secret)
+
+    def test_get_cleartext_secret(self):
+        secret_doc = self.factory.gen_test(
+            'Passphrase', 'cleartext', {'secret': 'SECRET DATA'})
+
+        secret = self.secrets_manager.get(secret_doc)
+
+        self.assertFalse(self.mock_barbican_driver.get_secret.called)
+        self.assertEqual({'secret': 'SECRET DATA'}, secret)
+
+
+class TestSecretsManagerLocalBackend(test_base.TestDbBase):
+
+    def setUp(self):
+        super(TestSecretsManagerLocalBackend, self).setUp()
+        self.override_config('storage_backend', 'local', group='secrets')
+        self.override_config('encryption_key',
+                             fernet.Fernet.generate_key().decode('utf-8'),
+                             group='secrets')
+        secret_backends.reset_backend()
+        self.addCleanup(secret_backends.reset_backend)
+
+        self.secrets_manager = secrets_manager.SecretsManager()
+        self.factory = factories.DocumentSecretFactory()
+
+    def _test_create_and_get_secret(self, secret_type):
+        secret_data = test_utils.rand_password()
+        secret_doc = self.factory.gen_test(
+            secret_type, 'encrypted', secret_data)
+
+        created_secret = self.secrets_manager.create(secret_doc)
+        self.assertIn('secret', created_secret)
+        self.assertNotIn(secret_data, created_secret['secret'])
+
+        secret_doc['data'] = created_secret
+        self.assertEqual({'secret': secret_data},
+                         self.secrets_manager.get(secret_doc))
+
+    def test_create_and_get_encrypted_certificate(self):
+        self._test_create_and_get_secret('Certificate')
+
+    def test_create_and_get_encrypted_certificate_key(self):
+        self._test_create_and_get_secret('CertificateKey')
+
+    def test_create_and_get_encrypted_passphrase(self):
+        self._test_create_and_get_secret('Passphrase')
+
+    def test_get_secret_with_different_key_raises_exception(self):
+        secret_doc = self.factory.gen_test('Passphrase', 'encrypted')
+        secret_doc['data'] = self.secrets_manager.create(secret_doc)
+
+        self.override_config('encryption_key',
+                             fernet.Fernet.generate_key().decode('utf-8'),
+                             group='secrets')
+        secret_backends.reset_backend()
+
+        self.assertRaises(errors.SecretStorageException,
+                          self.secrets_manager.get, secret_doc)
+
+    def test_missing_encryption_key_raises_exception(self):
+        self.override_config('encryption_key', None, group='secrets')
+        secret_backends.reset_backend()
+
+        self.assertRaises(errors.SecretStorageException,
+                          secret_backends.get_backend)
+
+    def test_invalid_encryption_key_raises_exception(self):
+        self.override_config('encryption_key', 'not-a-fernet-key',
+                             group='secrets')
+        secret_backends.reset_backend()
+
+        self.assertRaises(errors.SecretStorageException,
+                          secret_backends.get_backend)
+
 
 class TestSecretsSubstitution(test_base.TestDbBase):
 
@@ -285,3 +376,39 @@ class TestSecretsSubstitution(test_base.TestDbBase):
         self._test_secret_substitution(
             document_mapping, [certificate, certificate_key, passphrase],
             expected_data)
+
+    def test_secret_substitution_single_encrypted_local_backend(self):
+        self.override_config('storage_backend', 'local', group='secrets')
+        self.override_config('encryption_key',
+                             fernet.Fernet.generate_key().decode('utf-8'),
+                             group='secrets')
+        secret_backends.reset_backend()
+        self.addCleanup(secret_backends.reset_backend)
+
+        passphrase = self.secrets_factory.gen_test(
+            'Passphrase', 'encrypted', data='my-secret-password')
+        passphrase['metadata']['name'] = 'example-password'
+        passphrase['data'] = secrets_manager.SecretsManager().create(
+            passphrase)
+
+        document_mapping = {
+            "_GLOBAL_SUBSTITUTIONS_1_": [{
+                "dest": {
+                    "path": ".chart.values.password"
+                },
+                "src": {
+                    "schema": "deckhand/Passphrase/v1",
+                    "name": "example-password",
+                    "path": "."
+                }
+            }]
+        }
+        expected_data = {
+            'chart': {
+                'values': {
+                    'password': 'my-secret-password'
+                }
+            }
+        }
+        self._test_secret_substitution(
+            document_mapping, [passphrase], expected_data)
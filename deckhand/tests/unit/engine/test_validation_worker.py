@@ -0,0 +1,118 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+
+from oslo_utils import timeutils
+
+from deckhand.db.sqlalchemy import api as db_api
+from deckhand.engine import document_validation
+from deckhand.engine import validation_worker
+from deckhand.tests.unit import base as test_base
+from deckhand.tests.unit.db import base as db_base
+from deckhand import types
+
+
+class TestValidationWorker(test_base.DeckhandWithDBTestCase):
+
+    def setUp(self):
+        super(TestValidationWorker, self).setUp()
+        documents = db_base.DocumentFixture.get_minimal_multi_fixture(count=2)
+        keys = [(d['schema'], d['metadata']['name']) for d in documents]
+        self.revision_id = db_api.documents_create(
+            'mop', documents, deferred_validations=keys)[0]['revision_id']
+
+    def _get_entries(self):
+        return db_api.validation_get_all_entries(
+            self.revision_id, types.DECKHAND_SCHEMA_VALIDATION)
+
+    def test_failed_validation_performed_again_after_timeout(self):
+        self.patchobject(document_validation.DocumentValidation,
+                         'validate_deferred').side_effect = ValueError
+
+        self.assertRaises(ValueError, validation_worker.process_next)
+        # The task is in progress until it times out.
+        self.assertFalse(validation_worker.process_next())
+        self.assertEqual([(types.DECKHAND_SCHEMA_VALIDATION, 'pending')],
+                         db_api.validation_get_all(self.revision_id))
+
+        later = timeutils.utcnow() + datetime.timedelta(
+            seconds=validation_worker.CONF.validation.task_timeout + 1)
+        self.patchobject(timeutils, 'utcnow').return_value = later
+        self.assertRaises(ValueError, validation_worker.process_next)
+
+    def test_give_up_after_max_attempts(self):
+        self.override_config('max_attempts', 1, group='validation')
+        # Simulate an attempt by a worker that was stopped.
+        db_api.validation_task_claim(
+            validation_worker.CONF.validation.task_timeout)
+
+        later = timeutils.utcnow() + datetime.timedelta(
+            seconds=validation_worker.CONF.validation.task_timeout + 1)
+        self.patchobject(timeutils, 'utcnow').return_value = later
+        self.assertTrue(validation_worker.process_next())
+
+        self.assertEqual([(types.DECKHAND_SCHEMA_VALIDATION, 'failure')],
+                         db_api.validation_get_all(self.revision_id))
+        entries = self._get_entries()
+        self.assertEqual(['failure', 'failure'],
+                         [e['status'] for e in entries])
+        self.assertEqual('The document could not be validated.',
+                         entries[0]['errors'][0]['message'])
+
+    def test_missing_documents_reported_as_failures(self):
+        documents = db_base.DocumentFixture.get_minimal_multi_fixture(count=1)
+        keys = [(d['schema'], d['metadata']['name']) for d in documents]
+        missing_key = (documents[0]['schema'], 'missing')
+        revision_id = db_api.documents_create(
+            'mip', documents, deferred_validations=keys + [missing_key])[0][
+                'revision_id']
+        self.patchobject(document_validation.DocumentValidation,
+                         'validate_deferred').return_value = [{
+                             'name': types.DECKHAND_SCHEMA_VALIDATION,
+                             'status': 'success',
+                             'validator': {'name': 'deckhand',
+                                           'version': '1.0'},
+                             'errors': []}]
+
+        # Tasks are processed in the order they were queued.
+        self.assertTrue(validation_worker.process_next())
+        self.assertTrue(validation_worker.process_next())
+
+        self.assertEqual([(types.DECKHAND_SCHEMA_VALIDATION, 'failure')],
+                         db_api.validation_get_all(revision_id))
+        entries = db_api.validation_get_all_entries(
+            revision_id, types.DECKHAND_SCHEMA_VALIDATION)
+        self.assertEqual(['success', 'failure'],
+                         [e['status'] for e in entries])
+        self.assertEqual('missing', entries[1]['errors'][0]['name'])
+        self.assertEqual('The document could not be found.',
+                         entries[1]['errors'][0]['message'])
+
+    def test_start_once_per_process(self):
+        self.patchobject(validation_worker, '_PID', None, autospec=False)
+        mock_thread = self.patchobject(validation_worker.threading, 'Thread')
+        mock_getpid = self.patchobject(validation_worker.os, 'getpid')
+        mock_getpid.return_value = 1
+        workers = validation_worker.CONF.validation.workers
+
+        validation_worker.start()
+        validation_worker.start()
+        self.assertEqual(workers, mock_thread.call_count)
+        self.assertEqual(workers, mock_thread.return_value.start.call_count)
+
+        # Processes forked from this one start their own workers.
+        mock_getpid.return_value = 2
+        validation_worker.start()
+        self.assertEqual(2 * workers, mock_thread.call_count)
@@ -19,6 +19,7 @@ policy_data = """
 "deckhand:create_encrypted_documents": "rule:admin_api"
 "deckhand:list_cleartext_documents": "rule:admin_api"
 "deckhand:list_encrypted_documents": "rule:admin_api"
+"deckhand:profile_request": "rule:admin_api"
 "deckhand:show_revision": "rule:admin_api"
 "deckhand:list_revisions": "rule:admin_api"
 "deckhand:delete_revisions": "rule:admin_api"
@@ -0,0 +1,75 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+
+import fixtures
+import six
+
+from deckhand.tests.benchmarks import bench_suite
+from deckhand.tests.unit import base as test_base
+
+
+class TestBenchmarkSuite(test_base.DeckhandWithDBTestCase):
+
+    def setUp(self):
+        super(TestBenchmarkSuite, self).setUp()
+        # Keep the suite's progress output out of the test output.
+        self.useFixture(fixtures.MonkeyPatch('sys.stdout', six.StringIO()))
+
+    def test_run_all_benchmarks(self):
+        results = bench_suite.run(
+            {'documents': (10, 20), 'revisions': (2, 3)}, repeat=2)
+
+        names = [b.name for b in bench_suite.BENCHMARKS]
+        self.assertEqual(len(names) * 2, len(results['results']))
+        self.assertEqual(set(names), set(results['scaling_exponents']))
+        for result in results['results']:
+            self.assertEqual(2, len(result['samples']))
+            self.assertEqual(min(result['samples']), result['best'])
+
+    def test_run_only_some_benchmarks(self):
+        results = bench_suite.run(
+            {'documents': (10,), 'revisions': (2,)},
+            benchmarks=['db.revision_list'], repeat=1)
+
+        self.assertEqual(['db.revision_list'],
+                         [r['benchmark'] for r in results['results']])
+        # A single scale is not enough to fit a scaling exponent.
+        self.assertEqual({'db.revision_list': None},
+                         results['scaling_exponents'])
+
+    def test_scaling_exponent(self):
+        self.assertAlmostEqual(
+            1.0, bench_suite.scaling_exponent([(10, 1.0), (100, 10.0)]))
+        self.assertAlmostEqual(
+            2.0, bench_suite.scaling_exponent([(10, 1.0), (100, 100.0)]))
+
+    def test_compare(self):
+        baseline = {
+            'results': [{'benchmark': 'db.revision_list', 'scale': 10,
+                         'best': 1.0},
+                        {'benchmark': 'db.revision_list', 'scale': 100,
+                         'best': 10.0}],
+            'scaling_exponents': {'db.revision_list': 1.0},
+        }
+        self.assertEqual([], bench_suite.compare(baseline, baseline, 0.25))
+
+        results = copy.deepcopy(baseline)
+        results['results'][1]['best'] = 100.0
+        results['scaling_exponents']['db.revision_list'] = 2.0
+        regressions = bench_suite.compare(results, baseline, 0.25)
+        self.assertEqual(2, len(regressions))
+        self.assertIn('db.revision_list at 100', regressions[0])
+        self.assertIn('scaling exponent', regressions[1])
@@ -0,0 +1,88 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import subprocess
+import sys
+
+import fixtures
+
+from deckhand import metrics
+from deckhand.tests.unit import base as test_base
+
+_WORKER = """
+from deckhand import metrics
+metrics.BUCKET_DOCUMENTS.observe(%(documents)d)
+metrics.REQUESTS_IN_FLIGHT.inc()
+"""
+
+_MARK_PROCESS_DEAD = """
+from deckhand import metrics
+metrics.mark_process_dead(%(pid)d)
+"""
+
+_SCRAPE = """
+import sys
+from deckhand import metrics
+sys.stdout.write(metrics.generate()[0].decode('utf-8'))
+"""
+
+
+class TestMultiprocessMetrics(test_base.DeckhandTestCase):
+    """Metrics are aggregated across worker processes, which are simulated
+    with separate interpreters sharing a metrics directory.
+    """
+
+    def setUp(self):
+        super(TestMultiprocessMetrics, self).setUp()
+        self.env = dict(os.environ)
+        self.env[metrics.MULTIPROC_DIR_ENV] = self.useFixture(
+            fixtures.TempDir()).path
+
+    def _run(self, script, **kwargs):
+        process = subprocess.Popen(
+            [sys.executable, '-c', script % kwargs], env=self.env,
+            stdout=subprocess.PIPE)
+        output = process.communicate()[0]
+        self.assertEqual(0, process.returncode)
+        return process.pid, output.decode('utf-8')
+
+    def _get_lines(self, output, prefix):
+        return [line for line in output.splitlines()
+                if line.startswith(prefix)]
+
+    def test_metrics_aggregated_across_workers(self):
+        worker_pid = self._run(_WORKER, documents=10)[0]
+        self._run(_WORKER, documents=20)
+        output = self._run(_SCRAPE)[1]
+
+        self.assertEqual(['deckhand_bucket_documents_count 2.0'],
+                         self._get_lines(output,
+                                         'deckhand_bucket_documents_count'))
+        self.assertEqual(['deckhand_bucket_documents_sum 30.0'],
+                         self._get_lines(output,
+                                         'deckhand_bucket_documents_sum'))
+        self.assertEqual(['deckhand_requests_in_flight 2.0'],
+                         self._get_lines(output,
+                                         'deckhand_requests_in_flight'))
+
+        # The gauges of exited workers are discarded, but not their counts.
+        self._run(_MARK_PROCESS_DEAD, pid=worker_pid)
+        output = self._run(_SCRAPE)[1]
+        self.assertEqual(['deckhand_requests_in_flight 1.0'],
+                         self._get_lines(output,
+                                         'deckhand_requests_in_flight'))
+        self.assertEqual(['deckhand_bucket_documents_count 2.0'],
+                         self._get_lines(output,
+                                         'deckhand_bucket_documents_count'))
@@ -0,0 +1,77 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import testtools
+
+from deckhand import profiling
+from deckhand.tests.unit import base as test_base
+
+
+def _allocate():
+    return [bytearray(1024) for _ in range(100)]
+
+
+class TestRequestProfile(test_base.DeckhandTestCase):
+
+    def test_cpu_profile(self):
+        request_profile = profiling.RequestProfile(['cpu'])
+        self.assertTrue(request_profile.start())
+        _allocate()
+        request_profile.stop()
+
+        report = request_profile.format_report(5)
+        self.assertIn('_allocate', report)
+        self.assertIsNone(request_profile.memory_statistics)
+        self.assertFalse(profiling._LOCK.locked())
+
+    def test_only_one_profile_at_a_time(self):
+        request_profile = profiling.RequestProfile(['cpu'])
+        self.assertTrue(request_profile.start())
+        self.addCleanup(request_profile.stop)
+        self.assertFalse(profiling.RequestProfile(['cpu']).start())
+
+    @testtools.skipIf(not profiling.is_supported(profiling.MEMORY),
+                      'tracemalloc is not available')
+    def test_memory_profile(self):
+        request_profile = profiling.RequestProfile(['memory'])
+        request_profile.start()
+        allocated = _allocate()
+        request_profile.stop()
+
+        report = request_profile.format_report(1)
+        self.assertIn('Peak of traced memory: ', report)
+        self.assertIn('test_profiling.py', report.splitlines()[-1])
+        self.assertFalse(profiling.tracemalloc.is_tracing())
+        del allocated
+
+    @testtools.skipIf(not profiling.is_supported(profiling.MEMORY),
+                      'tracemalloc is not available')
+    def test_memory_profile_while_already_tracing(self):
+        tracemalloc = profiling.tracemalloc
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+
+        request_profile = profiling.RequestProfile(['memory'])
+        request_profile.start()
+        allocated = _allocate()
+        request_profile.stop()
+
+        # Only the allocations made while profiling are reported and
+        # tracing is left enabled.
+        self.assertTrue(tracemalloc.is_tracing())
+        largest = max(request_profile.memory_statistics,
+                      key=lambda s: s.size_diff)
+        self.assertGreaterEqual(largest.size_diff, 100 * 1024)
+        self.assertNotIn('Peak', request_profile.format_report(1))
+        del allocated
@@ -0,0 +1,25 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from deckhand.tests.benchmarks import bench_startup
+from deckhand.tests.unit import base as test_base
+
+
+class TestStartup(test_base.DeckhandTestCase):
+
+    def test_optional_dependencies_not_imported_at_startup(self):
+        # A fresh interpreter is required since this process has most likely
+        # imported these modules already.
+        result = bench_startup.measure('deckhand.service')
+        self.assertEqual([], result['loaded'])
@@ -0,0 +1,76 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+
+from deckhand import timing
+from deckhand.tests.unit import base as test_base
+
+
+class TestTiming(test_base.DeckhandTestCase):
+
+    def setUp(self):
+        super(TestTiming, self).setUp()
+        self.now = 0.0
+        self.patch('timeit.default_timer', autospec=False,
+                   side_effect=lambda: self.now)
+        self.addCleanup(timing.end_request)
+
+    def _tick(self, seconds):
+        self.now += seconds
+
+    def test_nested_phases_are_exclusive(self):
+        timer = timing.start_request()
+        with timing.span('validation'):
+            self._tick(1)
+            with timing.span('db'):
+                self._tick(2)
+            self._tick(3)
+        self._tick(4)
+
+        self.assertEqual({'validation': 4.0, 'db': 2.0}, dict(timer.phases))
+        self.assertEqual(10.0, timer.elapsed())
+        self.assertEqual('validation;dur=4000.0, db;dur=2000.0, '
+                         'total;dur=10000.0', timer.to_header())
+
+    def test_timed_iter_excludes_consumer(self):
+        def parse():
+            for item in range(3):
+                self._tick(1)
+                yield item
+
+        timer = timing.start_request()
+        with timing.span('validation'):
+            for _ in timing.timed_iter('parse', parse()):
+                self._tick(2)
+
+        self.assertEqual({'validation': 6.0, 'parse': 3.0}, dict(timer.phases))
+
+    def test_timed_records_phase_on_error(self):
+        @timing.timed('db')
+        def fail():
+            self._tick(1)
+            raise ValueError()
+
+        timer = timing.start_request()
+        self.assertRaises(ValueError, fail)
+        self.assertEqual({'db': 1.0}, dict(timer.phases))
+
+    def test_span_outside_request_is_noop(self):
+        self.assertIsNone(timing.end_request())
+        with timing.span('db'):
+            pass
+        self.assertIsNone(timing.get_timer())
+        self.assertEqual(mock.sentinel.result,
+                         timing.timed('db')(lambda: mock.sentinel.result)())
@@ -0,0 +1,57 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import yaml
+
+from deckhand import factories
+from deckhand.tests.unit import base as test_base
+from deckhand import yaml_codec
+
+
+class TestYAMLCodec(test_base.DeckhandTestCase):
+
+    def setUp(self):
+        super(TestYAMLCodec, self).setUp()
+        mapping = {
+            "_GLOBAL_DATA_1_": {"data": {"a": {"x": 1, "y": [1, 2.5, None]}}},
+            "_SITE_DATA_1_": {"data": {"a": {"x": 7, "z": u"é"}, "b": 4}},
+            "_SITE_ACTIONS_1_": {
+                "actions": [{"method": "merge", "path": "."}]}
+        }
+        self.documents = factories.DocumentFactory(2, [1, 1]).gen_test(
+            mapping)
+
+    def test_uses_libyaml_when_available(self):
+        self.assertEqual(yaml.__with_libyaml__, yaml_codec.HAS_LIBYAML)
+        if yaml_codec.HAS_LIBYAML:
+            self.assertIs(yaml.CSafeLoader, yaml_codec.SafeLoader)
+            self.assertIs(yaml.CSafeDumper, yaml_codec.SafeDumper)
+
+    def test_dump_all_and_load_all_round_trip(self):
+        payload = yaml_codec.safe_dump_all(self.documents)
+        self.assertEqual(self.documents,
+                         list(yaml_codec.safe_load_all(payload)))
+
+    def test_matches_pure_python_codec(self):
+        payload = yaml.safe_dump_all(self.documents)
+        self.assertEqual(list(yaml.safe_load_all(payload)),
+                         list(yaml_codec.safe_load_all(payload)))
+        self.assertEqual(
+            self.documents,
+            list(yaml.safe_load_all(
+                yaml_codec.safe_dump_all(self.documents))))
+
+    def test_safe_load_rejects_python_tags(self):
+        self.assertRaises(yaml_codec.YAMLError, yaml_codec.safe_load,
+                          '!!python/object/apply:os.system ["true"]')
@@ -0,0 +1,136 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per-request timing of the phases of handling a request.
+
+A request is timed between ``start_request`` and ``end_request``. In
+between, the code handling the request marks its phases (YAML parsing,
+validation, database access, ...) with ``span``, ``timed`` or ``timed_iter``.
+The time of each phase is exclusive: while a phase is nested inside another
+one, only the inner phase is charged, so the phases of a request never add up
+to more than its total time.
+
+Outside of a timed request, marking a phase is a no-op.
+"""
+
+import collections
+import contextlib
+import functools
+import threading
+import timeit
+
+_local = threading.local()
+
+
+class RequestTimer(object):
+    """Accumulates the time spent in each phase of a request."""
+
+    def __init__(self):
+        self.start = timeit.default_timer()
+        self.phases = collections.OrderedDict()
+        self._stack = []
+        self._resumed = self.start
+
+    def _charge_current_phase(self, now):
+        if self._stack:
+            name = self._stack[-1]
+            self.phases[name] = (self.phases.get(name, 0.0) +
+                                 now - self._resumed)
+        self._resumed = now
+
+    def push(self, name):
+        self._charge_current_phase(timeit.default_timer())
+        self._stack.append(name)
+
+    def pop(self):
+        self._charge_current_phase(timeit.default_timer())
+        self._stack.pop()
+
+    def elapsed(self):
+        """Return the number of seconds since the request started."""
+        return timeit.default_timer() - self.start
+
+    def to_header(self, total=None):
+        """Format the phases as the value of a ``Server-Timing`` header.
+
+        Durations are in milliseconds, as required by the header.
+        """
+        total = self.elapsed() if total is None else total
+        metrics = ['%s;dur=%.1f' % (name, duration * 1000)
+                   for name, duration in self.phases.items()]
+        metrics.append('total;dur=%.1f' % (total * 1000))
+        return ', '.join(metrics)
+
+
+def start_request():
+    """Start timing the current request."""
+    _local.timer = RequestTimer()
+    return _local.timer
+
+
+def end_request():
+    """Stop timing the current request.
+
+    :returns: The ``RequestTimer`` of the request, or None if no request was
+        being timed.
+    """
+    timer = getattr(_local, 'timer', None)
+    _local.timer = None
+    return timer
+
+
+def get_timer():
+    """Return the ``RequestTimer`` of the current request, if any."""
+    return getattr(_local, 'timer', None)
+
+
+@contextlib.contextmanager
+def span(name):
+    """Charge the time spent in the ``with`` block to the phase ``name``."""
+    timer = get_timer()
+    if timer is None:
+        yield
+        return
+    timer.push(name)
+    try:
+        yield
+    finally:
+        timer.pop()
+
+
+def timed(name):
+    """Decorator that charges the time spent in a function to ``name``."""
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def timed_iter(name, iterable):
+    """Charge the time spent producing each item of ``iterable`` to ``name``.
+
+    The time the consumer spends between items is not charged, which allows
+    timing a parser that is consumed lazily by the next phase.
+    """
+    iterator = iter(iterable)
+    while True:
+        with span(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
@@ -15,9 +15,13 @@
 import re
 import string
 
-import jsonpath_ng
-
 from deckhand import errors
+from deckhand import metrics
+
+# Parsed JSON paths, by path. Documents tend to reuse the same few paths, so
+# the cache is simply emptied if it ever grows past ``_JSONPATH_CACHE_SIZE``.
+_JSONPATH_PARSERS = {}
+_JSONPATH_CACHE_SIZE = 1024
 
 
 def to_camel_case(s):
@@ -32,6 +36,19 @@ def to_snake_case(name):
     return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
 
 
+def _jsonpath_parser(jsonpath):
+    parser = _JSONPATH_PARSERS.get(jsonpath)
+    metrics.cache_lookup('jsonpath', parser is not None)
+    if parser is None:
+        # jsonpath_ng builds its PLY parser on import, so defer the import
+        # until a JSON path is actually used.
+        import jsonpath_ng
+        if len(_JSONPATH_PARSERS) >= _JSONPATH_CACHE_SIZE:
+            _JSONPATH_PARSERS.clear()
+        parser = _JSONPATH_PARSERS[jsonpath] = jsonpath_ng.parse(jsonpath)
+    return parser
+
+
 def jsonpath_parse(data, jsonpath, match_all=False):
     """Parse value in the data for the given ``jsonpath``.
 
@@ -63,7 +80,7 @@ def jsonpath_parse(data, jsonpath, match_all=False):
     if jsonpath.startswith('.'):
         jsonpath = '$' + jsonpath
 
-    p = jsonpath_ng.parse(jsonpath)
+    p = _jsonpath_parser(jsonpath)
     matches = p.find(data)
     if matches:
         result = [m.value for m in matches]
@@ -107,7 +124,7 @@ def jsonpath_replace(data, value, jsonpath, pattern=None):
         jsonpath = '$' + jsonpath
 
     def _do_replace():
-        p = jsonpath_ng.parse(jsonpath)
+        p = _jsonpath_parser(jsonpath)
         p_to_change = p.find(data)
 
         if p_to_change:
@@ -0,0 +1,54 @@
+# Copyright 2017 AT&T Intellectual Property.  All other rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Central YAML parsing and emitting for Deckhand.
+
+Uses the libyaml-backed ``CSafeLoader`` and ``CSafeDumper`` when PyYAML was
+built against libyaml, and falls back to the pure-Python ``SafeLoader`` and
+``SafeDumper`` otherwise. Both pairs only construct and represent standard
+YAML tags, so the results are identical either way.
+"""
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+    HAS_LIBYAML = True
+except ImportError:
+    from yaml import SafeDumper
+    from yaml import SafeLoader
+    HAS_LIBYAML = False
+
+YAMLError = yaml.YAMLError
+
+
+def safe_load(stream, loader=SafeLoader):
+    """Parse the first YAML document in ``stream``."""
+    return yaml.load(stream, Loader=loader)  # nosec
+
+
+def safe_load_all(stream, loader=SafeLoader):
+    """Lazily parse all YAML documents in ``stream``."""
+    return yaml.load_all(stream, Loader=loader)  # nosec
+
+
+def safe_dump(data, stream=None, dumper=SafeDumper, **kwargs):
+    """Serialize ``data`` as a single YAML document."""
+    return yaml.dump(data, stream, Dumper=dumper, **kwargs)
+
+
+def safe_dump_all(documents, stream=None, dumper=SafeDumper, **kwargs):
+    """Serialize ``documents`` as a multi-document YAML stream."""
+    return yaml.dump_all(documents, stream, Dumper=dumper, **kwargs)
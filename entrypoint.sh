@@ -15,11 +15,19 @@
 # limitations under the License.
 
 
+# Each worker writes its metrics to this directory, so that /metrics reports
+# the aggregate of all the workers. Metrics of previous runs are discarded.
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/deckhand-metrics}
+rm -rf "${PROMETHEUS_MULTIPROC_DIR}"
+mkdir -p "${PROMETHEUS_MULTIPROC_DIR}"
+
 # Start deckhand application
 exec uwsgi \
     --http :9000 \
     -w deckhand.cmd \
     --callable deckhand_callable \
+    --master \
+    --processes ${DECKHAND_API_WORKERS:-4} \
     --enable-threads \
     -L \
     --pyargv "--config-file /etc/deckhand/deckhand.conf"
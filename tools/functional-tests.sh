@@ -114,6 +114,9 @@ gen_config
 gen_paste
 gen_policy
 
+log_section Creating database schema
+deckhand-manage --config-file $CONF_DIR/deckhand.conf db sync
+
 uwsgi \
     --http :9000 \
     -w deckhand.cmd \